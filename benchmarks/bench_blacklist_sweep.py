@@ -0,0 +1,74 @@
+"""Measure blacklist lookup latency as the table grows, with and without sweeping.
+
+Usage: python -m benchmarks.bench_blacklist_sweep [--sizes 1000,10000,100000]
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from flask_api_tutorial import db
+from flask_api_tutorial.models.token_blacklist import BlacklistedToken
+from benchmarks.util import create_bench_app, summarize, time_calls, write_report
+
+
+def seed_blacklist(num_rows, expired_ratio):
+    now = datetime.utcnow()
+    rows = [
+        dict(
+            token_digest=BlacklistedToken.get_token_digest(f"token-{i:09d}"),
+            blacklisted_on=now,
+            expires_at=(
+                now - timedelta(hours=1)
+                if random.random() < expired_ratio
+                else now + timedelta(hours=1)
+            ),
+        )
+        for i in range(num_rows)
+    ]
+    db.session.bulk_insert_mappings(BlacklistedToken, rows)
+    db.session.commit()
+
+
+def measure_lookups(num_rows, iterations):
+    tokens = [f"token-{random.randrange(num_rows * 2):09d}" for _ in range(iterations)]
+    token_iter = iter(BlacklistedToken.get_token_digest(token) for token in tokens)
+    return summarize(
+        time_calls(
+            lambda: BlacklistedToken.query_blacklist(next(token_iter)), iterations
+        )
+    )
+
+
+def run(sizes, expired_ratio, iterations, batch_size):
+    results = {}
+    for num_rows in sizes:
+        app = create_bench_app()
+        with app.app_context():
+            seed_blacklist(num_rows, expired_ratio)
+            without_sweep = measure_lookups(num_rows, iterations)
+            start = time.perf_counter()
+            deleted = BlacklistedToken.delete_expired(batch_size)
+            sweep_seconds = time.perf_counter() - start
+            with_sweep = measure_lookups(num_rows, iterations)
+            results[str(num_rows)] = dict(
+                rows_deleted=deleted,
+                rows_remaining=BlacklistedToken.query.count(),
+                sweep_seconds=round(sweep_seconds, 4),
+                lookup_without_sweep=without_sweep,
+                lookup_with_sweep=with_sweep,
+            )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--expired-ratio", type=float, default=0.9)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",")]
+    results = run(sizes, args.expired_ratio, args.iterations, args.batch_size)
+    write_report("blacklist_sweep", results, args.out)
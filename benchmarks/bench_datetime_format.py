@@ -0,0 +1,64 @@
+"""Measure the timestamp formatting path used when serializing widgets and users.
+
+Each step is timed with the datetime_util caches cleared before every call
+(cold) and with the caches in place (warm).
+
+Usage: python -m benchmarks.bench_datetime_format [--iterations N] [--widgets N]
+"""
+import argparse
+from datetime import datetime, timedelta, timezone
+
+from flask_api_tutorial.models.user import User  # noqa: F401
+from flask_api_tutorial.models.widget import Widget
+from flask_api_tutorial.util import datetime_util
+from flask_api_tutorial.util.datetime_util import (
+    get_local_utcoffset,
+    localized_dt_string,
+)
+from benchmarks.util import summarize, time_calls, write_report
+
+
+def clear_caches():
+    datetime_util._local_utcoffset = (0.0, None)
+    datetime_util._cached_localized_dt_string.cache_clear()
+
+
+def format_widgets(widgets):
+    for widget in widgets:
+        widget.created_at_str
+        widget.deadline_str
+
+
+def run(iterations, num_widgets):
+    now = datetime.utcnow().replace(microsecond=0)
+    widgets = [
+        Widget(name=f"widget-{i}", created_at=now, deadline=now + timedelta(days=i % 30))
+        for i in range(num_widgets)
+    ]
+    dt = now.replace(tzinfo=timezone.utc)
+    steps = dict(
+        get_local_utcoffset=get_local_utcoffset,
+        localized_dt_string=lambda: localized_dt_string(
+            dt, use_tz=get_local_utcoffset()
+        ),
+        format_widget_page=lambda: format_widgets(widgets),
+    )
+    results = {}
+    for label, func in steps.items():
+
+        def cold():
+            clear_caches()
+            func()
+
+        results[f"{label}_cold"] = summarize(time_calls(cold, iterations))
+        results[f"{label}_warm"] = summarize(time_calls(func, iterations))
+    return dict(widgets_per_page=num_widgets, **results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--widgets", type=int, default=100)
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args()
+    write_report("datetime_format", run(args.iterations, args.widgets), args.out)
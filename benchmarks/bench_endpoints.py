@@ -0,0 +1,243 @@
+"""Latency and throughput of every /api/v1 endpoint.
+
+A benchmark database is seeded with a configurable number of users, widgets and
+blacklisted tokens. Each endpoint is then driven through the Flask test client
+and/or a local WSGI server, and p50/p95/p99 latency and requests/sec are
+reported as JSON so that results can be compared across commits.
+
+Usage: python -m benchmarks.bench_endpoints [--driver client|server|both]
+       [--users N] [--widgets N] [--blacklisted N] [--requests N] [--out FILE]
+"""
+import argparse
+import hashlib
+import tempfile
+import time
+from datetime import datetime, timedelta
+from http.client import HTTPConnection
+from urllib.parse import urlencode
+
+from flask_api_tutorial import bcrypt, db
+from flask_api_tutorial.models.token_blacklist import BlacklistedToken
+from flask_api_tutorial.models.user import User
+from flask_api_tutorial.models.widget import Widget
+from benchmarks.util import (
+    create_bench_app,
+    start_server_process,
+    stop_server_process,
+    summarize,
+    write_report,
+)
+
+PASSWORD = "benchmark"
+USER_EMAIL = "user{}@email.com"
+ADMIN_EMAIL = "admin@email.com"
+FORM_HEADERS = {"Content-Type": "application/x-www-form-urlencoded"}
+BENCH_CONFIG = dict(
+    TESTING=False,
+    TOKEN_EXPIRE_MINUTES=60,
+    LOGIN_THROTTLE_ENABLED=False,
+)
+ENDPOINTS = [
+    "auth_register",
+    "auth_login",
+    "auth_user",
+    "widget_list",
+    "widget_get",
+    "widget_put",
+    "widget_delete",
+]
+
+
+def seed_database(num_users, num_widgets, num_blacklisted, num_deletes):
+    """Bulk insert users, widgets and blacklisted tokens, return access tokens."""
+    now = datetime.utcnow()
+    password_hash = bcrypt.generate_password_hash(PASSWORD).decode("utf-8")
+    users = [
+        dict(email=USER_EMAIL.format(i), password_hash=password_hash, registered_on=now)
+        for i in range(num_users)
+    ]
+    users.append(
+        dict(
+            email=ADMIN_EMAIL, password_hash=password_hash, admin=True, registered_on=now
+        )
+    )
+    for user in users:
+        db.session.add(User(**user))
+    db.session.commit()
+    admin = User.find_by_email(ADMIN_EMAIL)
+    deadline = now + timedelta(days=30)
+    widgets = [
+        dict(
+            name=f"widget-{i}",
+            info_url=f"https://www.widget{i}.com",
+            created_at=now,
+            deadline=deadline,
+            owner_id=admin.id,
+        )
+        for i in range(num_widgets)
+    ]
+    widgets += [
+        dict(
+            name=f"delete-me-{i}",
+            info_url="https://www.delete.me",
+            created_at=now,
+            deadline=deadline,
+            owner_id=admin.id,
+        )
+        for i in range(num_deletes)
+    ]
+    db.session.bulk_insert_mappings(Widget, widgets)
+    expires_at = now + timedelta(hours=1)
+    blacklist = [
+        dict(
+            token_digest=hashlib.sha256(f"token-{i}".encode()).hexdigest(),
+            blacklisted_on=now,
+            expires_at=expires_at,
+        )
+        for i in range(num_blacklisted)
+    ]
+    db.session.bulk_insert_mappings(BlacklistedToken, blacklist)
+    db.session.commit()
+    user = User.find_by_email(USER_EMAIL.format(0))
+    return dict(
+        user=user.encode_access_token().decode(),
+        admin=admin.encode_access_token().decode(),
+    )
+
+
+class TestClientDriver:
+    """Send requests through the Flask test client (no network, no server)."""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, headers=None, body=None):
+        response = self.client.open(path, method=method, headers=headers, data=body)
+        return response.status_code
+
+    def close(self):
+        pass
+
+
+class HTTPDriver:
+    """Send requests over a persistent connection to a local WSGI server."""
+
+    def __init__(self, port):
+        self.port = port
+        self.conn = HTTPConnection("127.0.0.1", port)
+
+    def request(self, method, path, headers=None, body=None):
+        self.conn.request(method, path, body=body, headers=headers or {})
+        response = self.conn.getresponse()
+        response.read()
+        if response.getheader("Connection", "").lower() == "close":
+            self.conn.close()
+            self.conn = HTTPConnection("127.0.0.1", self.port)
+        return response.status
+
+    def close(self):
+        self.conn.close()
+
+
+def build_request(endpoint, i, tokens, widgets_count):
+    """Return (method, path, headers, body, expected_status) for request #i."""
+    user_auth = {"Authorization": f"Bearer {tokens['user']}"}
+    admin_auth = {"Authorization": f"Bearer {tokens['admin']}"}
+    widget_name = f"widget-{i % widgets_count}"
+    if endpoint == "auth_register":
+        form = urlencode(dict(email=f"new-user{i}@email.com", password=PASSWORD))
+        return "POST", "/api/v1/auth/register", FORM_HEADERS, form, 201
+    if endpoint == "auth_login":
+        form = urlencode(dict(email=USER_EMAIL.format(0), password=PASSWORD))
+        return "POST", "/api/v1/auth/login", FORM_HEADERS, form, 200
+    if endpoint == "auth_user":
+        return "GET", "/api/v1/auth/user", user_auth, None, 200
+    if endpoint == "widget_list":
+        pages = max(1, widgets_count // 10)
+        path = f"/api/v1/widgets?page={i % pages + 1}&per_page=10"
+        return "GET", path, user_auth, None, 200
+    if endpoint == "widget_get":
+        return "GET", f"/api/v1/widgets/{widget_name}", user_auth, None, 200
+    if endpoint == "widget_put":
+        deadline = (datetime.now() + timedelta(days=60)).strftime("%m/%d/%Y")
+        form = urlencode(dict(info_url=f"https://www.updated{i}.com", deadline=deadline))
+        headers = dict(admin_auth, **FORM_HEADERS)
+        return "PUT", f"/api/v1/widgets/{widget_name}", headers, form, 200
+    if endpoint == "widget_delete":
+        return "DELETE", f"/api/v1/widgets/delete-me-{i}", admin_auth, None, 204
+    raise ValueError(f"Unknown endpoint: {endpoint}")
+
+
+def bench_endpoint(driver, endpoint, requests, tokens, widgets_count):
+    durations = []
+    errors = 0
+    for i in requests:
+        method, path, headers, body, expected = build_request(
+            endpoint, i, tokens, widgets_count
+        )
+        start = time.perf_counter()
+        status = driver.request(method, path, headers=headers, body=body)
+        durations.append(time.perf_counter() - start)
+        if status != expected:
+            errors += 1
+    result = summarize(durations)
+    result["requests_per_sec"] = result.pop("ops_per_sec")
+    result["errors"] = errors
+    return result
+
+
+def run_driver(driver_name, args, endpoints, port):
+    db_path = f"{tempfile.mkdtemp()}/benchmark.db"
+    app = create_bench_app(db_path=db_path, **BENCH_CONFIG)
+    with app.app_context():
+        tokens = seed_database(
+            args.users, args.widgets, args.blacklisted, args.requests + args.warmup
+        )
+    server = None
+    if driver_name == "server":
+        server = start_server_process(port, db_path=db_path, reset=False, **BENCH_CONFIG)
+        driver = HTTPDriver(port)
+    else:
+        driver = TestClientDriver(app)
+    try:
+        warmup = range(args.requests, args.requests + args.warmup)
+        for endpoint in endpoints:
+            bench_endpoint(driver, endpoint, warmup, tokens, args.widgets)
+        return {
+            endpoint: bench_endpoint(
+                driver, endpoint, range(args.requests), tokens, args.widgets
+            )
+            for endpoint in endpoints
+        }
+    finally:
+        driver.close()
+        if server:
+            stop_server_process(server)
+
+
+def run(args):
+    endpoints = args.endpoints.split(",") if args.endpoints else ENDPOINTS
+    drivers = ["client", "server"] if args.driver == "both" else [args.driver]
+    results = dict(
+        dataset=dict(
+            users=args.users, widgets=args.widgets, blacklisted_tokens=args.blacklisted
+        )
+    )
+    for i, driver_name in enumerate(drivers):
+        results[driver_name] = run_driver(driver_name, args, endpoints, args.port + i)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--driver", choices=["client", "server", "both"], default="both")
+    parser.add_argument("--endpoints", default=None, help="Comma-separated subset")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--widgets", type=int, default=10000)
+    parser.add_argument("--blacklisted", type=int, default=10000)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--port", type=int, default=5075)
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args()
+    write_report("endpoints", run(args), args.out)
@@ -0,0 +1,104 @@
+"""Compare exporting every widget with the streaming export endpoint and by page.
+
+The widget table is seeded once, then each scenario runs in a fresh child
+process so that its peak memory use (maximum resident set size) can be
+measured on its own:
+
+* export_ndjson / export_csv: GET /widgets/export.{ndjson,csv}, reading the
+  streamed response chunk by chunk.
+* page_walk: GET /widgets?per_page=100 for page 1, 2, ... as downstream jobs
+  did before, stopped after --walk-pages pages (0 walks every page).
+
+Usage: python -m benchmarks.bench_export [--widgets 1000000]
+"""
+import argparse
+import multiprocessing
+import resource
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.bench_pagination import seed_widgets
+from benchmarks.util import create_bench_app, write_report
+
+BENCH_CONFIG = dict(TESTING=False, TOKEN_EXPIRE_MINUTES=60)
+
+
+def max_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def export(client, headers, export_format):
+    response = client.get(
+        f"/api/v1/widgets/export.{export_format}", headers=headers, buffered=False
+    )
+    assert response.status_code == 200, response.data
+    num_bytes = num_lines = 0
+    for chunk in response.response:
+        num_bytes += len(chunk)
+        num_lines += chunk.count(b"\n")
+    response.close()
+    return dict(bytes=num_bytes, lines=num_lines)
+
+
+def page_walk(client, headers, max_pages):
+    num_bytes = num_items = page = 0
+    while not max_pages or page < max_pages:
+        page += 1
+        query_string = dict(page=page, per_page=100)
+        response = client.get(
+            "/api/v1/widgets", query_string=query_string, headers=headers
+        )
+        assert response.status_code == 200, response.data
+        num_bytes += len(response.data)
+        num_items += len(response.json["items"])
+        if not response.json["has_next"]:
+            break
+    return dict(bytes=num_bytes, items=num_items, pages=page)
+
+
+def run_scenario(db_path, token, scenario, walk_pages, results):
+    app = create_bench_app(db_path=db_path, reset=False, **BENCH_CONFIG)
+    client = app.test_client()
+    headers = {"Authorization": f"Bearer {token}"}
+    rss_before = max_rss_mb()
+    start = time.perf_counter()
+    if scenario == "page_walk":
+        result = page_walk(client, headers, walk_pages)
+    else:
+        result = export(client, headers, scenario.split("_")[1])
+    seconds = time.perf_counter() - start
+    rows = result.get("lines") or result.get("items")
+    results[scenario] = dict(
+        result,
+        seconds=round(seconds, 3),
+        rows_per_sec=round(rows / seconds, 1),
+        max_rss_mb=round(max_rss_mb(), 1),
+        max_rss_growth_mb=round(max_rss_mb() - rss_before, 1),
+    )
+
+
+def run(num_widgets, walk_pages):
+    db_path = Path(tempfile.mkdtemp()) / "benchmark.db"
+    app = create_bench_app(db_path=db_path, **BENCH_CONFIG)
+    with app.app_context():
+        token = seed_widgets(num_widgets)
+    with multiprocessing.Manager() as manager:
+        results = manager.dict()
+        for scenario in ["export_ndjson", "export_csv", "page_walk"]:
+            process = multiprocessing.Process(
+                target=run_scenario,
+                args=(db_path, token, scenario, walk_pages, results),
+            )
+            process.start()
+            process.join()
+        return dict(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--widgets", type=int, default=1000000)
+    parser.add_argument("--walk-pages", type=int, default=1000)
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args()
+    write_report("export", run(args.widgets, args.walk_pages), args.out)
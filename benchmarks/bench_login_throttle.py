@@ -0,0 +1,125 @@
+"""Load test: legitimate login latency during a credential-stuffing burst.
+
+The app is served by a local threaded WSGI server in its own process. Attacker
+processes send logins with wrong passwords from a handful of loopback client
+addresses while legitimate users log in, one at a time, from another address.
+The legitimate latency is measured with no attack, with an attack and no
+throttle, and with an attack and the login throttle enabled.
+
+Usage: python -m benchmarks.bench_login_throttle [--attackers N] [--logins N]
+"""
+import argparse
+import multiprocessing
+import time
+from http.client import HTTPConnection
+from urllib.parse import urlencode
+
+from flask_api_tutorial import db
+from flask_api_tutorial.models.user import User
+from benchmarks.util import (
+    start_server_process,
+    stop_server_process,
+    summarize,
+    write_report,
+)
+
+LEGIT_EMAIL = "legit{}@email.com"
+VICTIM_EMAIL = "victim@email.com"
+PASSWORD = "benchmark"
+LOGIN_URL = "/api/v1/auth/login"
+FORM_HEADERS = {"Content-Type": "application/x-www-form-urlencoded"}
+
+
+def seed_users(num_logins):
+    emails = [LEGIT_EMAIL.format(i) for i in range(num_logins)] + [VICTIM_EMAIL]
+    for email in emails:
+        db.session.add(User(email=email, password=PASSWORD))
+    db.session.commit()
+
+
+def post_login(source_addr, port, email, password):
+    conn = HTTPConnection("127.0.0.1", port, source_address=(source_addr, 0))
+    body = urlencode(dict(email=email, password=password))
+    conn.request("POST", LOGIN_URL, body=body, headers=FORM_HEADERS)
+    status = conn.getresponse().status
+    conn.close()
+    return status
+
+
+def attack(port, source_addr, stop):
+    while not stop.is_set():
+        post_login(source_addr, port, VICTIM_EMAIL, "guess")
+
+
+def legit_logins(port, num_logins, interval):
+    durations = []
+    for i in range(num_logins):
+        start = time.perf_counter()
+        status = post_login("127.0.0.2", port, LEGIT_EMAIL.format(i), PASSWORD)
+        durations.append(time.perf_counter() - start)
+        assert status == 200, status
+        time.sleep(interval)
+    return durations
+
+
+def run_scenario(port, num_attackers, num_logins, interval, warmup, throttle, rounds):
+    stop = multiprocessing.Event()
+    server = start_server_process(
+        port,
+        setup=seed_users,
+        setup_args=(num_logins,),
+        BCRYPT_LOG_ROUNDS=rounds,
+        LOGIN_THROTTLE_ENABLED=throttle,
+    )
+    attackers = [
+        multiprocessing.Process(
+            target=attack, args=(port, f"127.0.0.{10 + i % 4}", stop), daemon=True
+        )
+        for i in range(num_attackers)
+    ]
+    for process in attackers:
+        process.start()
+    try:
+        time.sleep(warmup if attackers else 0)
+        durations = legit_logins(port, num_logins, interval)
+    finally:
+        stop.set()
+        for process in attackers:
+            process.join()
+        stop_server_process(server)
+    return summarize(durations)
+
+
+def run(port, num_attackers, num_logins, interval, warmup, log_rounds):
+    scenarios = dict(
+        no_attack=(0, True),
+        attack_no_throttle=(num_attackers, False),
+        attack_throttle=(num_attackers, True),
+    )
+    return {
+        name: run_scenario(
+            port + i, attackers, num_logins, interval, warmup, throttle, log_rounds
+        )
+        for i, (name, (attackers, throttle)) in enumerate(scenarios.items())
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument("--attackers", type=int, default=8)
+    parser.add_argument("--logins", type=int, default=50)
+    parser.add_argument("--interval", type=float, default=0.05)
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--log-rounds", type=int, default=10)
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args()
+    results = run(
+        args.port,
+        args.attackers,
+        args.logins,
+        args.interval,
+        args.warmup,
+        args.log_rounds,
+    )
+    write_report("login_throttle", results, args.out)
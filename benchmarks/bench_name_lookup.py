@@ -0,0 +1,71 @@
+"""Compare case-insensitive widget lookups by lower(name) and by the name_key index.
+
+Widgets are looked up by a name that differs in case from the stored name,
+by comparing lower(name) (which cannot use an index) and by the normalized
+name_key column (one probe of its unique index). GET /widgets/{name} is also
+timed with a name in upper case.
+
+Usage: python -m benchmarks.bench_name_lookup [--widgets 1000000]
+"""
+import argparse
+import itertools
+
+from sqlalchemy import func
+
+from flask_api_tutorial.models.widget import Widget
+from benchmarks.bench_pagination import seed_widgets
+from benchmarks.util import create_bench_app, summarize, time_calls, write_report
+
+
+def widget_names(num_widgets, count=100):
+    step = max(1, num_widgets // count)
+    return itertools.cycle(
+        f"WIDGET-{i:08d}" for i in range(num_widgets // (2 * count), num_widgets, step)
+    )
+
+
+def measure_query(lookup, num_widgets, iterations):
+    names = widget_names(num_widgets)
+
+    def query():
+        assert lookup(next(names)) is not None
+
+    return summarize(time_calls(query, iterations))
+
+
+def measure_request(client, headers, num_widgets, iterations):
+    names = widget_names(num_widgets)
+
+    def request():
+        response = client.get(f"/api/v1/widgets/{next(names)}", headers=headers)
+        assert response.status_code == 200, response.data
+
+    return summarize(time_calls(request, iterations))
+
+
+def lookup_by_lower_name(name):
+    return Widget.query.filter(func.lower(Widget.name) == name.lower()).first()
+
+
+def run(num_widgets, iterations):
+    app = create_bench_app(TESTING=False, TOKEN_EXPIRE_MINUTES=60)
+    with app.app_context():
+        token = seed_widgets(num_widgets)
+        headers = {"Authorization": f"Bearer {token}"}
+        return dict(
+            lower_name_scan=measure_query(lookup_by_lower_name, num_widgets, iterations),
+            name_key_index=measure_query(Widget.find_by_name, num_widgets, iterations),
+            retrieve_widget=measure_request(
+                app.test_client(), headers, num_widgets, iterations
+            ),
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--widgets", type=int, default=1000000)
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args()
+    results = run(args.widgets, args.iterations)
+    write_report("name_lookup", results, args.out)
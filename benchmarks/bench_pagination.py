@@ -0,0 +1,94 @@
+"""Compare offset (page number) and keyset (cursor) pagination of GET /widgets.
+
+For each table size, pages near the start, middle and end of the widget table
+are requested by page number (with and without the total item count) and by
+cursor, sorted by name.
+
+Usage: python -m benchmarks.bench_pagination [--sizes 10000,100000,1000000]
+"""
+import argparse
+from datetime import datetime, timedelta
+
+from flask_api_tutorial import bcrypt, db
+from flask_api_tutorial.models.user import User
+from flask_api_tutorial.models.widget import Widget
+from flask_api_tutorial.util.pagination import encode_cursor
+from benchmarks.util import create_bench_app, summarize, time_calls, write_report
+
+DEPTHS = {"first": 0.0, "middle": 0.5, "last": 0.999}
+
+
+def seed_widgets(num_widgets, chunk_size=50000):
+    password_hash = bcrypt.generate_password_hash("benchmark").decode("utf-8")
+    user = User(email="admin@email.com", password_hash=password_hash, admin=True)
+    db.session.add(user)
+    db.session.commit()
+    now = datetime.utcnow()
+    for start in range(0, num_widgets, chunk_size):
+        rows = [
+            dict(
+                name=f"widget-{i:08d}",
+                info_url=f"https://www.widget{i}.com",
+                created_at=now,
+                deadline=now + timedelta(days=30),
+                owner_id=user.id,
+            )
+            for i in range(start, min(start + chunk_size, num_widgets))
+        ]
+        db.session.bulk_insert_mappings(Widget, rows)
+    db.session.commit()
+    return user.encode_access_token().decode()
+
+
+def measure(client, headers, query_string, iterations):
+    def request():
+        response = client.get(
+            "/api/v1/widgets", query_string=query_string, headers=headers
+        )
+        assert response.status_code == 200, response.data
+
+    return summarize(time_calls(request, iterations))
+
+
+def run(sizes, per_page, iterations):
+    results = {}
+    for num_widgets in sizes:
+        app = create_bench_app(TESTING=False, TOKEN_EXPIRE_MINUTES=60)
+        with app.app_context():
+            token = seed_widgets(num_widgets)
+            client = app.test_client()
+            headers = {"Authorization": f"Bearer {token}"}
+            size_results = {}
+            for label, depth in DEPTHS.items():
+                offset = int(num_widgets * depth) // per_page * per_page
+                page = dict(page=offset // per_page + 1, per_page=per_page)
+                query_string = dict(sort="name", per_page=per_page)
+                if offset:
+                    widget = (
+                        Widget.query.order_by(Widget.name).offset(offset - 1).first()
+                    )
+                    position = [widget.name, widget.id]
+                    query_string["cursor"] = encode_cursor(
+                        dict(sort="name", after=position)
+                    )
+                size_results[label] = dict(
+                    offset=offset,
+                    page_number=measure(client, headers, page, iterations),
+                    page_number_without_total=measure(
+                        client, headers, dict(page, include_total="false"), iterations
+                    ),
+                    cursor=measure(client, headers, query_string, iterations),
+                )
+            results[str(num_widgets)] = size_results
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--per-page", type=int, default=10)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",")]
+    write_report("pagination", run(sizes, args.per_page, args.iterations), args.out)
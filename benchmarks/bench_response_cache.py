@@ -0,0 +1,67 @@
+"""Measure GET /widgets with and without the response cache.
+
+A mix of requests for the first few pages is sent with the cache disabled,
+with the cache enabled and no writes, and with the cache enabled while a
+widget is updated every --write-every requests (so that cached pages are
+invalidated and rebuilt).
+
+Usage: python -m benchmarks.bench_response_cache [--widgets 10000]
+"""
+import argparse
+import itertools
+
+from flask_api_tutorial import response_cache
+from benchmarks.bench_pagination import seed_widgets
+from benchmarks.util import create_bench_app, summarize, time_calls, write_report
+
+PAGES = [dict(page=1, per_page=10), dict(page=2, per_page=10), dict(page=1, per_page=50)]
+
+
+def measure(app, token, iterations, write_every=0):
+    client = app.test_client()
+    headers = {"Authorization": f"Bearer {token}"}
+    pages = itertools.cycle(PAGES)
+    counter = itertools.count(1)
+
+    def request():
+        n = next(counter)
+        if write_every and n % write_every == 0:
+            response = client.put(
+                "/api/v1/widgets/widget-00000000",
+                data=dict(info_url=f"https://www.update{n}.com", deadline="2099-12-31"),
+                headers=headers,
+            )
+            assert response.status_code == 200, response.data
+        response = client.get(
+            "/api/v1/widgets", query_string=next(pages), headers=headers
+        )
+        assert response.status_code == 200, response.data
+
+    return summarize(time_calls(request, iterations))
+
+
+def run(num_widgets, iterations, write_every):
+    app = create_bench_app(TESTING=False, TOKEN_EXPIRE_MINUTES=60)
+    with app.app_context():
+        token = seed_widgets(num_widgets)
+    results = {}
+    scenarios = dict(
+        uncached=(False, 0), cached=(True, 0), cached_with_writes=(True, write_every)
+    )
+    for label, (enabled, writes) in scenarios.items():
+        app.config["RESPONSE_CACHE_ENABLED"] = enabled
+        with app.app_context():
+            response_cache.clear()
+            results[label] = measure(app, token, iterations, writes)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--widgets", type=int, default=10000)
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument("--write-every", type=int, default=50)
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args()
+    results = run(args.widgets, args.iterations, args.write_every)
+    write_report("response_cache", results, args.out)
@@ -0,0 +1,106 @@
+"""Compare GET /widgets/search (SQLite FTS5) with a naive LIKE '%q%' scan.
+
+Widget names are made of a color, a shape and a sequence number (e.g.
+cobalt-spiral-0004242), so a search can match an eighth of the table (a
+color), more widgets than WIDGET_SEARCH_RANK_LIMIT (which are not ranked), a
+few rows (a number prefix) or a single row. For each query, the search
+endpoint is timed along with a query for the same page of widgets whose
+name contains q, ordered by name.
+
+Usage: python -m benchmarks.bench_search [--widgets 1000000]
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+
+from flask_api_tutorial import db
+from flask_api_tutorial.models.widget import Widget
+from benchmarks.bench_pagination import seed_widgets
+from benchmarks.util import create_bench_app, summarize, time_calls, write_report
+
+COLORS = ["amber", "cobalt", "coral", "ivory", "jade", "lilac", "ochre", "rust"]
+SHAPES = ["arc", "cube", "disc", "helix", "prism", "ring", "spiral", "wedge"]
+QUERIES = {
+    "common_word": "cobalt",
+    "two_words": "cobalt spir",
+    "short_number_prefix": "0004",
+    "number_prefix": "000424",
+    "exact_name": "cobalt-spiral-0004242",
+    "no_match": "zzz",
+}
+
+
+def widget_name(i):
+    color = COLORS[i % len(COLORS)]
+    shape = SHAPES[i // len(COLORS) % len(SHAPES)]
+    return f"{color}-{shape}-{i:07d}"
+
+
+def seed_search_widgets(num_widgets, chunk_size=50000):
+    token = seed_widgets(0)
+    owner_id = Widget.query.session.execute("SELECT id FROM site_user").scalar()
+    now = datetime.utcnow()
+    for start in range(0, num_widgets, chunk_size):
+        rows = [
+            dict(
+                name=widget_name(i),
+                info_url=f"https://www.widget{i}.com",
+                created_at=now,
+                deadline=now + timedelta(days=30),
+                owner_id=owner_id,
+            )
+            for i in range(start, min(start + chunk_size, num_widgets))
+        ]
+        db.session.bulk_insert_mappings(Widget, rows)
+    db.session.commit()
+    return token
+
+
+def measure_search(client, headers, q, per_page, iterations):
+    def request():
+        response = client.get(
+            "/api/v1/widgets/search",
+            query_string=dict(q=q, per_page=per_page),
+            headers=headers,
+        )
+        assert response.status_code == 200, response.data
+
+    return summarize(time_calls(request, iterations))
+
+
+def measure_like(q, per_page, iterations):
+    def query():
+        Widget.query.filter(Widget.name.like(f"%{q}%")).order_by(Widget.name).limit(
+            per_page + 1
+        ).all()
+
+    return summarize(time_calls(query, iterations))
+
+
+def run(num_widgets, per_page, iterations):
+    app = create_bench_app(TESTING=False, TOKEN_EXPIRE_MINUTES=60)
+    results = {}
+    with app.app_context():
+        start = time.perf_counter()
+        token = seed_search_widgets(num_widgets)
+        results["seed_seconds"] = round(time.perf_counter() - start, 2)
+        client = app.test_client()
+        headers = {"Authorization": f"Bearer {token}"}
+        for label, q in QUERIES.items():
+            results[label] = dict(
+                q=q,
+                fts_search=measure_search(client, headers, q, per_page, iterations),
+                like_scan=measure_like(q, per_page, iterations),
+            )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--widgets", type=int, default=1000000)
+    parser.add_argument("--per-page", type=int, default=10)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args()
+    results = run(args.widgets, args.per_page, args.iterations)
+    write_report("search", results, args.out)
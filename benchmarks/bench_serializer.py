@@ -0,0 +1,73 @@
+"""Compare flask_restx.marshal with the compiled widget serializers.
+
+Usage: python -m benchmarks.bench_serializer [--per-page 100] [--iterations N]
+"""
+import argparse
+from datetime import datetime, timedelta
+
+from flask_restx import marshal
+
+from flask_api_tutorial import db
+from flask_api_tutorial.api.widgets.dto import (
+    pagination_model,
+    serialize_pagination,
+    serialize_widget,
+    widget_model,
+)
+from flask_api_tutorial.models.user import User
+from flask_api_tutorial.models.widget import Widget
+from benchmarks.util import create_bench_app, summarize, time_calls, write_report
+
+
+def seed_widgets(num_widgets):
+    user = User(email="admin@email.com", password="benchmark", admin=True)
+    db.session.add(user)
+    db.session.commit()
+    now = datetime.utcnow()
+    rows = [
+        dict(
+            name=f"widget-{i}",
+            info_url=f"https://www.widget{i}.com",
+            created_at=now,
+            deadline=now + timedelta(days=i % 60),
+            owner_id=user.id,
+        )
+        for i in range(num_widgets)
+    ]
+    db.session.bulk_insert_mappings(Widget, rows)
+    db.session.commit()
+
+
+def run(per_page, iterations):
+    app = create_bench_app(BCRYPT_LOG_ROUNDS=4)
+    with app.app_context(), app.test_request_context():
+        seed_widgets(per_page)
+        pagination = Widget.query.paginate(1, per_page, error_out=False)
+        widget = pagination.items[0]
+        results = dict(
+            page_marshal=time_calls(
+                lambda: marshal(pagination, pagination_model), iterations
+            ),
+            page_compiled=time_calls(
+                lambda: serialize_pagination(pagination), iterations
+            ),
+            widget_marshal=time_calls(lambda: marshal(widget, widget_model), iterations),
+            widget_compiled=time_calls(lambda: serialize_widget(widget), iterations),
+        )
+    results = {label: summarize(durations) for label, durations in results.items()}
+    for name in ("page", "widget"):
+        speedup = (
+            results[f"{name}_marshal"]["mean_ms"]
+            / results[f"{name}_compiled"]["mean_ms"]
+        )
+        results[f"{name}_speedup"] = round(speedup, 2)
+    return dict(per_page=per_page, **results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--per-page", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args()
+    write_report("serializer", run(args.per_page, args.iterations), args.out)
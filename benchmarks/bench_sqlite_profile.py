@@ -0,0 +1,124 @@
+"""Compare multi-process read/write throughput with and without the SQLite profile.
+
+Several worker processes share one SQLite database file, as gunicorn workers
+would. Each worker sends a mix of GET /widgets (reads) and POST /widgets
+(writes) requests for a fixed duration. The default profile uses SQLite's
+rollback journal and opens a new connection for every session, the production
+profile uses the SQLITE_PRAGMAS (WAL, synchronous=NORMAL, busy_timeout,
+mmap_size) and SQLITE_POOL_SIZE of ProductionConfig.
+
+Usage: python -m benchmarks.bench_sqlite_profile [--workers 1,4,8]
+"""
+import argparse
+import multiprocessing
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from flask_api_tutorial.config import ProductionConfig
+from benchmarks.bench_pagination import seed_widgets
+from benchmarks.util import create_bench_app, summarize, write_report
+
+BENCH_CONFIG = dict(TESTING=False, TOKEN_EXPIRE_MINUTES=60, RESPONSE_CACHE_ENABLED=False)
+PROFILES = dict(
+    default=dict(SQLITE_PRAGMAS={}, SQLITE_POOL_SIZE=0),
+    production=dict(
+        SQLITE_PRAGMAS=ProductionConfig.SQLITE_PRAGMAS,
+        SQLITE_POOL_SIZE=ProductionConfig.SQLITE_POOL_SIZE,
+    ),
+)
+
+
+def worker(db_path, profile, token, worker_id, write_ratio, duration, start, results):
+    app = create_bench_app(db_path=db_path, reset=False, **BENCH_CONFIG, **profile)
+    client = app.test_client()
+    headers = {"Authorization": f"Bearer {token}"}
+    durations = dict(read=[], write=[])
+    errors = 0
+    start.wait()
+    deadline = time.perf_counter() + duration
+    n = 0
+    while time.perf_counter() < deadline:
+        n += 1
+        began = time.perf_counter()
+        if random.random() < write_ratio:
+            kind = "write"
+            data = dict(
+                name=f"worker{worker_id}-{n}",
+                info_url="https://www.widget.com",
+                deadline="2099-12-31",
+            )
+            response = client.post("/api/v1/widgets", data=data, headers=headers)
+        else:
+            kind = "read"
+            page = random.randint(1, 50)
+            query_string = dict(page=page, per_page=10)
+            response = client.get(
+                "/api/v1/widgets", query_string=query_string, headers=headers
+            )
+        if response.status_code >= 400:
+            errors += 1
+        else:
+            durations[kind].append(time.perf_counter() - began)
+    results.put((durations, errors))
+
+
+def run_profile(profile_name, num_workers, num_widgets, write_ratio, duration):
+    db_path = Path(tempfile.mkdtemp()) / "benchmark.db"
+    profile = PROFILES[profile_name]
+    app = create_bench_app(db_path=db_path, **BENCH_CONFIG, **profile)
+    with app.app_context():
+        token = seed_widgets(num_widgets)
+    start = multiprocessing.Event()
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(
+            target=worker,
+            args=(db_path, profile, token, i, write_ratio, duration, start, results),
+        )
+        for i in range(num_workers)
+    ]
+    for process in processes:
+        process.start()
+    time.sleep(1)
+    start.set()
+    reads, writes, errors = [], [], 0
+    for _ in processes:
+        durations, worker_errors = results.get()
+        reads.extend(durations["read"])
+        writes.extend(durations["write"])
+        errors += worker_errors
+    for process in processes:
+        process.join()
+    return dict(
+        requests_per_sec=round((len(reads) + len(writes)) / duration, 1),
+        errors=errors,
+        reads=summarize(reads),
+        writes=summarize(writes),
+    )
+
+
+def run(worker_counts, num_widgets, write_ratio, duration):
+    results = {}
+    for num_workers in worker_counts:
+        results[f"{num_workers}_workers"] = {
+            profile_name: run_profile(
+                profile_name, num_workers, num_widgets, write_ratio, duration
+            )
+            for profile_name in PROFILES
+        }
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", default="1,4,8")
+    parser.add_argument("--widgets", type=int, default=10000)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args()
+    worker_counts = [int(count) for count in args.workers.split(",")]
+    results = run(worker_counts, args.widgets, args.write_ratio, args.duration)
+    write_report("sqlite_profile", results, args.out)
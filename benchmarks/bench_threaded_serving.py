@@ -0,0 +1,92 @@
+"""Compare throughput of single-threaded and multi-threaded WSGI serving.
+
+Concurrent clients, each logged in as a different user, send GET requests to
+/api/v1/auth/user for a fixed duration against a local server started with and
+without threads.
+
+Usage: python -m benchmarks.bench_threaded_serving [--clients N] [--duration S]
+"""
+import argparse
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPConnection
+
+from flask_api_tutorial import db
+from flask_api_tutorial.models.user import User
+from benchmarks.util import (
+    create_bench_app,
+    start_server_process,
+    stop_server_process,
+    summarize,
+    write_report,
+)
+
+EMAIL = "user{}@email.com"
+PASSWORD = "benchmark"
+
+
+def seed_users(num_clients):
+    """Create one user per client, return an access token for each user."""
+    users = [User(email=EMAIL.format(i), password=PASSWORD) for i in range(num_clients)]
+    db.session.add_all(users)
+    db.session.commit()
+    return [user.encode_access_token().decode() for user in users]
+
+
+def client_loop(port, access_token, deadline):
+    headers = {"Authorization": f"Bearer {access_token}"}
+    conn = HTTPConnection("127.0.0.1", port)
+    durations = []
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        conn.request("GET", "/api/v1/auth/user", headers=headers)
+        response = conn.getresponse()
+        response.read()
+        durations.append(time.perf_counter() - start)
+        if response.getheader("Connection", "").lower() == "close":
+            conn.close()
+            conn = HTTPConnection("127.0.0.1", port)
+    conn.close()
+    return durations
+
+
+def run_scenario(port, threaded, num_clients, duration):
+    config = dict(TESTING=False, TOKEN_EXPIRE_MINUTES=15)
+    db_path = f"{tempfile.mkdtemp()}/benchmark.db"
+    app = create_bench_app(db_path=db_path, **config)
+    with app.app_context():
+        tokens = seed_users(num_clients)
+    server = start_server_process(
+        port, threaded=threaded, db_path=db_path, reset=False, **config
+    )
+    try:
+        deadline = time.perf_counter() + duration
+        with ThreadPoolExecutor(max_workers=num_clients) as executor:
+            futures = [
+                executor.submit(client_loop, port, token, deadline) for token in tokens
+            ]
+            durations = [d for future in futures for d in future.result()]
+    finally:
+        stop_server_process(server)
+    result = summarize(durations)
+    result["requests_per_sec"] = round(len(durations) / duration, 2)
+    return result
+
+
+def run(port, num_clients, duration):
+    return dict(
+        single_threaded=run_scenario(port, False, num_clients, duration),
+        threaded=run_scenario(port + 1, True, num_clients, duration),
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=5065)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args()
+    results = run(args.port, args.clients, args.duration)
+    write_report("threaded_serving", results, args.out)
@@ -0,0 +1,57 @@
+"""Compare blacklist lookups with and without the in-process blacklist cache.
+
+Usage: python -m benchmarks.bench_token_blacklist [--rows N] [--iterations N]
+"""
+import argparse
+import time
+from uuid import uuid4
+
+from flask_api_tutorial import blacklist_cache, db
+from flask_api_tutorial.models.token_blacklist import BlacklistedToken
+from benchmarks.util import create_bench_app, summarize, time_calls, write_report
+
+HOT_TOKENS = 100
+
+
+def seed_blacklist(num_rows):
+    expires_at = time.time() + 3600
+    tokens = [f"{uuid4().hex}.{uuid4().hex}.{uuid4().hex}" for _ in range(num_rows)]
+    for token in tokens:
+        db.session.add(BlacklistedToken(token, expires_at))
+    db.session.commit()
+    return tokens
+
+
+def run(num_rows, iterations):
+    app = create_bench_app()
+    results = {}
+    with app.app_context():
+        blacklisted = seed_blacklist(num_rows)
+        valid_tokens = [f"{uuid4().hex}.{uuid4().hex}" for _ in range(iterations)]
+        for enabled in (False, True):
+            app.config["BLACKLIST_CACHE_ENABLED"] = enabled
+            blacklist_cache.reset()
+            label = "cache" if enabled else "query"
+            valid_iter = iter(valid_tokens)
+            results[f"{label}_not_blacklisted"] = summarize(
+                time_calls(
+                    lambda: BlacklistedToken.check_blacklist(next(valid_iter)),
+                    iterations,
+                )
+            )
+            hit_iter = iter(blacklisted[i % HOT_TOKENS] for i in range(iterations))
+            results[f"{label}_blacklisted"] = summarize(
+                time_calls(
+                    lambda: BlacklistedToken.check_blacklist(next(hit_iter)), iterations
+                )
+            )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args()
+    write_report("token_blacklist", run(args.rows, args.iterations), args.out)
@@ -0,0 +1,57 @@
+"""Measure the per-request saving of the verified token payload cache.
+
+Usage: python -m benchmarks.bench_token_cache [--requests N]
+"""
+import argparse
+
+from flask_api_tutorial import token_cache
+from flask_api_tutorial.api.auth.decorators import _check_access_token
+from benchmarks.util import create_bench_app, summarize, time_calls, write_report
+
+EMAIL = "benchmark@email.com"
+PASSWORD = "benchmark"
+
+
+def get_access_token(client):
+    form = dict(email=EMAIL, password=PASSWORD)
+    client.post("/api/v1/auth/register", data=form)
+    response = client.post("/api/v1/auth/login", data=form)
+    return response.json["access_token"]
+
+
+def run(num_requests):
+    results = {}
+    for enabled in (False, True):
+        app = create_bench_app(
+            TESTING=False, TOKEN_EXPIRE_MINUTES=15, TOKEN_CACHE_ENABLED=enabled
+        )
+        client = app.test_client()
+        with app.app_context():
+            headers = dict(Authorization=f"Bearer {get_access_token(client)}")
+            durations = time_calls(
+                lambda: client.get("/api/v1/auth/user", headers=headers), num_requests
+            )
+            label = "cache" if enabled else "no_cache"
+            results[label] = summarize(durations)
+            results[label]["token_cache"] = token_cache.stats()
+            with app.test_request_context(headers=headers):
+                durations = time_calls(
+                    lambda: _check_access_token(admin_only=False), num_requests
+                )
+                results[f"{label}_token_check_only"] = summarize(durations)
+    saving = results["no_cache"]["mean_ms"] - results["cache"]["mean_ms"]
+    results["mean_saving_per_request_ms"] = round(saving, 4)
+    check_saving = (
+        results["no_cache_token_check_only"]["mean_ms"]
+        - results["cache_token_check_only"]["mean_ms"]
+    )
+    results["mean_saving_per_token_check_ms"] = round(check_saving, 4)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args()
+    write_report("token_cache", run(args.requests), args.out)
@@ -0,0 +1,124 @@
+"""Shared functions for benchmark scripts."""
+import json
+import multiprocessing
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from werkzeug.serving import make_server
+
+from flask_api_tutorial import create_app, db
+
+
+def create_bench_app(config_name="testing", db_path=None, reset=True, **config):
+    """Create an app bound to a scratch SQLite database with all tables created.
+
+    Pass the db_path of an existing benchmark database with reset=False to
+    serve data that was seeded by another process.
+    """
+    if not db_path:
+        db_path = Path(tempfile.mkdtemp()) / "benchmark.db"
+    app = create_app(config_name)
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{db_path}"
+    app.config.update(config)
+    if reset:
+        with app.app_context():
+            db.drop_all()
+            db.create_all()
+    return app
+
+
+def _serve(port, threaded, setup, setup_args, config, ready):
+    app = create_bench_app(**config)
+    if setup:
+        with app.app_context():
+            setup(*setup_args)
+    server = make_server("127.0.0.1", port, app, threaded=threaded)
+    ready.set()
+    server.serve_forever()
+
+
+def start_server_process(port, threaded=True, setup=None, setup_args=(), **config):
+    """Serve a benchmark app from a local WSGI server running in a child process.
+
+    setup(*setup_args) is called within an app context before the server starts,
+    it must be a module-level function so that it can be sent to the child.
+    Return the process once the server is accepting connections.
+    """
+    ready = multiprocessing.Event()
+    process = multiprocessing.Process(
+        target=_serve,
+        args=(port, threaded, setup, setup_args, config, ready),
+        daemon=True,
+    )
+    process.start()
+    ready.wait()
+    return process
+
+
+def stop_server_process(process):
+    """Stop a server started by start_server_process."""
+    process.terminate()
+    process.join()
+
+
+def time_calls(func, iterations, *args, **kwargs):
+    """Call func the specified number of times, return list of durations (seconds)."""
+    durations = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func(*args, **kwargs)
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of a list of values that is already sorted."""
+    if not sorted_values:
+        return 0.0
+    rank = max(
+        0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1)
+    )
+    return sorted_values[rank]
+
+
+def summarize(durations):
+    """Latency percentiles (milliseconds) and throughput for a list of durations."""
+    values = sorted(durations)
+    total = sum(values)
+    return dict(
+        count=len(values),
+        mean_ms=round(total / len(values) * 1000, 4) if values else 0.0,
+        p50_ms=round(percentile(values, 50) * 1000, 4),
+        p95_ms=round(percentile(values, 95) * 1000, 4),
+        p99_ms=round(percentile(values, 99) * 1000, 4),
+        ops_per_sec=round(len(values) / total, 2) if total else 0.0,
+    )
+
+
+def git_commit():
+    """Hash of the commit checked out in the working tree (if any)."""
+    try:
+        output = subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.decode().strip()
+
+
+def write_report(name, results, out=None):
+    """Print benchmark results as JSON, optionally writing them to a file."""
+    report = dict(
+        benchmark=name,
+        commit=git_commit(),
+        python=sys.version.split()[0],
+        results=results,
+    )
+    report_json = json.dumps(report, indent=2)
+    if out:
+        Path(out).write_text(report_json)
+    print(report_json)
+    return report
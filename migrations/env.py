@@ -35,6 +35,17 @@ target_metadata = current_app.extensions["migrate"].db.metadata
 # ... etc.
 
 
+def include_object(object, name, type_, reflected, compare_to):
+    """Exclude the widget_search full-text index (and its shadow tables), which
+    are created with raw SQL and are not part of the models' metadata, and the
+    sqlite_sequence table SQLite keeps for AUTOINCREMENT primary keys.
+    """
+    return not (
+        type_ == "table"
+        and (name.startswith("widget_search") or name == "sqlite_sequence")
+    )
+
+
 def run_migrations_offline():
     """Run migrations in 'offline' mode.
 
@@ -48,7 +59,12 @@ def run_migrations_offline():
 
     """
     url = config.get_main_option("sqlalchemy.url")
-    context.configure(url=url, target_metadata=target_metadata, literal_binds=True)
+    context.configure(
+        url=url,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        include_object=include_object,
+    )
 
     with context.begin_transaction():
         context.run_migrations()
@@ -83,6 +99,7 @@ def run_migrations_online():
             connection=connection,
             target_metadata=target_metadata,
             process_revision_directives=process_revision_directives,
+            include_object=include_object,
             **current_app.extensions["migrate"].configure_args,
         )
 
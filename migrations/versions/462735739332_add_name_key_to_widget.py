@@ -0,0 +1,94 @@
+"""add name_key to widget
+
+Revision ID: 462735739332
+Revises: 68aa5abc7773
+Create Date: 2026-10-17 13:46:23.602557
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "462735739332"
+down_revision = "68aa5abc7773"
+branch_labels = None
+depends_on = None
+
+widget_table = sa.table(
+    "widget", sa.column("id"), sa.column("name"), sa.column("name_key")
+)
+
+
+def upgrade():
+    # Keys are checked before the schema is changed, DDL is not transactional on
+    # SQLite, so a failed upgrade would leave the new column behind.
+    name_keys = _name_keys()
+    op.add_column("widget", sa.Column("name_key", sa.String(length=100), nullable=True))
+    if name_keys:
+        op.get_bind().execute(
+            widget_table.update()
+            .where(widget_table.c.id == sa.bindparam("b_id"))
+            .values(name_key=sa.bindparam("b_name_key")),
+            name_keys,
+        )
+    with op.batch_alter_table("widget") as batch_op:
+        batch_op.alter_column(
+            "name_key", existing_type=sa.String(length=100), nullable=False
+        )
+        batch_op.create_index(
+            batch_op.f("ix_widget_name_key"), ["name_key"], unique=True
+        )
+    _create_search_triggers()
+
+
+def downgrade():
+    with op.batch_alter_table("widget") as batch_op:
+        batch_op.drop_index(batch_op.f("ix_widget_name_key"))
+        batch_op.drop_column("name_key")
+    _create_search_triggers()
+
+
+def _name_keys():
+    rows = op.get_bind().execute(sa.select([widget_table.c.id, widget_table.c.name]))
+    # Same as normalize_widget_name() when this revision was written.
+    name_keys = [
+        dict(b_id=widget_id, b_name_key=name.lower()) for widget_id, name in rows
+    ]
+    names = {}
+    for row in name_keys:
+        names.setdefault(row["b_name_key"], []).append(row["b_id"])
+    duplicates = sorted(key for key, ids in names.items() if len(ids) > 1)
+    if duplicates:
+        raise RuntimeError(
+            "Widget names must be unique regardless of case, rename the widgets "
+            f"whose names match (ignoring case) any of: {', '.join(duplicates)}."
+        )
+    return name_keys
+
+
+def _create_search_triggers():
+    # Batch mode rebuilds the widget table on SQLite, which drops its triggers.
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS widget_search_insert AFTER INSERT ON widget "
+        "BEGIN "
+        "INSERT INTO widget_search (rowid, name) VALUES (new.id, new.name); "
+        "END"
+    )
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS widget_search_delete AFTER DELETE ON widget "
+        "BEGIN "
+        "INSERT INTO widget_search (widget_search, rowid, name) "
+        "VALUES ('delete', old.id, old.name); "
+        "END"
+    )
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS widget_search_update "
+        "AFTER UPDATE OF name ON widget BEGIN "
+        "INSERT INTO widget_search (widget_search, rowid, name) "
+        "VALUES ('delete', old.id, old.name); "
+        "INSERT INTO widget_search (rowid, name) VALUES (new.id, new.name); "
+        "END"
+    )
+    op.execute("INSERT INTO widget_search (widget_search) VALUES ('rebuild')")
@@ -0,0 +1,52 @@
+"""add widget_search full-text index
+
+Revision ID: 68aa5abc7773
+Revises: 5bf08fc2d183
+Create Date: 2026-10-17 13:31:29.738102
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "68aa5abc7773"
+down_revision = "5bf08fc2d183"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # FTS5 is specific to SQLite, other databases search with LIKE instead.
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    op.execute(
+        "CREATE VIRTUAL TABLE widget_search USING fts5("
+        "name, content='widget', content_rowid='id', prefix='2 3')"
+    )
+    op.execute(
+        "CREATE TRIGGER widget_search_insert AFTER INSERT ON widget BEGIN "
+        "INSERT INTO widget_search (rowid, name) VALUES (new.id, new.name); "
+        "END"
+    )
+    op.execute(
+        "CREATE TRIGGER widget_search_delete AFTER DELETE ON widget BEGIN "
+        "INSERT INTO widget_search (widget_search, rowid, name) "
+        "VALUES ('delete', old.id, old.name); "
+        "END"
+    )
+    op.execute(
+        "CREATE TRIGGER widget_search_update AFTER UPDATE OF name ON widget BEGIN "
+        "INSERT INTO widget_search (widget_search, rowid, name) "
+        "VALUES ('delete', old.id, old.name); "
+        "INSERT INTO widget_search (rowid, name) VALUES (new.id, new.name); "
+        "END"
+    )
+    op.execute("INSERT INTO widget_search (widget_search) VALUES ('rebuild')")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    op.execute("DROP TRIGGER IF EXISTS widget_search_update")
+    op.execute("DROP TRIGGER IF EXISTS widget_search_delete")
+    op.execute("DROP TRIGGER IF EXISTS widget_search_insert")
+    op.execute("DROP TABLE IF EXISTS widget_search")
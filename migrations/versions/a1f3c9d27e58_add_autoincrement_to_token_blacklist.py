@@ -0,0 +1,30 @@
+"""add autoincrement to token_blacklist
+
+Revision ID: a1f3c9d27e58
+Revises: 462735739332
+Create Date: 2026-10-17 15:12:40.318206
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "a1f3c9d27e58"
+down_revision = "462735739332"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Blacklist caches load rows with an id above the last one they have seen,
+    # SQLite only stops reusing the ids of deleted rows with AUTOINCREMENT.
+    with op.batch_alter_table(
+        "token_blacklist",
+        recreate="always",
+        table_kwargs={"sqlite_autoincrement": True},
+    ):
+        pass
+
+
+def downgrade():
+    with op.batch_alter_table("token_blacklist", recreate="always"):
+        pass
@@ -0,0 +1,58 @@
+"""add autoincrement to widget
+
+Revision ID: b85d2e6f9c13
+Revises: a1f3c9d27e58
+Create Date: 2026-10-17 15:41:08.552913
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "b85d2e6f9c13"
+down_revision = "a1f3c9d27e58"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # ETags are made of the id and version of a widget, SQLite only stops
+    # reusing the ids of deleted widgets with AUTOINCREMENT.
+    with op.batch_alter_table(
+        "widget", recreate="always", table_kwargs={"sqlite_autoincrement": True}
+    ):
+        pass
+    _create_search_triggers()
+
+
+def downgrade():
+    with op.batch_alter_table("widget", recreate="always"):
+        pass
+    _create_search_triggers()
+
+
+def _create_search_triggers():
+    # Batch mode rebuilds the widget table on SQLite, which drops its triggers.
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS widget_search_insert AFTER INSERT ON widget "
+        "BEGIN "
+        "INSERT INTO widget_search (rowid, name) VALUES (new.id, new.name); "
+        "END"
+    )
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS widget_search_delete AFTER DELETE ON widget "
+        "BEGIN "
+        "INSERT INTO widget_search (widget_search, rowid, name) "
+        "VALUES ('delete', old.id, old.name); "
+        "END"
+    )
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS widget_search_update "
+        "AFTER UPDATE OF name ON widget BEGIN "
+        "INSERT INTO widget_search (widget_search, rowid, name) "
+        "VALUES ('delete', old.id, old.name); "
+        "INSERT INTO widget_search (rowid, name) VALUES (new.id, new.name); "
+        "END"
+    )
+    op.execute("INSERT INTO widget_search (widget_search) VALUES ('rebuild')")
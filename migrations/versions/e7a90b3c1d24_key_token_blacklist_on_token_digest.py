@@ -0,0 +1,69 @@
+"""key token_blacklist on token_digest
+
+Revision ID: e7a90b3c1d24
+Revises: c3d1a2f4e5b6
+Create Date: 2026-10-17 11:03:27.094417
+
+"""
+import hashlib
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "e7a90b3c1d24"
+down_revision = "c3d1a2f4e5b6"
+branch_labels = None
+depends_on = None
+
+token_blacklist = sa.table(
+    "token_blacklist",
+    sa.column("id", sa.Integer),
+    sa.column("token", sa.String),
+    sa.column("token_digest", sa.String),
+)
+
+
+def upgrade():
+    with op.batch_alter_table("token_blacklist") as batch_op:
+        batch_op.add_column(
+            sa.Column("token_digest", sa.String(length=64), nullable=True)
+        )
+
+    # Tokens blacklisted before this revision remain blacklisted: the digest of
+    # each stored token is computed here, the same way new rows are keyed.
+    connection = op.get_bind()
+    rows = connection.execute(sa.select([token_blacklist.c.id, token_blacklist.c.token]))
+    for row_id, token in rows.fetchall():
+        token_digest = hashlib.sha256(token.encode("ascii")).hexdigest()
+        connection.execute(
+            token_blacklist.update()
+            .where(token_blacklist.c.id == row_id)
+            .values(token_digest=token_digest)
+        )
+
+    with op.batch_alter_table("token_blacklist", recreate="always") as batch_op:
+        batch_op.alter_column(
+            "token_digest", existing_type=sa.String(length=64), nullable=False
+        )
+        batch_op.create_unique_constraint(
+            "uq_token_blacklist_token_digest", ["token_digest"]
+        )
+        batch_op.drop_column("token")
+
+
+def downgrade():
+    # The original tokens cannot be recovered from their digests, the digest is
+    # stored in the token column so existing rows still satisfy its constraints.
+    with op.batch_alter_table("token_blacklist") as batch_op:
+        batch_op.add_column(sa.Column("token", sa.String(length=500), nullable=True))
+    connection = op.get_bind()
+    connection.execute(
+        token_blacklist.update().values(token=token_blacklist.c.token_digest)
+    )
+    with op.batch_alter_table("token_blacklist", recreate="always") as batch_op:
+        batch_op.alter_column(
+            "token", existing_type=sa.String(length=500), nullable=False
+        )
+        batch_op.create_unique_constraint("uq_token_blacklist_token", ["token"])
+        batch_op.drop_column("token_digest")
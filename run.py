@@ -4,9 +4,12 @@ import os
 import click
 
 from flask_api_tutorial import create_app, db
+from flask_api_tutorial.models.collection_state import CollectionState
 from flask_api_tutorial.models.token_blacklist import BlacklistedToken
 from flask_api_tutorial.models.user import User
 from flask_api_tutorial.models.widget import Widget
+from flask_api_tutorial.util.bcrypt_util import calibrate_log_rounds
+from flask_api_tutorial.util.periodic import PeriodicTask
 
 app = create_app(os.getenv("FLASK_ENV", "development"))
 
@@ -18,6 +21,7 @@ def shell():
         "User": User,
         "BlacklistedToken": BlacklistedToken,
         "Widget": Widget,
+        "CollectionState": CollectionState,
     }
 
 
@@ -40,3 +44,70 @@ def add_user(email, admin, password):
     message = f"Successfully added new {user_type}:\n {new_user}"
     click.secho(message, fg="blue", bold=True)
     return 0
+
+
+@app.cli.command("sweep-blacklist", short_help="delete expired blacklisted tokens")
+@click.option(
+    "--batch-size",
+    type=int,
+    default=None,
+    help="Rows deleted per commit  [default: BLACKLIST_SWEEP_BATCH_SIZE]",
+)
+@click.option(
+    "--interval",
+    type=int,
+    default=None,
+    help="Keep running, sweep every INTERVAL seconds  "
+    "[default: BLACKLIST_SWEEP_INTERVAL_SECONDS]",
+)
+def sweep_blacklist(batch_size, interval):
+    """Delete all blacklisted tokens that have already expired.
+
+    With an interval, the command keeps sweeping until it is interrupted. Run it
+    as a single process alongside the app workers, which never sweep themselves.
+    """
+    if batch_size is None:
+        batch_size = app.config["BLACKLIST_SWEEP_BATCH_SIZE"]
+    if interval is None:
+        interval = app.config["BLACKLIST_SWEEP_INTERVAL_SECONDS"]
+    if not interval:
+        deleted = BlacklistedToken.delete_expired(batch_size)
+        click.secho(
+            f"Deleted {deleted} expired token(s) from blacklist", fg="blue", bold=True
+        )
+        return 0
+    sweeper = PeriodicTask(
+        app,
+        lambda: BlacklistedToken.delete_expired(batch_size),
+        interval,
+        name="blacklist-sweeper",
+    )
+    click.secho(f"Sweeping blacklist every {interval} second(s)", fg="blue", bold=True)
+    sweeper.start()
+    try:
+        sweeper.join()
+    except KeyboardInterrupt:
+        sweeper.stop()
+    return 0
+
+
+@app.cli.command("calibrate-bcrypt", short_help="find bcrypt cost for this host")
+@click.option(
+    "--target-ms",
+    default=250,
+    show_default=True,
+    help="Maximum time to hash one password, in milliseconds",
+)
+@click.option("--min-rounds", default=4, show_default=True)
+@click.option("--max-rounds", default=16, show_default=True)
+@click.option("--samples", default=3, show_default=True, help="Hashes timed per cost")
+def calibrate_bcrypt(target_ms, min_rounds, max_rounds, samples):
+    """Measure bcrypt hash time on this host and report the largest cost in budget."""
+    log_rounds, timings = calibrate_log_rounds(
+        target_ms, min_rounds, max_rounds, samples
+    )
+    for cost, elapsed_ms in timings.items():
+        click.echo(f"log_rounds={cost:>2}: {elapsed_ms:8.1f} ms")
+    message = f"Recommended setting: BCRYPT_LOG_ROUNDS={log_rounds}"
+    click.secho(message, fg="blue", bold=True)
+    return 0
@@ -3,14 +3,25 @@ from flask import Flask
 from flask_bcrypt import Bcrypt
 from flask_cors import CORS
 from flask_migrate import Migrate
-from flask_sqlalchemy import SQLAlchemy
 
 from flask_api_tutorial.config import get_config
+from flask_api_tutorial.util.app_cache import AppCache
+from flask_api_tutorial.util.blacklist_cache import BlacklistCache
+from flask_api_tutorial.util.database import SQLAlchemy
+from flask_api_tutorial.util.response_cache import ResponseCache
+from flask_api_tutorial.util.throttle import Throttle
+from flask_api_tutorial.util.worker_pool import WorkerPool
 
 cors = CORS()
 db = SQLAlchemy()
 migrate = Migrate()
 bcrypt = Bcrypt()
+blacklist_cache = BlacklistCache()
+token_cache = AppCache("TOKEN_CACHE")
+identity_cache = AppCache("IDENTITY_CACHE")
+bcrypt_pool = WorkerPool("BCRYPT")
+throttle = Throttle()
+response_cache = ResponseCache()
 
 
 def create_app(config_name):
@@ -25,4 +36,10 @@ def create_app(config_name):
     db.init_app(app)
     migrate.init_app(app, db)
     bcrypt.init_app(app)
+    blacklist_cache.init_app(app)
+    token_cache.init_app(app)
+    identity_cache.init_app(app)
+    bcrypt_pool.init_app(app)
+    throttle.init_app(app)
+    response_cache.init_app(app)
     return app
@@ -1,9 +1,12 @@
 """API blueprint configuration."""
+from http import HTTPStatus
+
 from flask import Blueprint
 from flask_restx import Api
 
 from flask_api_tutorial.api.auth.endpoints import auth_ns
 from flask_api_tutorial.api.widgets.endpoints import widget_ns
+from flask_api_tutorial.util.worker_pool import PoolSaturatedError
 
 api_bp = Blueprint("api", __name__, url_prefix="/api/v1")
 authorizations = {"Bearer": {"type": "apiKey", "in": "header", "name": "Authorization"}}
@@ -19,3 +22,10 @@ api = Api(
 
 api.add_namespace(auth_ns, path="/auth")
 api.add_namespace(widget_ns, path="/widgets")
+
+
+@api.errorhandler(PoolSaturatedError)
+def handle_pool_saturated(error):
+    message = "Server is busy, please try again later."
+    headers = {"Retry-After": str(error.retry_after)}
+    return dict(status="fail", message=message), HTTPStatus.SERVICE_UNAVAILABLE, headers
@@ -1,17 +1,19 @@
 """Business logic for /auth API endpoints."""
 from http import HTTPStatus
 
-from flask import current_app, jsonify
+from flask import current_app, g, jsonify, request
 from flask_restx import abort
 
-from flask_api_tutorial import db
+from flask_api_tutorial import db, blacklist_cache, token_cache, throttle
 from flask_api_tutorial.api.auth.decorators import token_required
+from flask_api_tutorial.api.exceptions import ApiTooManyRequests
 from flask_api_tutorial.models.token_blacklist import BlacklistedToken
 from flask_api_tutorial.models.user import User
 from flask_api_tutorial.util.datetime_util import (
     remaining_fromtimestamp,
     format_timespan_digits,
 )
+from flask_api_tutorial.util.throttle import ThrottledError
 
 
 def process_registration_request(email, password):
@@ -35,9 +37,15 @@ def process_registration_request(email, password):
 
 
 def process_login_request(email, password):
+    try:
+        throttle.check("login", client=request.remote_addr, email=email.lower())
+    except ThrottledError as e:
+        raise ApiTooManyRequests(e.retry_after)
     user = User.find_by_email(email)
     if not user or not user.check_password(password):
         abort(HTTPStatus.UNAUTHORIZED, "email or password does not match", status="fail")
+    if db.session.is_modified(user):
+        db.session.commit()
     access_token = user.encode_access_token()
     response = jsonify(
         status="success",
@@ -54,20 +62,23 @@ def process_login_request(email, password):
 
 @token_required
 def get_logged_in_user():
-    public_id = get_logged_in_user.public_id
-    user = User.find_by_public_id(public_id)
-    expires_at = get_logged_in_user.expires_at
-    user.token_expires_in = format_timespan_digits(remaining_fromtimestamp(expires_at))
+    public_id = g.token_payload["public_id"]
+    user = dict(User.get_identity(public_id))
+    expires_at = g.token_payload["expires_at"]
+    token_expires_in = remaining_fromtimestamp(expires_at)
+    user["token_expires_in"] = format_timespan_digits(token_expires_in)
     return user
 
 
 @token_required
 def process_logout_request():
-    access_token = process_logout_request.token
-    expires_at = process_logout_request.expires_at
+    access_token = g.token_payload["token"]
+    expires_at = g.token_payload["expires_at"]
     blacklisted_token = BlacklistedToken(access_token, expires_at)
     db.session.add(blacklisted_token)
     db.session.commit()
+    blacklist_cache.add(blacklisted_token.token_digest)
+    token_cache.invalidate(access_token)
     response_dict = dict(status="success", message="successfully logged out")
     return response_dict, HTTPStatus.OK
 
@@ -1,10 +1,13 @@
 """Decorators that decode and verify authorization tokens."""
 from functools import wraps
 
-from flask import request
+from flask import g, request
 
+from flask_api_tutorial import token_cache
 from flask_api_tutorial.api.exceptions import ApiUnauthorized, ApiForbidden
+from flask_api_tutorial.models.token_blacklist import BlacklistedToken
 from flask_api_tutorial.models.user import User
+from flask_api_tutorial.util.result import Result
 
 
 def token_required(f):
@@ -12,9 +15,7 @@ def token_required(f):
 
     @wraps(f)
     def decorated(*args, **kwargs):
-        token_payload = _check_access_token(admin_only=False)
-        for name, val in token_payload.items():
-            setattr(decorated, name, val)
+        g.token_payload = _check_access_token(admin_only=False)
         return f(*args, **kwargs)
 
     return decorated
@@ -28,8 +29,12 @@ def admin_token_required(f):
         token_payload = _check_access_token(admin_only=True)
         if not token_payload["admin"]:
             raise ApiForbidden()
-        for name, val in token_payload.items():
-            setattr(decorated, name, val)
+        identity = User.get_identity(token_payload["public_id"])
+        if not identity or not identity["admin"]:
+            raise ApiForbidden()
+        if not token_payload["user_id"]:
+            token_payload = dict(token_payload, user_id=identity["id"])
+        g.token_payload = token_payload
         return f(*args, **kwargs)
 
     return decorated
@@ -39,7 +44,7 @@ def _check_access_token(admin_only):
     token = request.headers.get("Authorization")
     if not token:
         raise ApiUnauthorized(description="Unauthorized", admin_only=admin_only)
-    result = User.decode_access_token(token)
+    result = _decode_access_token(User.strip_bearer_prefix(token))
     if result.failure:
         raise ApiUnauthorized(
             description=result.error,
@@ -48,3 +53,18 @@ def _check_access_token(admin_only):
             error_description=result.error,
         )
     return result.value
+
+
+def _decode_access_token(access_token):
+    if not token_cache.enabled:
+        return User.decode_access_token(access_token)
+    token_payload = token_cache.get(access_token)
+    if token_payload:
+        if not BlacklistedToken.check_blacklist(access_token):
+            return Result.Ok(token_payload)
+        token_cache.invalidate(access_token)
+    result = User.decode_access_token(access_token)
+    if result.success:
+        expires_at = result.value["expires_at"]
+        token_cache.set(access_token, result.value, expires_at=expires_at)
+    return result
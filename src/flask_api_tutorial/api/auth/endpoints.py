@@ -24,6 +24,7 @@ class RegisterUser(Resource):
     @auth_ns.response(int(HTTPStatus.CONFLICT), "Email address is already registered.")
     @auth_ns.response(int(HTTPStatus.BAD_REQUEST), "Validation error.")
     @auth_ns.response(int(HTTPStatus.INTERNAL_SERVER_ERROR), "Internal server error.")
+    @auth_ns.response(int(HTTPStatus.SERVICE_UNAVAILABLE), "Server is busy.")
     def post(self):
         """Register a new user and return an access token."""
         request_data = auth_reqparser.parse_args()
@@ -39,8 +40,10 @@ class LoginUser(Resource):
     @auth_ns.expect(auth_reqparser)
     @auth_ns.response(int(HTTPStatus.OK), "Login succeeded.")
     @auth_ns.response(int(HTTPStatus.UNAUTHORIZED), "email or password does not match")
+    @auth_ns.response(int(HTTPStatus.TOO_MANY_REQUESTS), "Too many login attempts.")
     @auth_ns.response(int(HTTPStatus.BAD_REQUEST), "Validation error.")
     @auth_ns.response(int(HTTPStatus.INTERNAL_SERVER_ERROR), "Internal server error.")
+    @auth_ns.response(int(HTTPStatus.SERVICE_UNAVAILABLE), "Server is busy.")
     def post(self):
         """Authenticate an existing user and return an access token."""
         request_data = auth_reqparser.parse_args()
@@ -1,5 +1,5 @@
 """Custom HTTPException classes that extend werkzeug.exceptions."""
-from werkzeug.exceptions import Unauthorized, Forbidden
+from werkzeug.exceptions import Unauthorized, Forbidden, TooManyRequests
 
 _REALM_REGULAR_USERS = "registered_users@mydomain.com"
 _REALM_ADMIN_USERS = "admin_users@mydomain.com"
@@ -49,3 +49,14 @@ class ApiForbidden(Forbidden):
                 'error_description="You are not an administrator"',
             ),
         ]
+
+
+class ApiTooManyRequests(TooManyRequests):
+    """Raise status code 429 with Retry-After header"""
+
+    def __init__(self, retry_after, description="Too many requests, try again later."):
+        self.retry_after = retry_after
+        TooManyRequests.__init__(self, description=description)
+
+    def get_headers(self, environ):
+        return [("Content-Type", "text/html"), ("Retry-After", str(self.retry_after))]
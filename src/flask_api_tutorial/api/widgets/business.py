@@ -1,27 +1,75 @@
 """Business logic for /widgets API endpoints."""
+import csv
+import io
+import json
+import re
+import time
+from datetime import datetime, timezone
 from http import HTTPStatus
+from types import SimpleNamespace
 
-from flask import jsonify, url_for
-from flask_restx import abort, marshal
+from flask import current_app, g, jsonify, request, stream_with_context, url_for
+from flask_restx import abort
+from flask_restx.fields import Nested
+from sqlalchemy import and_, bindparam, case, func, literal_column, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload, lazyload, load_only
+from sqlalchemy.orm.exc import StaleDataError
+from werkzeug.datastructures import MultiDict
+from werkzeug.exceptions import HTTPException
+from werkzeug.http import quote_etag
 
-from flask_api_tutorial import db
+from flask_api_tutorial import db, response_cache
 from flask_api_tutorial.api.auth.decorators import token_required, admin_token_required
-from flask_api_tutorial.api.widgets.dto import pagination_model, widget_name
+from flask_api_tutorial.api.widgets.dto import (
+    create_widget_reqparser,
+    update_widget_reqparser,
+    serialize_widget,
+    widget_model,
+    widget_name,
+    widget_serializers,
+)
+from flask_api_tutorial.models.collection_state import CollectionState
 from flask_api_tutorial.models.user import User
-from flask_api_tutorial.models.widget import Widget
+from flask_api_tutorial.models.widget import (
+    Widget,
+    normalize_widget_name,
+    widget_search,
+)
+from flask_api_tutorial.util.pagination import (
+    encode_cursor,
+    KeysetPagination,
+    OffsetPagination,
+)
+
+WIDGET_SORT_COLUMNS = {"id": Widget.id, "name": Widget.name, "deadline": Widget.deadline}
+WIDGET_FIELD_COLUMNS = {
+    "name": ["name"],
+    "info_url": ["info_url"],
+    "created_at": ["created_at"],
+    "created_at_iso8601": ["created_at"],
+    "created_at_rfc822": ["created_at"],
+    "deadline": ["deadline"],
+    "deadline_passed": ["deadline"],
+    "time_remaining": ["deadline"],
+    "owner": ["owner_id"],
+    "link": ["name"],
+}
 
 
 @admin_token_required
 def create_widget(widget_dict):
     name = widget_dict["name"]
-    if Widget.find_by_name(name):
-        error = f"Widget name: {name} already exists, must be unique."
-        abort(HTTPStatus.CONFLICT, error, status="fail")
     widget = Widget(**widget_dict)
-    owner = User.find_by_public_id(create_widget.public_id)
-    widget.owner_id = owner.id
+    widget.owner_id = g.token_payload["user_id"]
     db.session.add(widget)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        error = f"Widget name: {name} already exists, must be unique."
+        abort(HTTPStatus.CONFLICT, error, status="fail")
+    response_cache.clear()
     response = jsonify(status="success", message=f"New widget added: {name}.")
     response.status_code = HTTPStatus.CREATED
     response.headers["Location"] = url_for("api.widget", name=name)
@@ -29,33 +77,74 @@ def create_widget(widget_dict):
 
 
 @token_required
-def retrieve_widget_list(page, per_page):
-    pagination = Widget.query.paginate(page, per_page, error_out=False)
-    response_data = marshal(pagination, pagination_model)
-    response_data["links"] = _pagination_nav_links(pagination)
-    response = jsonify(response_data)
-    response.headers["Link"] = _pagination_nav_header_links(pagination)
-    response.headers["Total-Count"] = pagination.total
+def retrieve_widget_list(
+    page, per_page, include_total=True, sort=None, cursor=None, fields=None, filters=None
+):
+    filters = filters or {}
+    cache_key = None
+    if request.if_none_match or response_cache.enabled:
+        version = CollectionState.get_state(Widget).version
+        etag = _collection_etag(version)
+        if request.if_none_match.contains_weak(etag):
+            return _not_modified(etag)
+        if response_cache.enabled:
+            cursor_param = encode_cursor(cursor) if cursor else None
+            params = (page, per_page, include_total, sort, cursor_param, fields)
+            params += tuple(sorted(filters.items()))
+            cache_key = f"{etag}:{params}"
+            response = response_cache.get(cache_key)
+            if response:
+                return response
+    if sort or cursor:
+        pagination, response = _retrieve_widget_list_by_cursor(
+            per_page, sort, cursor, fields, filters
+        )
+    else:
+        pagination, response = _retrieve_widget_list_by_page(
+            page, per_page, include_total, fields, filters
+        )
+    if cache_key:
+        expires_at = None
+        if "deadline" in _widget_columns(fields):
+            expires_at = _next_deadline_timestamp(pagination.items)
+        response_cache.set(cache_key, response, expires_at=expires_at)
     return response
 
 
 @token_required
-def retrieve_widget(name):
-    return Widget.query.filter_by(name=name.lower()).first_or_404(
-        description=f"{name} not found in database."
+def retrieve_widget(name, fields=None):
+    if request.if_none_match:
+        etag = Widget.find_etag_by_name(name)
+        if etag and request.if_none_match.contains_weak(etag):
+            return _not_modified(etag)
+    widget = (
+        _query_widgets(fields, Widget.version)
+        .filter_by(name_key=normalize_widget_name(name))
+        .first_or_404(description=f"{name} not found in database.")
     )
+    widget_dict = widget_serializers(fields).widget(widget)
+    return widget_dict, HTTPStatus.OK, {"ETag": quote_etag(widget.etag)}
 
 
 @admin_token_required
 def update_widget(name, widget_dict):
-    widget = Widget.find_by_name(name.lower())
+    widget = Widget.find_by_name(name)
+    if request.if_match and not _etag_matches(request.if_match, widget):
+        error = f"'{name}' has been modified or does not exist."
+        abort(HTTPStatus.PRECONDITION_FAILED, error, status="fail")
     if widget:
         for k, v in widget_dict.items():
             setattr(widget, k, v)
-        db.session.commit()
+        try:
+            db.session.commit()
+        except StaleDataError:
+            db.session.rollback()
+            error = f"'{name}' was modified by another request."
+            abort(HTTPStatus.PRECONDITION_FAILED, error, status="fail")
+        response_cache.clear()
         message = f"'{name}' was successfully updated"
         response_dict = dict(status="success", message=message)
-        return response_dict, HTTPStatus.OK
+        return response_dict, HTTPStatus.OK, {"ETag": quote_etag(widget.etag)}
     try:
         valid_name = widget_name(name.lower())
     except ValueError as e:
@@ -66,35 +155,438 @@ def update_widget(name, widget_dict):
 
 @admin_token_required
 def delete_widget(name):
-    widget = Widget.query.filter_by(name=name.lower()).first_or_404(
+    widget = Widget.query.filter_by(name_key=normalize_widget_name(name)).first_or_404(
         description=f"{name} not found in database."
     )
     db.session.delete(widget)
     db.session.commit()
+    response_cache.clear()
     return "", HTTPStatus.NO_CONTENT
 
 
-def _pagination_nav_links(pagination):
+@token_required
+def search_widgets(q, page, per_page, fields=None):
+    if db.engine.dialect.name == "sqlite":
+        query, total = _search_widgets_fts(_query_widgets(fields), q)
+    else:
+        query, total = _search_widgets_like(_query_widgets(fields), q)
+    widgets = query.limit(per_page).offset((page - 1) * per_page).all()
+    pagination = OffsetPagination(query, page, per_page, total, widgets)
+    response_data = widget_serializers(fields).pagination(pagination)
+    params = dict(q=q, **_widget_list_params(per_page, fields, None))
+    response_data["links"] = _pagination_nav_links(
+        pagination, params, endpoint="api.widget_search"
+    )
+    response = jsonify(response_data)
+    response.headers["Link"] = _pagination_nav_header_links(response_data["links"])
+    response.headers["Total-Count"] = total
+    return response
+
+
+@admin_token_required
+def export_widgets(export_format):
+    batch_size = current_app.config["WIDGET_EXPORT_BATCH_SIZE"]
+    widgets = _query_widgets_with_owner().order_by(Widget.id).yield_per(batch_size)
+    if export_format == "csv":
+        chunks, mimetype = _export_csv(widgets, batch_size), "text/csv"
+    else:
+        chunks, mimetype = _export_ndjson(widgets, batch_size), "application/x-ndjson"
+    response = current_app.response_class(stream_with_context(chunks), mimetype=mimetype)
+    filename = f"widgets.{export_format}"
+    response.headers["Content-Disposition"] = f"attachment; filename={filename}"
+    return response
+
+
+@admin_token_required
+def process_widget_batch(operations):
+    results = [None] * len(operations)
+    pending = []
+    seen = set()
+    for index, operation in enumerate(operations):
+        action, name = operation["action"], operation["name"]
+        args, errors = _parse_widget_operation(operation)
+        if errors:
+            message = "Input payload validation failed"
+            results[index] = _operation_result(
+                index, action, name, HTTPStatus.BAD_REQUEST, message, errors
+            )
+        elif normalize_widget_name(name) in seen:
+            message = f"'{name}' appears in more than one operation."
+            results[index] = _operation_result(
+                index, action, name, HTTPStatus.BAD_REQUEST, message
+            )
+        else:
+            seen.add(normalize_widget_name(name))
+            pending.append((index, action, name, args))
+
+    existing = {}
+    if seen:
+        rows = (
+            db.session.query(Widget.id, Widget.name_key, Widget.version)
+            .filter(Widget.name_key.in_(seen))
+            .all()
+        )
+        existing = {row.name_key: row for row in rows}
+
+    owner_id = g.token_payload["user_id"]
+    inserts, updates, deletes = [], [], []
+    for index, action, name, args in pending:
+        widget = existing.get(normalize_widget_name(name))
+        if action == "create" and widget:
+            status_code = HTTPStatus.CONFLICT
+            message = f"Widget name: {name} already exists, must be unique."
+        elif action == "create":
+            inserts.append(dict(args, owner_id=owner_id))
+            status_code, message = HTTPStatus.CREATED, f"New widget added: {name}."
+        elif action == "update" and widget:
+            updates.append(dict(args, b_id=widget.id, b_version=widget.version))
+            status_code, message = HTTPStatus.OK, f"'{name}' was successfully updated"
+        elif action == "update":
+            try:
+                valid_name = widget_name(name.lower())
+            except ValueError as e:
+                status_code, message = HTTPStatus.BAD_REQUEST, str(e)
+            else:
+                inserts.append(dict(args, name=valid_name, owner_id=owner_id))
+                status_code = HTTPStatus.CREATED
+                message = f"New widget added: {valid_name}."
+        elif widget:
+            deletes.append(widget.id)
+            status_code, message = HTTPStatus.NO_CONTENT, f"'{name}' was deleted."
+        else:
+            status_code, message = HTTPStatus.NOT_FOUND, f"{name} not found in database."
+        results[index] = _operation_result(index, action, name, status_code, message)
+
+    if inserts or updates or deletes:
+        _write_widget_batch(inserts, updates, deletes)
+        response_cache.clear()
+    failed = sum(1 for result in results if result["status"] == "fail")
+    message = f"{len(results) - failed} of {len(results)} widget operations succeeded."
+    status = "fail" if failed else "success"
+    return dict(status=status, message=message, results=results), HTTPStatus.OK
+
+
+def _parse_widget_operation(operation):
+    parsers = dict(create=create_widget_reqparser, update=update_widget_reqparser)
+    parser = parsers.get(operation["action"])
+    if not parser:
+        return {}, None
+    form = MultiDict(
+        (key, value)
+        for key, value in operation.items()
+        if key != "action" and value is not None
+    )
+    try:
+        return parser.parse_args(req=SimpleNamespace(form=form)), None
+    except HTTPException as e:
+        return None, getattr(e, "data", {}).get("errors")
+
+
+def _operation_result(index, action, name, status_code, message, errors=None):
+    result = dict(
+        index=index,
+        action=action,
+        name=name,
+        status="success" if status_code < HTTPStatus.BAD_REQUEST else "fail",
+        status_code=int(status_code),
+        message=message,
+    )
+    if errors:
+        result["errors"] = errors
+    return result
+
+
+def _write_widget_batch(inserts, updates, deletes):
+    widget_table = Widget.__table__
+    try:
+        if inserts:
+            db.session.bulk_insert_mappings(Widget, inserts)
+        if updates:
+            update = (
+                widget_table.update()
+                .where(
+                    and_(
+                        widget_table.c.id == bindparam("b_id"),
+                        widget_table.c.version == bindparam("b_version"),
+                    )
+                )
+                .values(version=widget_table.c.version + 1)
+            )
+            if db.session.execute(update, updates).rowcount != len(updates):
+                raise StaleDataError("Widgets were updated by another request.")
+        if deletes:
+            delete = widget_table.delete().where(widget_table.c.id.in_(deletes))
+            if db.session.execute(delete).rowcount != len(deletes):
+                raise StaleDataError("Widgets were deleted by another request.")
+        CollectionState.record_change(
+            db.session.connection(), Widget, item_count_delta=len(inserts) - len(deletes)
+        )
+        db.session.commit()
+    except (IntegrityError, StaleDataError):
+        db.session.rollback()
+        error = "Widgets were modified by another request, no changes were made."
+        abort(HTTPStatus.CONFLICT, error, status="fail")
+
+
+def _query_widgets_with_owner():
+    return Widget.query.options(joinedload(Widget.owner, innerjoin=True))
+
+
+def _query_widgets(fields, *columns):
+    if not fields:
+        return _query_widgets_with_owner()
+    column_names = _widget_columns(fields) + [column.key for column in columns]
+    query = Widget.query.options(load_only(*dict.fromkeys(column_names)))
+    if "owner" in fields:
+        query = query.options(joinedload(Widget.owner, innerjoin=True))
+    return query
+
+
+def _filter_widgets(query, filters):
+    if not filters:
+        return query
+    if "deadline_from" in filters:
+        query = query.filter(Widget.deadline >= filters["deadline_from"])
+    if "deadline_to" in filters:
+        query = query.filter(Widget.deadline <= filters["deadline_to"])
+    if "deadline_passed" in filters:
+        deadline_passed = Widget.deadline_passed
+        query = query.filter(
+            deadline_passed if filters["deadline_passed"] else ~deadline_passed
+        )
+    if "owner" in filters:
+        owner_id = select([User.id]).where(User.public_id == filters["owner"])
+        query = query.filter(Widget.owner_id == owner_id.as_scalar())
+    return query
+
+
+def _search_widgets_fts(query, q):
+    terms = re.findall(r"[^\W_]+", q.lower())
+    match = literal_column("widget_search").match(
+        " ".join(f'"{term}"*' for term in terms)
+    )
+    total = (
+        db.session.query(func.count()).select_from(widget_search).filter(match).scalar()
+    )
+    query = query.join(widget_search, widget_search.c.rowid == Widget.id).filter(match)
+    # Ranking sorts every match, beyond the rank limit widgets are listed in the
+    # order of the full-text index (by id), which needs no sort at all.
+    if total > current_app.config["WIDGET_SEARCH_RANK_LIMIT"]:
+        return query.order_by(widget_search.c.rowid), total
+    return query.order_by(_exact_match(q), widget_search.c.rank, Widget.id), total
+
+
+def _search_widgets_like(query, q):
+    prefix = re.sub(r"([\\%_])", r"\\\1", normalize_widget_name(q))
+    query = query.filter(Widget.name_key.like(f"{prefix}%", escape="\\"))
+    total = query.order_by(None).options(lazyload("*")).count()
+    return query.order_by(_exact_match(q), Widget.name_key, Widget.id), total
+
+
+def _exact_match(q):
+    return case([(Widget.name_key == normalize_widget_name(q), 0)], else_=1)
+
+
+def _widget_columns(fields):
+    if not fields:
+        return [column.key for column in Widget.__table__.columns]
+    return [column for field in fields for column in WIDGET_FIELD_COLUMNS[field]]
+
+
+def _retrieve_widget_list_by_page(page, per_page, include_total, fields, filters):
+    pagination, collection_state = _paginate_widgets(
+        page, per_page, include_total, fields, filters
+    )
+    response_data = widget_serializers(fields).pagination(pagination)
+    params = _widget_list_params(per_page, fields, filters)
+    if not include_total:
+        params["include_total"] = "false"
+    response_data["links"] = _pagination_nav_links(pagination, params)
+    response = jsonify(response_data)
+    response.headers["Link"] = _pagination_nav_header_links(response_data["links"])
+    if include_total:
+        response.headers["Total-Count"] = pagination.total
+    response.set_etag(_collection_etag(collection_state.version))
+    return pagination, response
+
+
+def _paginate_widgets(page, per_page, include_total, fields=None, filters=None):
+    query = _filter_widgets(_query_widgets(fields), filters)
+    state_columns = CollectionState.state_columns(Widget)
+    limit = per_page if include_total else per_page + 1
+    offset = (page - 1) * per_page
+    rows = query.add_columns(*state_columns).limit(limit).offset(offset).all()
+    collection_state = _collection_state(tuple(rows[0])[1:] if rows else None)
+    widgets = [row.Widget for row in rows[:per_page]]
+    if not include_total:
+        has_next = len(rows) > per_page
+        pagination = OffsetPagination(
+            query, page, per_page, None, widgets, has_next=has_next
+        )
+        return pagination, collection_state
+    total = collection_state.item_count
+    if filters:
+        total = query.order_by(None).options(lazyload("*")).count()
+    return OffsetPagination(query, page, per_page, total, widgets), collection_state
+
+
+def _collection_state(column_values):
+    if column_values and None not in column_values:
+        item_count, version = column_values
+        return CollectionState(item_count=item_count, version=version)
+    return CollectionState.get_state(Widget)
+
+
+def _collection_etag(version):
+    return f"widgets.{version}"
+
+
+def _export_ndjson(widgets, batch_size):
+    url_templates = {}
+    lines = []
+    for widget in widgets:
+        widget_dict = serialize_widget.serialize(widget, url_templates)
+        lines.append(json.dumps(widget_dict, separators=(",", ":")))
+        if len(lines) == batch_size:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+def _export_csv(widgets, batch_size):
+    url_templates = {}
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(_csv_columns(widget_model))
+    for i, widget in enumerate(widgets, start=1):
+        widget_dict = serialize_widget.serialize(widget, url_templates)
+        writer.writerow(_csv_values(widget_dict))
+        if i % batch_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _csv_columns(model):
+    for key, field in model.items():
+        if isinstance(field, Nested):
+            yield from (f"{key}.{nested_key}" for nested_key in field.nested)
+        else:
+            yield key
+
+
+def _csv_values(data):
+    for value in data.values():
+        if isinstance(value, dict):
+            yield from _csv_values(value)
+        else:
+            yield value
+
+
+def _next_deadline_timestamp(widgets):
+    now = time.time()
+    deadlines = (
+        widget.deadline.replace(tzinfo=timezone.utc).timestamp()
+        for widget in widgets
+        if widget.deadline
+    )
+    return min((d for d in deadlines if d > now), default=None)
+
+
+def _etag_matches(if_match, widget):
+    if not widget:
+        return False
+    return if_match.star_tag or if_match.contains(widget.etag)
+
+
+def _not_modified(etag):
+    response = current_app.response_class(status=HTTPStatus.NOT_MODIFIED)
+    response.set_etag(etag)
+    return response
+
+
+def _pagination_nav_links(pagination, params, endpoint="api.widget_list"):
     nav_links = {}
-    per_page = pagination.per_page
     this_page = pagination.page
     last_page = pagination.pages
-    nav_links["self"] = url_for("api.widget_list", page=this_page, per_page=per_page)
-    nav_links["first"] = url_for("api.widget_list", page=1, per_page=per_page)
+    nav_links["self"] = url_for(endpoint, page=this_page, **params)
+    nav_links["first"] = url_for(endpoint, page=1, **params)
     if pagination.has_prev:
+        nav_links["prev"] = url_for(endpoint, page=this_page - 1, **params)
+    if pagination.has_next:
+        nav_links["next"] = url_for(endpoint, page=this_page + 1, **params)
+    if last_page is not None:
+        nav_links["last"] = url_for(endpoint, page=last_page, **params)
+    return nav_links
+
+
+def _retrieve_widget_list_by_cursor(per_page, sort, cursor, fields, filters):
+    if cursor:
+        if sort and sort != cursor["sort"]:
+            error = f"sort={sort} does not match the sort order of the cursor."
+            abort(HTTPStatus.BAD_REQUEST, error, status="fail")
+        sort = cursor["sort"]
+    sort_column = WIDGET_SORT_COLUMNS[sort.lstrip("-")]
+    try:
+        pagination = KeysetPagination(
+            _filter_widgets(_query_widgets(fields, sort_column), filters),
+            columns=CollectionState.state_columns(Widget),
+            sort_column=sort_column,
+            id_column=Widget.id,
+            per_page=per_page,
+            after=cursor.get("after") if cursor else None,
+            before=cursor.get("before") if cursor else None,
+            desc=sort.startswith("-"),
+        )
+    except ValueError as e:
+        abort(HTTPStatus.BAD_REQUEST, str(e), status="fail")
+    response_data = widget_serializers(fields).cursor_pagination(pagination)
+    response_data["sort"] = sort
+    params = _widget_list_params(per_page, fields, filters)
+    response_data["links"] = _cursor_nav_links(pagination, sort, cursor, params)
+    response = jsonify(response_data)
+    response.headers["Link"] = _pagination_nav_header_links(response_data["links"])
+    collection_state = _collection_state(pagination.column_values)
+    response.set_etag(_collection_etag(collection_state.version))
+    return pagination, response
+
+
+def _cursor_nav_links(pagination, sort, cursor, params):
+    nav_links = {}
+    if cursor:
+        nav_links["self"] = url_for(
+            "api.widget_list", cursor=encode_cursor(cursor), **params
+        )
+    else:
+        nav_links["self"] = url_for("api.widget_list", sort=sort, **params)
+    nav_links["first"] = url_for("api.widget_list", sort=sort, **params)
+    if pagination.has_prev:
+        prev_cursor = dict(sort=sort, before=pagination.prev_position)
         nav_links["prev"] = url_for(
-            "api.widget_list", page=this_page - 1, per_page=per_page
+            "api.widget_list", cursor=encode_cursor(prev_cursor), **params
         )
     if pagination.has_next:
+        next_cursor = dict(sort=sort, after=pagination.next_position)
         nav_links["next"] = url_for(
-            "api.widget_list", page=this_page + 1, per_page=per_page
+            "api.widget_list", cursor=encode_cursor(next_cursor), **params
         )
-    nav_links["last"] = url_for("api.widget_list", page=last_page, per_page=per_page)
     return nav_links
 
 
-def _pagination_nav_header_links(pagination):
-    url_dict = _pagination_nav_links(pagination)
+def _widget_list_params(per_page, fields, filters):
+    params = dict(per_page=per_page, fields=",".join(fields) if fields else None)
+    for name, value in (filters or {}).items():
+        if isinstance(value, bool):
+            value = str(value).lower()
+        elif isinstance(value, datetime):
+            value = value.date().isoformat()
+        params[name] = value
+    return params
+
+
+def _pagination_nav_header_links(url_dict):
     link_header = ""
     for rel, url in url_dict.items():
         link_header += f'<{url}>; rel="{rel}", '
@@ -1,14 +1,33 @@
 """Parsers and serializers for /widgets API endpoints."""
 import re
+from collections import namedtuple
 from datetime import date, datetime, time, timezone
+from functools import lru_cache
 
 from dateutil import parser
 from flask_restx import Model
-from flask_restx.fields import Boolean, DateTime, Integer, List, Nested, String, Url
-from flask_restx.inputs import positive, URL
+from flask_restx.fields import (
+    Boolean,
+    DateTime,
+    Integer,
+    List,
+    Nested,
+    Raw,
+    String,
+    Url,
+)
+from flask_restx.inputs import boolean, positive, URL
 from flask_restx.reqparse import RequestParser
 
 from flask_api_tutorial.util.datetime_util import make_tzaware, DATE_MONTH_NAME
+from flask_api_tutorial.util.pagination import decode_cursor
+from flask_api_tutorial.util.serializer import CompiledModel
+
+WIDGET_SORT_KEYS = ["id", "-id", "name", "-name", "deadline", "-deadline"]
+WIDGET_FILTERS = ["deadline_from", "deadline_to", "deadline_passed", "owner"]
+WIDGET_BATCH_ACTIONS = ["create", "update", "delete"]
+WIDGET_BATCH_MAX_OPERATIONS = 1000
+WIDGET_RESERVED_NAMES = ["search"]
 
 
 def widget_name(name):
@@ -18,6 +37,8 @@ def widget_name(name):
             f"'{name}' contains one or more invalid characters. Widget name must "
             "contain only letters, numbers, hyphen and underscore characters."
         )
+    if name.lower() in WIDGET_RESERVED_NAMES:
+        raise ValueError(f"'{name}' is reserved and cannot be used as a widget name.")
     return name
 
 
@@ -45,6 +66,59 @@ def future_date_from_string(date_str):
     return deadline_utc
 
 
+def start_of_day_from_string(date_str):
+    """Validation method for a date formatted as a string, returns midnight (UTC)."""
+    day_start = datetime.combine(_parse_date(date_str), time.min)
+    return make_tzaware(day_start, use_tz=timezone.utc)
+
+
+def end_of_day_from_string(date_str):
+    """Validation method for a date formatted as a string, returns 23:59:59 (UTC)."""
+    day_end = datetime.combine(_parse_date(date_str), time.max)
+    return make_tzaware(day_end, use_tz=timezone.utc)
+
+
+def _parse_date(date_str):
+    try:
+        return parser.parse(date_str).date()
+    except (ValueError, OverflowError):
+        raise ValueError(
+            f"Failed to parse '{date_str}' as a valid date. You can use any format "
+            "recognized by dateutil.parser, e.g. '2018-5-13' or '05/13/2018'."
+        )
+
+
+def pagination_cursor(cursor):
+    """Validation method for an opaque cursor returned in widget list nav links."""
+    values = decode_cursor(cursor)
+    positions = [key for key in ("after", "before") if key in values]
+    if values.get("sort") not in WIDGET_SORT_KEYS or len(positions) != 1:
+        raise ValueError(f"'{cursor}' is not a valid pagination cursor.")
+    return values
+
+
+def search_query(query):
+    """Validation method for a search string containing at least one word."""
+    if not re.search(r"[^\W_]", query):
+        raise ValueError(
+            f"'{query}' is not a valid search query. The query must contain at least "
+            "one letter or number."
+        )
+    return query.strip()
+
+
+def widget_fields(fields):
+    """Validation method for a comma-separated list of widget field names."""
+    names = {name.strip() for name in fields.split(",") if name.strip()}
+    invalid = sorted(names - set(widget_model))
+    if not names or invalid:
+        raise ValueError(
+            f"'{fields}' is not a valid list of widget fields. Fields must be "
+            f"separated by commas and can be any of: {', '.join(widget_model)}."
+        )
+    return tuple(name for name in widget_model if name in names)
+
+
 create_widget_reqparser = RequestParser(bundle_errors=True)
 create_widget_reqparser.add_argument(
     "name",
@@ -77,6 +151,33 @@ pagination_reqparser.add_argument("page", type=positive, required=False, default
 pagination_reqparser.add_argument(
     "per_page", type=positive, required=False, choices=[5, 10, 25, 50, 100], default=10
 )
+pagination_reqparser.add_argument(
+    "include_total", type=boolean, required=False, default=True
+)
+pagination_reqparser.add_argument(
+    "sort", type=str, required=False, choices=WIDGET_SORT_KEYS, case_sensitive=True
+)
+pagination_reqparser.add_argument("cursor", type=pagination_cursor, required=False)
+pagination_reqparser.add_argument("fields", type=widget_fields, required=False)
+pagination_reqparser.add_argument(
+    "deadline_from", type=start_of_day_from_string, required=False
+)
+pagination_reqparser.add_argument(
+    "deadline_to", type=end_of_day_from_string, required=False
+)
+pagination_reqparser.add_argument("deadline_passed", type=boolean, required=False)
+pagination_reqparser.add_argument("owner", type=str, required=False)
+
+widget_reqparser = RequestParser(bundle_errors=True)
+widget_reqparser.add_argument("fields", type=widget_fields, required=False)
+
+search_reqparser = RequestParser(bundle_errors=True)
+search_reqparser.add_argument("q", type=search_query, required=True, nullable=False)
+search_reqparser.add_argument("page", type=positive, required=False, default=1)
+search_reqparser.add_argument(
+    "per_page", type=positive, required=False, choices=[5, 10, 25, 50, 100], default=10
+)
+search_reqparser.add_argument("fields", type=widget_fields, required=False)
 
 widget_owner_model = Model("Widget Owner", {"email": String, "public_id": String})
 
@@ -114,3 +215,87 @@ pagination_model = Model(
         "items": List(Nested(widget_model)),
     },
 )
+
+cursor_pagination_model = Model(
+    "Cursor Pagination",
+    {
+        "links": Nested(pagination_links_model, skip_none=True),
+        "has_prev": Boolean,
+        "has_next": Boolean,
+        "sort": String,
+        "items_per_page": Integer(attribute="per_page"),
+        "items": List(Nested(widget_model)),
+    },
+)
+
+widget_operation_model = Model(
+    "Widget Operation",
+    {
+        "action": String(required=True, enum=WIDGET_BATCH_ACTIONS),
+        "name": String(required=True),
+        "info_url": String,
+        "deadline": String,
+    },
+)
+
+widget_batch_model = Model(
+    "Widget Batch",
+    {
+        "operations": List(
+            Nested(widget_operation_model),
+            required=True,
+            min_items=1,
+            max_items=WIDGET_BATCH_MAX_OPERATIONS,
+        )
+    },
+)
+
+widget_operation_result_model = Model(
+    "Widget Operation Result",
+    {
+        "index": Integer,
+        "action": String,
+        "name": String,
+        "status": String,
+        "status_code": Integer,
+        "message": String,
+        "errors": Raw,
+    },
+)
+
+widget_batch_result_model = Model(
+    "Widget Batch Result",
+    {
+        "status": String,
+        "message": String,
+        "results": List(Nested(widget_operation_result_model, skip_none=True)),
+    },
+)
+
+WidgetSerializers = namedtuple(
+    "WidgetSerializers", ["widget", "pagination", "cursor_pagination"]
+)
+
+serialize_widget = CompiledModel(widget_model)
+serialize_pagination = CompiledModel(pagination_model)
+serialize_cursor_pagination = CompiledModel(cursor_pagination_model)
+
+
+@lru_cache(maxsize=256)
+def widget_serializers(fields=None):
+    """Serializers for widgets and pages of widgets, limited to fields (if given)."""
+    if not fields:
+        return WidgetSerializers(
+            serialize_widget, serialize_pagination, serialize_cursor_pagination
+        )
+    fields_model = Model(widget_model.name, {key: widget_model[key] for key in fields})
+    items = List(Nested(fields_model))
+    return WidgetSerializers(
+        CompiledModel(fields_model),
+        CompiledModel(Model(pagination_model.name, dict(pagination_model, items=items))),
+        CompiledModel(
+            Model(
+                cursor_pagination_model.name, dict(cursor_pagination_model, items=items)
+            )
+        ),
+    )
@@ -4,13 +4,21 @@ from http import HTTPStatus
 from flask_restx import Namespace, Resource
 
 from flask_api_tutorial.api.widgets.dto import (
+    WIDGET_FILTERS,
     create_widget_reqparser,
     update_widget_reqparser,
     pagination_reqparser,
+    search_reqparser,
+    widget_reqparser,
     widget_owner_model,
     widget_model,
     pagination_links_model,
     pagination_model,
+    cursor_pagination_model,
+    widget_operation_model,
+    widget_batch_model,
+    widget_operation_result_model,
+    widget_batch_result_model,
 )
 from flask_api_tutorial.api.widgets.business import (
     create_widget,
@@ -18,6 +26,9 @@ from flask_api_tutorial.api.widgets.business import (
     retrieve_widget,
     update_widget,
     delete_widget,
+    search_widgets,
+    export_widgets,
+    process_widget_batch,
 )
 
 widget_ns = Namespace(name="widgets", validate=True)
@@ -25,6 +36,11 @@ widget_ns.models[widget_owner_model.name] = widget_owner_model
 widget_ns.models[widget_model.name] = widget_model
 widget_ns.models[pagination_links_model.name] = pagination_links_model
 widget_ns.models[pagination_model.name] = pagination_model
+widget_ns.models[cursor_pagination_model.name] = cursor_pagination_model
+widget_ns.models[widget_operation_model.name] = widget_operation_model
+widget_ns.models[widget_batch_model.name] = widget_batch_model
+widget_ns.models[widget_operation_result_model.name] = widget_operation_result_model
+widget_ns.models[widget_batch_result_model.name] = widget_batch_result_model
 
 
 @widget_ns.route("", endpoint="widget_list")
@@ -36,13 +52,46 @@ class WidgetList(Resource):
 
     @widget_ns.doc(security="Bearer")
     @widget_ns.response(int(HTTPStatus.OK), "Retrieved widget list.", pagination_model)
+    @widget_ns.response(int(HTTPStatus.NOT_MODIFIED), "Widget list has not changed.")
     @widget_ns.expect(pagination_reqparser)
     def get(self):
-        """Retrieve a list of widgets."""
+        """Retrieve a list of widgets.
+
+        Pages are selected by number (page, per_page) unless sort or cursor is
+        given, then widgets are paginated by cursor (see Cursor Pagination).
+        Use fields (e.g. fields=name,deadline) to limit the widget fields that
+        are returned. Widgets can be filtered by deadline (deadline_from and
+        deadline_to are inclusive dates), deadline_passed and owner (the
+        public_id of the user who created the widget).
+
+        The ETag of the list is derived from the stored version of the widget
+        collection, it does not change as time passes, so time_remaining and
+        deadline_passed can be out of date in a response validated with
+        If-None-Match. Pages may be served from a response cache, in which case
+        time_remaining can be out of date by up to RESPONSE_CACHE_TTL_SECONDS.
+        A cached page never outlives the next deadline of its widgets.
+        """
         request_data = pagination_reqparser.parse_args()
         page = request_data.get("page")
         per_page = request_data.get("per_page")
-        return retrieve_widget_list(page, per_page)
+        include_total = request_data.get("include_total")
+        sort = request_data.get("sort")
+        cursor = request_data.get("cursor")
+        fields = request_data.get("fields")
+        filters = {
+            name: request_data.get(name)
+            for name in WIDGET_FILTERS
+            if request_data.get(name) is not None
+        }
+        return retrieve_widget_list(
+            page,
+            per_page,
+            include_total=include_total,
+            sort=sort,
+            cursor=cursor,
+            fields=fields,
+            filters=filters,
+        )
 
     @widget_ns.doc(security="Bearer")
     @widget_ns.response(int(HTTPStatus.CREATED), "Added new widget.")
@@ -66,15 +115,23 @@ class Widget(Resource):
 
     @widget_ns.doc(security="Bearer")
     @widget_ns.response(int(HTTPStatus.OK), "Retrieved widget.", widget_model)
-    @widget_ns.marshal_with(widget_model)
+    @widget_ns.response(int(HTTPStatus.NOT_MODIFIED), "Widget has not changed.")
+    @widget_ns.expect(widget_reqparser)
     def get(self, name):
-        """Retrieve a widget."""
-        return retrieve_widget(name)
+        """Retrieve a widget, limited to the given fields (if any).
+
+        The ETag of a widget is derived from its id and stored version, it does
+        not change as time passes, so time_remaining and deadline_passed can be
+        out of date in a response validated with If-None-Match.
+        """
+        request_data = widget_reqparser.parse_args()
+        return retrieve_widget(name, fields=request_data.get("fields"))
 
     @widget_ns.doc(security="Bearer")
     @widget_ns.response(int(HTTPStatus.OK), "Widget was updated.", widget_model)
     @widget_ns.response(int(HTTPStatus.CREATED), "Added new widget.")
     @widget_ns.response(int(HTTPStatus.FORBIDDEN), "Administrator token required.")
+    @widget_ns.response(int(HTTPStatus.PRECONDITION_FAILED), "If-Match failed.")
     @widget_ns.expect(update_widget_reqparser)
     def put(self, name):
         """Update a widget."""
@@ -87,3 +144,76 @@ class Widget(Resource):
     def delete(self, name):
         """Delete a widget."""
         return delete_widget(name)
+
+
+@widget_ns.route("/search", endpoint="widget_search")
+@widget_ns.response(int(HTTPStatus.BAD_REQUEST), "Validation error.")
+@widget_ns.response(int(HTTPStatus.UNAUTHORIZED), "Unauthorized.")
+@widget_ns.response(int(HTTPStatus.INTERNAL_SERVER_ERROR), "Internal server error.")
+class WidgetSearch(Resource):
+    """Handles HTTP requests to URL: /widgets/search."""
+
+    @widget_ns.doc(security="Bearer")
+    @widget_ns.response(int(HTTPStatus.OK), "Retrieved widgets.", pagination_model)
+    @widget_ns.expect(search_reqparser)
+    def get(self):
+        """Search widgets by name.
+
+        A widget matches if every word in q is the start of a word in its name
+        (words are separated by any character other than a letter or number),
+        e.g. q=red wid matches red-widget. Databases other than SQLite have no
+        full-text index, there q must be the start of the name. An exact match
+        of the whole name is listed first, the remaining widgets are ranked by
+        relevance. If more than WIDGET_SEARCH_RANK_LIMIT widgets match, they are
+        not ranked but listed in order of creation.
+        """
+        request_data = search_reqparser.parse_args()
+        return search_widgets(
+            request_data.get("q"),
+            request_data.get("page"),
+            request_data.get("per_page"),
+            fields=request_data.get("fields"),
+        )
+
+
+@widget_ns.route("/export.<any(ndjson, csv):export_format>", endpoint="widget_export")
+@widget_ns.param("export_format", "File format, ndjson or csv")
+@widget_ns.response(int(HTTPStatus.UNAUTHORIZED), "Unauthorized.")
+@widget_ns.response(int(HTTPStatus.INTERNAL_SERVER_ERROR), "Internal server error.")
+class WidgetExport(Resource):
+    """Handles HTTP requests to URL: /widgets/export.{export_format}."""
+
+    @widget_ns.doc(security="Bearer")
+    @widget_ns.response(int(HTTPStatus.OK), "Streamed all widgets.")
+    @widget_ns.response(int(HTTPStatus.FORBIDDEN), "Administrator token required.")
+    def get(self, export_format):
+        """Export all widgets as newline-delimited JSON or CSV.
+
+        Widgets are sorted by id and streamed in batches as they are read from
+        the database, so the response can be consumed while it is generated.
+        """
+        return export_widgets(export_format)
+
+
+@widget_ns.route("/batch", endpoint="widget_batch")
+@widget_ns.response(int(HTTPStatus.BAD_REQUEST), "Validation error.")
+@widget_ns.response(int(HTTPStatus.UNAUTHORIZED), "Unauthorized.")
+@widget_ns.response(int(HTTPStatus.INTERNAL_SERVER_ERROR), "Internal server error.")
+class WidgetBatch(Resource):
+    """Handles HTTP requests to URL: /widgets/batch."""
+
+    @widget_ns.doc(security="Bearer")
+    @widget_ns.response(
+        int(HTTPStatus.OK), "Processed widget operations.", widget_batch_result_model
+    )
+    @widget_ns.response(int(HTTPStatus.FORBIDDEN), "Administrator token required.")
+    @widget_ns.response(int(HTTPStatus.CONFLICT), "Widgets were modified concurrently.")
+    @widget_ns.expect(widget_batch_model)
+    def post(self):
+        """Create, update and delete widgets in one request.
+
+        Each operation is validated like the matching POST /widgets or
+        PUT /widgets/{name} request and gets its own result. Operations that
+        fail are skipped, all others are applied in a single transaction.
+        """
+        return process_widget_batch(widget_ns.payload["operations"])
@@ -9,18 +9,66 @@ SQLITE_TEST = "sqlite:///" + str(HERE / "flask_api_tutorial_test.db")
 SQLITE_PROD = "sqlite:///" + str(HERE / "flask_api_tutorial_prod.db")
 
 
+def replica_binds(replica_urls):
+    """Bind keys replica1, replica2, etc. for a comma-separated list of database URIs."""
+    urls = [url.strip() for url in replica_urls.split(",") if url.strip()]
+    return {f"replica{i}": url for i, url in enumerate(urls, start=1)}
+
+
 class Config:
     """Base configuration."""
 
     SECRET_KEY = os.getenv("SECRET_KEY", "open sesame")
     BCRYPT_LOG_ROUNDS = 4
+    BCRYPT_EXECUTOR = os.getenv("BCRYPT_EXECUTOR", "inline")
+    BCRYPT_POOL_SIZE = int(os.getenv("BCRYPT_POOL_SIZE", os.cpu_count() or 1))
+    BCRYPT_QUEUE_DEPTH = int(os.getenv("BCRYPT_QUEUE_DEPTH", "16"))
+    BCRYPT_RETRY_AFTER_SECONDS = 1
+    BCRYPT_REHASH_ON_LOGIN = True
     TOKEN_EXPIRE_HOURS = 0
     TOKEN_EXPIRE_MINUTES = 0
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_BINDS = {}
+    SQLALCHEMY_REPLICA_BINDS = []
+    REPLICA_READ_AFTER_WRITE_SECONDS = 5
+    REPLICA_READ_AFTER_WRITE_COOKIE = "read_from_primary_until"
+    REPLICA_FORCE_PRIMARY_HEADER = "X-Read-From-Primary"
+    SQLITE_PRAGMAS = {}
+    SQLITE_POOL_SIZE = 0
     PRESERVE_CONTEXT_ON_EXCEPTION = False
     SWAGGER_UI_DOC_EXPANSION = "list"
     RESTX_MASK_SWAGGER = False
     JSON_SORT_KEYS = False
+    BLACKLIST_CACHE_ENABLED = True
+    BLACKLIST_CACHE_REFRESH_SECONDS = 10
+    BLACKLIST_CACHE_SIZE = 1024
+    BLACKLIST_BLOOM_CAPACITY = 100000
+    BLACKLIST_BLOOM_ERROR_RATE = 0.001
+    BLACKLIST_SWEEP_INTERVAL_SECONDS = int(
+        os.getenv("BLACKLIST_SWEEP_INTERVAL_SECONDS", "0")
+    )
+    BLACKLIST_SWEEP_BATCH_SIZE = 1000
+    TOKEN_CACHE_ENABLED = True
+    TOKEN_CACHE_SIZE = 4096
+    TOKEN_CACHE_TTL_SECONDS = 60
+    IDENTITY_CACHE_ENABLED = True
+    IDENTITY_CACHE_SIZE = 4096
+    IDENTITY_CACHE_TTL_SECONDS = 60
+    THROTTLE_BACKEND = "flask_api_tutorial.util.throttle.LocalThrottleBackend"
+    THROTTLE_MAX_KEYS = 100000
+    LOGIN_THROTTLE_ENABLED = True
+    LOGIN_THROTTLE_EMAIL_CAPACITY = 10
+    LOGIN_THROTTLE_EMAIL_REFILL_SECONDS = 30
+    LOGIN_THROTTLE_CLIENT_CAPACITY = 30
+    LOGIN_THROTTLE_CLIENT_REFILL_SECONDS = 2
+    RESPONSE_CACHE_ENABLED = True
+    RESPONSE_CACHE_BACKEND = (
+        "flask_api_tutorial.util.response_cache.LocalResponseCacheBackend"
+    )
+    RESPONSE_CACHE_MAX_BYTES = 16 * 1024 * 1024
+    RESPONSE_CACHE_TTL_SECONDS = 5
+    WIDGET_EXPORT_BATCH_SIZE = 1000
+    WIDGET_SEARCH_RANK_LIMIT = 10000
 
 
 class TestingConfig(Config):
@@ -28,6 +76,7 @@ class TestingConfig(Config):
 
     TESTING = True
     SQLALCHEMY_DATABASE_URI = SQLITE_TEST
+    RESPONSE_CACHE_ENABLED = False
 
 
 class DevelopmentConfig(Config):
@@ -35,14 +84,28 @@ class DevelopmentConfig(Config):
 
     TOKEN_EXPIRE_MINUTES = 15
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL", SQLITE_DEV)
+    SQLALCHEMY_BINDS = replica_binds(os.getenv("DATABASE_REPLICA_URLS", ""))
+    SQLALCHEMY_REPLICA_BINDS = list(SQLALCHEMY_BINDS)
 
 
 class ProductionConfig(Config):
     """Production configuration."""
 
     TOKEN_EXPIRE_HOURS = 1
-    BCRYPT_LOG_ROUNDS = 13
+    BCRYPT_LOG_ROUNDS = int(os.getenv("BCRYPT_LOG_ROUNDS", "13"))
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL", SQLITE_PROD)
+    SQLALCHEMY_BINDS = replica_binds(os.getenv("DATABASE_REPLICA_URLS", ""))
+    SQLALCHEMY_REPLICA_BINDS = list(SQLALCHEMY_BINDS)
+    REPLICA_READ_AFTER_WRITE_SECONDS = int(
+        os.getenv("REPLICA_READ_AFTER_WRITE_SECONDS", "5")
+    )
+    SQLITE_PRAGMAS = dict(
+        journal_mode="WAL",
+        synchronous="NORMAL",
+        busy_timeout=int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+        mmap_size=int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    )
+    SQLITE_POOL_SIZE = int(os.getenv("SQLITE_POOL_SIZE", "8"))
     PRESERVE_CONTEXT_ON_EXCEPTION = True
 
 
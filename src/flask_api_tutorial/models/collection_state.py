@@ -0,0 +1,54 @@
+"""Class definition for CollectionState model."""
+from sqlalchemy import select
+
+from flask_api_tutorial import db
+
+
+class CollectionState(db.Model):
+    """Item count and version of a collection, kept up to date as items change.
+
+    Each row is named after the table that holds the collection. Reading the
+    count is a primary key lookup, instead of a COUNT(*) over the whole table.
+    The version is incremented whenever an item is added, changed or removed.
+    """
+
+    __tablename__ = "collection_state"
+
+    name = db.Column(db.String(64), primary_key=True)
+    item_count = db.Column(db.Integer, nullable=False, default=0)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return (
+            f"<CollectionState name={self.name}, item_count={self.item_count}, "
+            f"version={self.version}>"
+        )
+
+    @classmethod
+    def state_columns(cls, model):
+        is_collection = cls.name == model.__tablename__
+        return [
+            select([cls.item_count]).where(is_collection).label("collection_item_count"),
+            select([cls.version]).where(is_collection).label("collection_version"),
+        ]
+
+    @classmethod
+    def get_state(cls, model):
+        """Read the state of the collection, without writing to the database.
+
+        The row of each collection is added when the database is created (by a
+        migration or create_all). If it is missing, an empty state is returned,
+        which is not added to the session.
+        """
+        name = model.__tablename__
+        return cls.query.get(name) or cls(name=name, item_count=0, version=0)
+
+    @classmethod
+    def record_change(cls, connection, model, item_count_delta=0):
+        connection.execute(
+            cls.__table__.update()
+            .where(cls.name == model.__tablename__)
+            .values(
+                item_count=cls.item_count + item_count_delta, version=cls.version + 1
+            )
+        )
@@ -1,7 +1,8 @@
 """Class definition for BlacklistedToken."""
+import hashlib
 from datetime import timezone
 
-from flask_api_tutorial import db
+from flask_api_tutorial import db, blacklist_cache
 from flask_api_tutorial.util.datetime_util import utc_now, dtaware_fromtimestamp
 
 
@@ -9,20 +10,64 @@ class BlacklistedToken(db.Model):
     """BlacklistedToken Model for storing JWT tokens."""
 
     __tablename__ = "token_blacklist"
+    # Caches load rows with an id above the last one they have seen, so ids
+    # must never be reused after the newest rows are deleted by the sweeper.
+    __table_args__ = {"sqlite_autoincrement": True}
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    token = db.Column(db.String(500), unique=True, nullable=False)
+    token_digest = db.Column(db.String(64), unique=True, nullable=False)
     blacklisted_on = db.Column(db.DateTime, default=utc_now)
-    expires_at = db.Column(db.DateTime, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
 
     def __init__(self, token, expires_at):
-        self.token = token
+        self.token_digest = self.get_token_digest(token)
         self.expires_at = dtaware_fromtimestamp(expires_at, use_tz=timezone.utc)
 
     def __repr__(self):
-        return f"<BlacklistToken token={self.token}>"
+        return f"<BlacklistToken token_digest={self.token_digest}>"
+
+    @staticmethod
+    def get_token_digest(token):
+        if isinstance(token, str):
+            token = token.encode("ascii")
+        return hashlib.sha256(token).hexdigest()
 
     @classmethod
     def check_blacklist(cls, token):
-        exists = cls.query.filter_by(token=token).first()
+        token_digest = cls.get_token_digest(token)
+        if not blacklist_cache.enabled:
+            return cls.query_blacklist(token_digest)
+        return blacklist_cache.check(
+            token_digest, lookup=cls.query_blacklist, load_since=cls.tokens_added_since
+        )
+
+    @classmethod
+    def query_blacklist(cls, token_digest):
+        exists = cls.query.filter_by(token_digest=token_digest).first()
         return True if exists else False
+
+    @classmethod
+    def delete_expired(cls, batch_size=1000):
+        now = utc_now().replace(tzinfo=None)
+        total_deleted = 0
+        while True:
+            expired = (
+                db.session.query(cls.id)
+                .filter(cls.expires_at < now)
+                .order_by(cls.expires_at)
+                .limit(batch_size)
+                .all()
+            )
+            expired_ids = [row_id for (row_id,) in expired]
+            if not expired_ids:
+                break
+            cls.query.filter(cls.id.in_(expired_ids)).delete(synchronize_session=False)
+            db.session.commit()
+            total_deleted += len(expired_ids)
+            if len(expired_ids) < batch_size:
+                break
+        return total_deleted
+
+    @classmethod
+    def tokens_added_since(cls, last_id):
+        return db.session.query(cls.id, cls.token_digest).filter(cls.id > last_id).all()
@@ -3,11 +3,13 @@ from datetime import datetime, timedelta, timezone
 from uuid import uuid4
 
 import jwt
-from flask import current_app
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect
 from sqlalchemy.ext.hybrid import hybrid_property
 
-from flask_api_tutorial import db, bcrypt
+from flask_api_tutorial import db, bcrypt, bcrypt_pool, identity_cache
 from flask_api_tutorial.models.token_blacklist import BlacklistedToken
+from flask_api_tutorial.util.bcrypt_util import get_log_rounds
 from flask_api_tutorial.util.datetime_util import (
     utc_now,
     get_local_utcoffset,
@@ -48,11 +50,22 @@ class User(db.Model):
     @password.setter
     def password(self, password):
         log_rounds = current_app.config.get("BCRYPT_LOG_ROUNDS")
-        hash_bytes = bcrypt.generate_password_hash(password, log_rounds)
+        hash_bytes = bcrypt_pool.run(bcrypt.generate_password_hash, password, log_rounds)
         self.password_hash = hash_bytes.decode("utf-8")
 
     def check_password(self, password):
-        return bcrypt.check_password_hash(self.password_hash, password)
+        matched = bcrypt_pool.run(
+            bcrypt.check_password_hash, self.password_hash, password
+        )
+        if matched and self.password_needs_rehash():
+            self.password = password
+        return matched
+
+    def password_needs_rehash(self):
+        if not current_app.config.get("BCRYPT_REHASH_ON_LOGIN"):
+            return False
+        log_rounds = current_app.config.get("BCRYPT_LOG_ROUNDS")
+        return get_log_rounds(self.password_hash) != log_rounds
 
     def encode_access_token(self):
         now = datetime.now(timezone.utc)
@@ -61,17 +74,29 @@ class User(db.Model):
         expire = now + timedelta(hours=token_age_h, minutes=token_age_m)
         if current_app.config["TESTING"]:
             expire = now + timedelta(seconds=5)
-        payload = dict(exp=expire, iat=now, sub=self.public_id, admin=self.admin)
+        payload = dict(
+            exp=expire,
+            iat=now,
+            jti=uuid4().hex,
+            sub=self.public_id,
+            uid=self.id,
+            admin=self.admin,
+        )
         key = current_app.config.get("SECRET_KEY")
         return jwt.encode(payload, key, algorithm="HS256")
 
     @staticmethod
-    def decode_access_token(access_token):
+    def strip_bearer_prefix(access_token):
         if isinstance(access_token, bytes):
             access_token = access_token.decode("ascii")
         if access_token.startswith("Bearer "):
             split = access_token.split("Bearer")
             access_token = split[1].strip()
+        return access_token
+
+    @staticmethod
+    def decode_access_token(access_token):
+        access_token = User.strip_bearer_prefix(access_token)
         try:
             key = current_app.config.get("SECRET_KEY")
             payload = jwt.decode(access_token, key, algorithms=["HS256"])
@@ -87,6 +112,7 @@ class User(db.Model):
             return Result.Fail(error)
         token_payload = dict(
             public_id=payload["sub"],
+            user_id=payload.get("uid"),
             admin=payload["admin"],
             token=access_token,
             expires_at=payload["exp"],
@@ -100,3 +126,40 @@ class User(db.Model):
     @classmethod
     def find_by_public_id(cls, public_id):
         return cls.query.filter_by(public_id=public_id).first()
+
+    @property
+    def identity(self):
+        return dict(
+            id=self.id,
+            public_id=self.public_id,
+            email=self.email,
+            admin=self.admin,
+            registered_on_str=self.registered_on_str,
+        )
+
+    @classmethod
+    def get_identity(cls, public_id):
+        if not identity_cache.enabled:
+            user = cls.find_by_public_id(public_id)
+            return user.identity if user else None
+        identity = identity_cache.get(public_id)
+        if identity:
+            return identity
+        user = cls.find_by_public_id(public_id)
+        if not user:
+            return None
+        identity = user.identity
+        identity_cache.set(public_id, identity)
+        return identity
+
+
+@event.listens_for(User, "after_update")
+def _invalidate_identity_on_update(mapper, connection, target):
+    if has_app_context() and inspect(target).attrs.admin.history.has_changes():
+        identity_cache.invalidate(target.public_id)
+
+
+@event.listens_for(User, "after_delete")
+def _invalidate_identity_on_delete(mapper, connection, target):
+    if has_app_context():
+        identity_cache.invalidate(target.public_id)
@@ -1,9 +1,14 @@
 """Class definition for Widget model."""
 from datetime import datetime, timezone, timedelta
 
+from sqlalchemy import DDL, Float, case, column, event, table
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import validates
+from sqlalchemy.sql.functions import FunctionElement
 
 from flask_api_tutorial import db
+from flask_api_tutorial.models.collection_state import CollectionState
 from flask_api_tutorial.util.datetime_util import (
     utc_now,
     format_timedelta_str,
@@ -13,23 +18,111 @@ from flask_api_tutorial.util.datetime_util import (
 )
 
 
+# Full-text index of widget names (SQLite FTS5), kept in sync with the widget
+# table by triggers. Names are split into words at any character other than a
+# letter or number, a prefix index speeds up searches for partial words.
+WIDGET_SEARCH_DDL = [
+    """
+    CREATE VIRTUAL TABLE widget_search USING fts5(
+        name, content='widget', content_rowid='id', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER widget_search_insert AFTER INSERT ON widget BEGIN
+        INSERT INTO widget_search (rowid, name) VALUES (new.id, new.name);
+    END
+    """,
+    """
+    CREATE TRIGGER widget_search_delete AFTER DELETE ON widget BEGIN
+        INSERT INTO widget_search (widget_search, rowid, name)
+        VALUES ('delete', old.id, old.name);
+    END
+    """,
+    """
+    CREATE TRIGGER widget_search_update AFTER UPDATE OF name ON widget BEGIN
+        INSERT INTO widget_search (widget_search, rowid, name)
+        VALUES ('delete', old.id, old.name);
+        INSERT INTO widget_search (rowid, name) VALUES (new.id, new.name);
+    END
+    """,
+    "INSERT INTO widget_search (widget_search) VALUES ('rebuild')",
+]
+widget_search = table("widget_search", column("rowid"), column("rank"))
+
+
+class seconds_between(FunctionElement):
+    """SQL expression for the number of seconds from start to end (two datetimes)."""
+
+    type = Float()
+    name = "seconds_between"
+
+
+@compiles(seconds_between)
+def _seconds_between_postgresql(element, compiler, **kw):
+    start, end = [compiler.process(arg, **kw) for arg in element.clauses]
+    return f"EXTRACT(EPOCH FROM ({end} - {start}))"
+
+
+@compiles(seconds_between, "sqlite")
+def _seconds_between_sqlite(element, compiler, **kw):
+    start, end = [compiler.process(arg, **kw) for arg in element.clauses]
+    return f"((julianday({end}) - julianday({start})) * 86400)"
+
+
+@compiles(seconds_between, "mysql")
+def _seconds_between_mysql(element, compiler, **kw):
+    start, end = [compiler.process(arg, **kw) for arg in element.clauses]
+    return f"TIMESTAMPDIFF(MICROSECOND, {start}, {end}) / 1000000"
+
+
+def normalize_widget_name(name):
+    """Key for case-insensitive lookups of widgets by name (names are unique by key)."""
+    return name.lower()
+
+
+def _default_name_key(context):
+    # Also fills in name_key for Core inserts, e.g. bulk_insert_mappings.
+    return normalize_widget_name(context.current_parameters["name"])
+
+
 class Widget(db.Model):
     """Widget model for a generic resource in a REST API."""
 
     __tablename__ = "widget"
+    # ETags are made of the id and version of a widget, so the id of a deleted
+    # widget must never be given to a new one (whose version restarts at 1).
+    __table_args__ = {"sqlite_autoincrement": True}
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     name = db.Column(db.String(100), unique=True, nullable=False)
+    name_key = db.Column(
+        db.String(100),
+        unique=True,
+        index=True,
+        nullable=False,
+        default=_default_name_key,
+    )
     info_url = db.Column(db.String(255))
     created_at = db.Column(db.DateTime, default=utc_now)
-    deadline = db.Column(db.DateTime)
+    deadline = db.Column(db.DateTime, index=True)
+
+    version = db.Column(db.Integer, nullable=False, server_default="1")
 
-    owner_id = db.Column(db.Integer, db.ForeignKey("site_user.id"), nullable=False)
+    owner_id = db.Column(
+        db.Integer, db.ForeignKey("site_user.id"), nullable=False, index=True
+    )
     owner = db.relationship("User", backref=db.backref("widgets"))
 
+    __mapper_args__ = {"version_id_col": version}
+
     def __repr__(self):
         return f"<Widget name={self.name}, info_url={self.info_url}>"
 
+    @validates("name")
+    def validate_name(self, key, name):
+        self.name_key = normalize_widget_name(name)
+        return name
+
     @hybrid_property
     def created_at_str(self):
         created_at_utc = make_tzaware(
@@ -46,16 +139,80 @@ class Widget(db.Model):
     def deadline_passed(self):
         return datetime.now(timezone.utc) > self.deadline.replace(tzinfo=timezone.utc)
 
+    @deadline_passed.expression
+    def deadline_passed(cls):
+        return cls.deadline < datetime.utcnow()
+
     @hybrid_property
     def time_remaining(self):
         time_remaining = self.deadline.replace(tzinfo=timezone.utc) - utc_now()
         return time_remaining if not self.deadline_passed else timedelta(0)
 
+    @time_remaining.expression
+    def time_remaining(cls):
+        # Number of seconds (not a timedelta), 0 once the deadline has passed.
+        now = datetime.utcnow()
+        return case([(cls.deadline < now, 0)], else_=seconds_between(now, cls.deadline))
+
     @hybrid_property
     def time_remaining_str(self):
         timedelta_str = format_timedelta_str(self.time_remaining)
         return timedelta_str if not self.deadline_passed else "No time remaining"
 
+    @property
+    def etag(self):
+        return self.make_etag(self.id, self.version)
+
+    @staticmethod
+    def make_etag(widget_id, version):
+        return f"{widget_id}.{version}"
+
     @classmethod
     def find_by_name(cls, name):
-        return cls.query.filter_by(name=name).first()
+        return cls.query.filter_by(name_key=normalize_widget_name(name)).first()
+
+    @classmethod
+    def find_etag_by_name(cls, name):
+        row = (
+            db.session.query(cls.id, cls.version)
+            .filter_by(name_key=normalize_widget_name(name))
+            .first()
+        )
+        return cls.make_etag(*row) if row else None
+
+
+@event.listens_for(Widget, "after_insert")
+def _increment_widget_count(mapper, connection, target):
+    CollectionState.record_change(connection, Widget, item_count_delta=1)
+
+
+@event.listens_for(Widget, "after_update")
+def _increment_widget_collection_version(mapper, connection, target):
+    CollectionState.record_change(connection, Widget)
+
+
+@event.listens_for(Widget, "after_delete")
+def _decrement_widget_count(mapper, connection, target):
+    CollectionState.record_change(connection, Widget, item_count_delta=-1)
+
+
+for statement in WIDGET_SEARCH_DDL:
+    event.listen(
+        Widget.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite")
+    )
+event.listen(
+    Widget.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS widget_search").execute_if(dialect="sqlite"),
+)
+# Migrations add the state row of the widget collection, this adds it to databases
+# created with create_all(), which creates collection_state and widget in any order.
+event.listen(
+    db.Model.metadata,
+    "after_create",
+    DDL(
+        "INSERT INTO collection_state (name, item_count, version) "
+        "SELECT 'widget', COUNT(*), 0 FROM widget WHERE NOT EXISTS "
+        "(SELECT 1 FROM collection_state WHERE name = 'widget')"
+    ),
+)
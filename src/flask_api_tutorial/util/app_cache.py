@@ -0,0 +1,56 @@
+"""Flask extension that provides a bounded TTL cache in process memory."""
+from flask import current_app
+
+from flask_api_tutorial.util.cache import TTLCache
+
+
+class AppCache:
+    """Per-application TTL cache, configured by <CONFIG_PREFIX>_* settings.
+
+    <CONFIG_PREFIX>_ENABLED, <CONFIG_PREFIX>_SIZE and <CONFIG_PREFIX>_TTL_SECONDS
+    must be defined in the app config. Each app gets its own cache, stored in
+    app.extensions.
+    """
+
+    def __init__(self, config_prefix, app=None):
+        self.config_prefix = config_prefix
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions[self.extension_name] = TTLCache(
+            maxsize=app.config[f"{self.config_prefix}_SIZE"],
+            ttl=app.config[f"{self.config_prefix}_TTL_SECONDS"],
+        )
+
+    @property
+    def extension_name(self):
+        return self.config_prefix.lower()
+
+    @property
+    def enabled(self):
+        return current_app.config[f"{self.config_prefix}_ENABLED"]
+
+    @property
+    def cache(self):
+        return current_app.extensions[self.extension_name]
+
+    def get(self, key):
+        """Return the cached value for key, or None."""
+        return self.cache.get(key)
+
+    def set(self, key, value, expires_at=None):
+        """Cache value until the TTL elapses or expires_at (unix time), if sooner."""
+        self.cache.set(key, value, expires_at=expires_at)
+
+    def invalidate(self, key):
+        """Remove key from the cache."""
+        self.cache.pop(key)
+
+    def clear(self):
+        """Remove all keys from the cache."""
+        self.cache.clear()
+
+    def stats(self):
+        """Hit/miss counts and current size of the cache for this process."""
+        return self.cache.stats()
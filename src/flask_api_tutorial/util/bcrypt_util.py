@@ -0,0 +1,42 @@
+"""Helper functions for measuring and inspecting bcrypt work factors."""
+import statistics
+import time
+
+import bcrypt
+
+SAMPLE_PASSWORD = b"calibrate bcrypt cost on this host"
+
+
+def get_log_rounds(pw_hash):
+    """Parse the cost (log rounds) from a modular crypt format bcrypt hash."""
+    try:
+        return int(pw_hash.split("$")[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+def measure_hash_time(log_rounds, samples=3):
+    """Median time (milliseconds) to hash a password with the given cost."""
+    durations = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        bcrypt.hashpw(SAMPLE_PASSWORD, bcrypt.gensalt(log_rounds))
+        durations.append((time.perf_counter() - start) * 1000)
+    return statistics.median(durations)
+
+
+def calibrate_log_rounds(target_ms, min_rounds=4, max_rounds=16, samples=3):
+    """Largest cost that hashes a password within target_ms on this host.
+
+    Return a tuple (log_rounds, timings) where timings maps each cost that was
+    measured to its median hash time in milliseconds. Each additional round
+    doubles the hash time, so measuring stops at the first cost over budget.
+    """
+    timings = {}
+    selected = min_rounds
+    for log_rounds in range(min_rounds, max_rounds + 1):
+        timings[log_rounds] = measure_hash_time(log_rounds, samples)
+        if timings[log_rounds] > target_ms:
+            break
+        selected = log_rounds
+    return selected, timings
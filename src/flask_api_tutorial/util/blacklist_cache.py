@@ -0,0 +1,98 @@
+"""Flask extension that caches blacklisted access tokens in process memory."""
+import time
+from threading import Lock
+
+from flask import current_app
+
+from flask_api_tutorial.util.cache import BloomFilter, LRUCache
+
+
+class BlacklistCache:
+    """Bloom filter of blacklisted tokens with an LRU cache of confirmed hits.
+
+    A token that is not in the Bloom filter is definitely not blacklisted and
+    no database query is needed. A token that might be in the filter is looked
+    up in the LRU cache of confirmed hits before falling back to the database.
+    The filter is filled from the database on first use and kept up to date by
+    periodically loading rows added by other worker processes.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions["blacklist_cache"] = _BlacklistCacheState(app.config)
+
+    @property
+    def enabled(self):
+        return current_app.config["BLACKLIST_CACHE_ENABLED"]
+
+    @property
+    def state(self):
+        return current_app.extensions["blacklist_cache"]
+
+    def check(self, token, lookup, load_since):
+        """Return True if token is blacklisted.
+
+        lookup(token) queries the database for a single token, load_since(last_id)
+        returns (id, token) tuples for all rows with an id greater than last_id.
+        """
+        state = self.state
+        state.refresh(load_since)
+        if token not in state.bloom_filter:
+            return False
+        if state.confirmed.get(token):
+            return True
+        blacklisted = lookup(token)
+        if blacklisted:
+            state.confirmed.set(token, True)
+        return blacklisted
+
+    def add(self, token):
+        """Record a token that was just blacklisted by this process."""
+        state = self.state
+        state.bloom_filter.add(token)
+        state.confirmed.set(token, True)
+
+    def reset(self):
+        """Discard all cached tokens, the cache is refilled on next use."""
+        self.state.reset()
+
+
+class _BlacklistCacheState:
+    def __init__(self, config):
+        self.refresh_seconds = config["BLACKLIST_CACHE_REFRESH_SECONDS"]
+        self.capacity = config["BLACKLIST_BLOOM_CAPACITY"]
+        self.error_rate = config["BLACKLIST_BLOOM_ERROR_RATE"]
+        self.confirmed = LRUCache(maxsize=config["BLACKLIST_CACHE_SIZE"])
+        self._lock = Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.bloom_filter = BloomFilter(self.capacity, self.error_rate)
+            self.confirmed.clear()
+            self.last_id = 0
+            self.last_refresh = None
+
+    @property
+    def refresh_due(self):
+        if not self.last_refresh:
+            return True
+        return time.monotonic() - self.last_refresh >= self.refresh_seconds
+
+    def refresh(self, load_since):
+        if not self.refresh_due:
+            return
+        with self._lock:
+            if not self.refresh_due:
+                return
+            if self.bloom_filter.is_full:
+                self.capacity *= 2
+                self.bloom_filter = BloomFilter(self.capacity, self.error_rate)
+                self.last_id = 0
+            for row_id, token in load_since(self.last_id):
+                self.bloom_filter.add(token)
+                self.last_id = max(self.last_id, row_id)
+            self.last_refresh = time.monotonic()
@@ -0,0 +1,179 @@
+"""In-process cache data structures: LRU and TTL caches and a Bloom filter."""
+import hashlib
+import math
+import time
+from collections import OrderedDict
+from threading import Lock
+
+
+class LRUCache:
+    """Thread-safe mapping that evicts the least recently used key when full."""
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        """Return the value for key (marking it as recently used) or default."""
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return default
+            return self._data[key]
+
+    def set(self, key, value):
+        """Store value for key, evicting the least recently used key if necessary."""
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        """Remove key from the cache and return its value (or default)."""
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def clear(self):
+        """Remove all keys from the cache."""
+        with self._lock:
+            self._data.clear()
+
+
+class BloomFilter:
+    """Probabilistic set membership, answers are "definitely not" or "maybe"."""
+
+    def __init__(self, capacity=100000, error_rate=0.001):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = _optimal_num_bits(capacity, error_rate)
+        self.num_hashes = _optimal_num_hashes(self.num_bits, capacity)
+        self.count = 0
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self._lock = Lock()
+
+    def __contains__(self, item):
+        bits = self._bits
+        return all(bits[i >> 3] & (1 << (i & 7)) for i in self._bit_indexes(item))
+
+    def add(self, item):
+        """Add item to the set of values tracked by the filter."""
+        with self._lock:
+            for i in self._bit_indexes(item):
+                self._bits[i >> 3] |= 1 << (i & 7)
+            self.count += 1
+
+    @property
+    def is_full(self):
+        """Flag that indicates the filter holds more items than it was sized for."""
+        return self.count > self.capacity
+
+    def _bit_indexes(self, item):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
+
+
+def _optimal_num_bits(capacity, error_rate):
+    return max(8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+
+
+def _optimal_num_hashes(num_bits, capacity):
+    return max(1, int(round(num_bits / capacity * math.log(2))))
+
+
+class TTLCache(LRUCache):
+    """LRU cache whose entries also expire after ttl seconds or at a set deadline."""
+
+    def __init__(self, maxsize=1024, ttl=60):
+        super().__init__(maxsize)
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        """Return the value for key if it has not expired, otherwise default."""
+        entry = super().get(key)
+        if entry and entry[0] > time.time():
+            self.hits += 1
+            return entry[1]
+        if entry:
+            self.pop(key)
+        self.misses += 1
+        return default
+
+    def set(self, key, value, expires_at=None):
+        """Store value for key until ttl seconds from now or expires_at, if sooner."""
+        deadline = time.time() + self.ttl
+        if expires_at is not None:
+            deadline = min(deadline, expires_at)
+        super().set(key, (deadline, value))
+
+    def stats(self):
+        """Hit and miss counts since the cache was created."""
+        lookups = self.hits + self.misses
+        return dict(
+            hits=self.hits,
+            misses=self.misses,
+            hit_rate=round(self.hits / lookups, 4) if lookups else 0.0,
+            size=len(self),
+            maxsize=self.maxsize,
+        )
+
+
+class SizedLRUCache(LRUCache):
+    """LRU cache that evicts keys when the total size of its values exceeds max_size.
+
+    The size of each value is given by sizeof(value), e.g. len() for bytes.
+    """
+
+    def __init__(self, max_size, sizeof=len):
+        super().__init__(maxsize=None)
+        self.max_size = max_size
+        self.size = 0
+        self._sizeof = sizeof
+
+    def get(self, key, default=None):
+        """Return the value for key (marking it as recently used) or default."""
+        entry = super().get(key)
+        return entry[1] if entry else default
+
+    def set(self, key, value):
+        """Store value for key, evicting least recently used keys if necessary."""
+        size = self._sizeof(value)
+        with self._lock:
+            self._discard(key)
+            if size > self.max_size:
+                return
+            self._data[key] = (size, value)
+            self.size += size
+            while self.size > self.max_size:
+                _, (evicted_size, _) = self._data.popitem(last=False)
+                self.size -= evicted_size
+
+    def pop(self, key, default=None):
+        """Remove key from the cache and return its value (or default)."""
+        with self._lock:
+            entry = self._discard(key)
+        return entry[1] if entry else default
+
+    def clear(self):
+        """Remove all keys from the cache."""
+        with self._lock:
+            self._data.clear()
+            self.size = 0
+
+    def _discard(self, key):
+        entry = self._data.pop(key, None)
+        if entry:
+            self.size -= entry[0]
+        return entry
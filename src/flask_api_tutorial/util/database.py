@@ -0,0 +1,160 @@
+"""Flask-SQLAlchemy extension with SQLite connection settings and read replicas."""
+import itertools
+import math
+import time
+from functools import partial
+
+from flask import current_app, has_request_context, request
+from flask_sqlalchemy import SignallingSession, SQLAlchemy as BaseSQLAlchemy
+from sqlalchemy import event, orm
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.sql.expression import SelectBase, UpdateBase
+
+READ_ONLY_METHODS = ("GET", "HEAD", "OPTIONS")
+# The replica, and whether the request wrote to the database, are stored in the
+# WSGI environ, which (unlike flask.g) is never shared by two requests.
+REPLICA_BIND_ENVIRON_KEY = "flask_api_tutorial.read_replica_bind"
+REPLICA_WRITE_ENVIRON_KEY = "flask_api_tutorial.read_replica_write"
+
+
+class SQLAlchemy(BaseSQLAlchemy):
+    """Flask-SQLAlchemy extension with SQLite connection settings and read replicas.
+
+    Each pragma in SQLITE_PRAGMAS is set whenever a new connection to a SQLite
+    database is opened. If SQLITE_POOL_SIZE is not zero, connections to a SQLite
+    database file are kept open in a pool of that size and handed to any thread
+    (one at a time), instead of opening a new connection for every session.
+    Other databases are not affected, use SQLALCHEMY_ENGINE_OPTIONS for them.
+
+    Queries made while handling a read-only request (GET, HEAD or OPTIONS) are
+    sent to a read replica, if the bind keys of any replicas of the primary
+    database are listed in SQLALCHEMY_REPLICA_BINDS (their URIs are given in
+    SQLALCHEMY_BINDS). Each request is served by the next replica in turn.
+    All other queries, and every query made after a request writes to the
+    database, go to the primary. Replicas can lag behind the primary, so a
+    client that made a write is served by the primary for the next
+    REPLICA_READ_AFTER_WRITE_SECONDS: the response to the write sets the
+    REPLICA_READ_AFTER_WRITE_COOKIE cookie, which any worker honors. A request
+    can also ask to be served by the primary with the REPLICA_FORCE_PRIMARY_HEADER
+    header (e.g. from a client that does not keep cookies), or call
+    force_primary().
+    """
+
+    def init_app(self, app):
+        super().init_app(app)
+        app.extensions["read_replicas"] = _ReadReplicaState()
+        app.after_request(_set_read_after_write_cookie)
+
+    def create_session(self, options):
+        return orm.sessionmaker(class_=RoutingSession, db=self, **options)
+
+    def force_primary(self):
+        """Send all queries made while handling the current request to the primary."""
+        if has_request_context():
+            request.environ[REPLICA_BIND_ENVIRON_KEY] = None
+
+    def read_replica_bind(self):
+        """Bind key of the replica that serves reads for the current request, or None."""
+        if not has_request_context():
+            return None
+        if REPLICA_BIND_ENVIRON_KEY not in request.environ:
+            replica_bind = current_app.extensions["read_replicas"].choose()
+            request.environ[REPLICA_BIND_ENVIRON_KEY] = replica_bind
+        return request.environ[REPLICA_BIND_ENVIRON_KEY]
+
+    def record_write(self):
+        """Send the rest of this request, and the client's next reads, to the primary."""
+        if has_request_context():
+            request.environ[REPLICA_BIND_ENVIRON_KEY] = None
+            request.environ[REPLICA_WRITE_ENVIRON_KEY] = True
+
+    def apply_driver_hacks(self, app, sa_url, options):
+        if sa_url.drivername == "sqlite":
+            pool_size = app.config["SQLITE_POOL_SIZE"]
+            if pool_size and sa_url.database not in (None, "", ":memory:"):
+                options.setdefault("poolclass", QueuePool)
+                options.setdefault("pool_size", pool_size)
+                connect_args = options.setdefault("connect_args", {})
+                connect_args.setdefault("check_same_thread", False)
+            # create_engine is not given the app, so the pragmas are passed
+            # along with the engine options and removed before they are used.
+            options["sqlite_pragmas"] = app.config["SQLITE_PRAGMAS"]
+        return super().apply_driver_hacks(app, sa_url, options)
+
+    def create_engine(self, sa_url, engine_opts):
+        pragmas = engine_opts.pop("sqlite_pragmas", None)
+        engine = super().create_engine(sa_url, engine_opts)
+        if pragmas:
+            event.listen(engine, "connect", partial(set_sqlite_pragmas, pragmas))
+        return engine
+
+
+class RoutingSession(SignallingSession):
+    """Session that sends SELECT statements to the read replica of the request."""
+
+    def __init__(self, db, **options):
+        self._db = db
+        super().__init__(db, **options)
+
+    def get_bind(self, mapper=None, clause=None):
+        if self._flushing or isinstance(clause, UpdateBase):
+            self._db.record_write()
+        elif isinstance(clause, SelectBase):
+            replica_bind = self._db.read_replica_bind()
+            if replica_bind:
+                return self._db.get_engine(self.app, bind=replica_bind)
+        return super().get_bind(mapper, clause)
+
+
+class _ReadReplicaState:
+    def __init__(self):
+        self._request_count = itertools.count()
+
+    def choose(self):
+        config = current_app.config
+        replica_binds = config["SQLALCHEMY_REPLICA_BINDS"]
+        if not replica_binds or request.method not in READ_ONLY_METHODS:
+            return None
+        force_primary = request.headers.get(config["REPLICA_FORCE_PRIMARY_HEADER"], "")
+        if force_primary.lower() in ("1", "true"):
+            return None
+        if _read_primary_until() > time.time():
+            return None
+        return replica_binds[next(self._request_count) % len(replica_binds)]
+
+
+def _read_primary_until():
+    # The cookie is not signed, a client that changes it can only send its own
+    # reads to the primary, as it can with REPLICA_FORCE_PRIMARY_HEADER.
+    cookie = request.cookies.get(current_app.config["REPLICA_READ_AFTER_WRITE_COOKIE"])
+    try:
+        return float(cookie)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _set_read_after_write_cookie(response):
+    config = current_app.config
+    if config["SQLALCHEMY_REPLICA_BINDS"] and request.environ.get(
+        REPLICA_WRITE_ENVIRON_KEY
+    ):
+        seconds = config["REPLICA_READ_AFTER_WRITE_SECONDS"]
+        response.set_cookie(
+            config["REPLICA_READ_AFTER_WRITE_COOKIE"],
+            str(math.ceil(time.time() + seconds)),
+            max_age=seconds,
+            secure=request.is_secure,
+            httponly=True,
+            samesite="Lax",
+        )
+    return response
+
+
+def set_sqlite_pragmas(pragmas, dbapi_connection, connection_record=None):
+    """Execute PRAGMA name=value on a new SQLite connection for each item in pragmas."""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
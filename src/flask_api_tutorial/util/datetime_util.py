@@ -2,12 +2,14 @@
 import time
 from collections import namedtuple
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 
 
 DT_AWARE = "%m/%d/%y %I:%M:%S %p %Z"
 DT_NAIVE = "%m/%d/%y %I:%M:%S %p"
 DATE_MONTH_NAME = "%b %d %Y"
 ONE_DAY_IN_SECONDS = 86400
+UTCOFFSET_BOUNDARY_SECONDS = 900
 
 timespan = namedtuple(
     "timespan",
@@ -30,8 +32,21 @@ def utc_now():
     return datetime.now(timezone.utc).replace(microsecond=0)
 
 
+_local_utcoffset = (0.0, None)
+
+
 def localized_dt_string(dt, use_tz=None):
     """Convert datetime value to a string, localized for the specified timezone."""
+    if not _is_fixed_offset(dt.tzinfo) or not _is_fixed_offset(use_tz):
+        return _localized_dt_string(dt, use_tz)
+    # Aware datetimes (and timezones) that are equal can still have different
+    # offsets or names, so these are part of the cache key.
+    dt_tz_key = (dt.utcoffset(), dt.tzname())
+    use_tz_key = use_tz.tzname(None) if use_tz else None
+    return _cached_localized_dt_string(dt, dt_tz_key, use_tz, use_tz_key)
+
+
+def _localized_dt_string(dt, use_tz):
     if not dt.tzinfo and not use_tz:
         return dt.strftime(DT_NAIVE)
     if not dt.tzinfo:
@@ -39,10 +54,29 @@ def localized_dt_string(dt, use_tz=None):
     return dt.astimezone(use_tz).strftime(DT_AWARE) if use_tz else dt.strftime(DT_AWARE)
 
 
+@lru_cache(maxsize=4096)
+def _cached_localized_dt_string(dt, dt_tz_key, use_tz, use_tz_key):
+    return _localized_dt_string(dt, use_tz)
+
+
+def _is_fixed_offset(tz):
+    return tz is None or type(tz) is timezone
+
+
 def get_local_utcoffset():
     """Get UTC offset from local system and return as timezone object."""
-    utc_offset = timedelta(seconds=time.localtime().tm_gmtoff)
-    return timezone(offset=utc_offset)
+    global _local_utcoffset
+    now = time.time()
+    valid_until, local_tz = _local_utcoffset
+    if now < valid_until:
+        return local_tz
+    # UTC offsets (e.g., DST) only change on a 15-minute boundary, so the offset
+    # is resolved once and reused until the next boundary.
+    utc_offset = timedelta(seconds=time.localtime(now).tm_gmtoff)
+    local_tz = timezone(offset=utc_offset)
+    boundary = UTCOFFSET_BOUNDARY_SECONDS
+    _local_utcoffset = ((now // boundary + 1) * boundary, local_tz)
+    return local_tz
 
 
 def make_tzaware(dt, use_tz=None, localize=True):
@@ -0,0 +1,148 @@
+"""Keyset (cursor) pagination of SQLAlchemy queries."""
+import base64
+import json
+from datetime import datetime
+
+from flask_sqlalchemy import Pagination
+from sqlalchemy import and_, or_
+from sqlalchemy.types import DateTime
+
+
+def encode_cursor(values):
+    """Encode a dict of JSON-serializable values as an opaque, URL-safe string."""
+    data = json.dumps(values, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(data).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Decode a string created by encode_cursor, raise ValueError if it is invalid."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (TypeError, ValueError, UnicodeError):
+        values = None
+    if not isinstance(values, dict):
+        raise ValueError(f"'{cursor}' is not a valid pagination cursor.")
+    return values
+
+
+class OffsetPagination(Pagination):
+    """Page of query results selected by page number, the total count is optional.
+
+    If total is None the number of pages is unknown, has_next must be given by
+    the caller (e.g., by fetching one row more than per_page).
+    """
+
+    def __init__(self, query, page, per_page, total, items, has_next=None):
+        super().__init__(query, page, per_page, total, items)
+        self._has_next = has_next
+
+    @property
+    def pages(self):
+        return super().pages if self.total is not None else None
+
+    @property
+    def has_next(self):
+        return super().has_next if self.total is not None else self._has_next
+
+
+class KeysetPagination:
+    """One page of query results, located relative to a row of a neighbouring page.
+
+    Rows are ordered by sort_column and then by id_column, so the order is stable
+    even when sort_column is not unique. Instead of skipping rows with OFFSET,
+    a page is read by seeking past the last row of the previous page (position
+    "after") or before the first row of the next page (position "before"), which
+    lets the database walk the index on the sort column. The position of a row
+    is the list [sort value, id]. Extra columns can be selected along with each
+    row, their values in the first row are stored in column_values.
+    """
+
+    def __init__(
+        self,
+        query,
+        sort_column,
+        id_column,
+        per_page,
+        after=None,
+        before=None,
+        desc=False,
+        columns=(),
+    ):
+        self.sort_column = sort_column
+        self.id_column = id_column
+        self.per_page = per_page
+        backward = before is not None
+        position = before if backward else after
+        scan_desc = desc != backward
+        if position is not None:
+            query = query.filter(self._seek(self._load_position(position), scan_desc))
+        order_by = (
+            [sort_column, id_column] if sort_column is not id_column else [id_column]
+        )
+        query = query.order_by(*[c.desc() if scan_desc else c.asc() for c in order_by])
+        if columns:
+            query = query.add_columns(*columns)
+        rows = query.limit(per_page + 1).all()
+        self.column_values = tuple(rows[0])[1:] if columns and rows else None
+        if columns:
+            rows = [row[0] for row in rows]
+        more = len(rows) > per_page
+        self.items = rows[:per_page]
+        if backward:
+            self.items.reverse()
+            self.has_prev, self.has_next = more, True
+        else:
+            self.has_prev, self.has_next = position is not None, more
+        if not self.items:
+            self.has_prev = self.has_next = False
+
+    @property
+    def next_position(self):
+        return self._dump_position(self.items[-1]) if self.has_next else None
+
+    @property
+    def prev_position(self):
+        return self._dump_position(self.items[0]) if self.has_prev else None
+
+    def _seek(self, position, scan_desc):
+        sort_value, id_value = position
+        if self.sort_column is self.id_column:
+            return self.id_column < id_value if scan_desc else self.id_column > id_value
+        # The redundant bound on sort_column lets the database seek on its index,
+        # an OR of the two conditions alone makes SQLite scan the index instead.
+        if scan_desc:
+            return and_(
+                self.sort_column <= sort_value,
+                or_(self.sort_column < sort_value, self.id_column < id_value),
+            )
+        return and_(
+            self.sort_column >= sort_value,
+            or_(self.sort_column > sort_value, self.id_column > id_value),
+        )
+
+    def _dump_position(self, row):
+        sort_value = getattr(row, self.sort_column.key)
+        if isinstance(sort_value, datetime):
+            sort_value = sort_value.isoformat()
+        return [sort_value, getattr(row, self.id_column.key)]
+
+    def _load_position(self, position):
+        try:
+            sort_value, id_value = position
+            return [
+                self._load_value(self.sort_column, sort_value),
+                self._load_value(self.id_column, id_value),
+            ]
+        except (TypeError, ValueError):
+            raise ValueError("Pagination cursor does not contain a valid position.")
+
+    @staticmethod
+    def _load_value(column, value):
+        # Cursors can be tampered with, a value of any other type (e.g. null or a
+        # list) would not compare as expected or could not be bound at all.
+        if isinstance(column.type, DateTime) and isinstance(value, str):
+            return datetime.fromisoformat(value)
+        if type(value) is not column.type.python_type:
+            raise TypeError(f"Expected a value of type {column.type.python_type}.")
+        return value
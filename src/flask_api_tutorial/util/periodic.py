@@ -0,0 +1,26 @@
+"""Background thread that runs a function at a fixed interval."""
+import logging
+from threading import Event, Thread
+
+
+class PeriodicTask(Thread):
+    """Call func inside an application context every interval seconds."""
+
+    def __init__(self, app, func, interval, name=None):
+        super().__init__(name=name or func.__name__, daemon=True)
+        self.app = app
+        self.func = func
+        self.interval = interval
+        self._stopped = Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            with self.app.app_context():
+                try:
+                    self.func()
+                except Exception:
+                    logging.getLogger(__name__).exception(f"{self.name} failed")
+
+    def stop(self):
+        """Signal the thread to exit after the current run (if any) completes."""
+        self._stopped.set()
@@ -0,0 +1,104 @@
+"""Flask extension that caches complete responses, keyed by request and data version."""
+import time
+from collections import namedtuple
+
+from flask import current_app
+from werkzeug.utils import import_string
+
+from flask_api_tutorial.util.cache import SizedLRUCache
+
+CachedResponse = namedtuple("CachedResponse", ["body", "status", "headers"])
+
+
+def _response_size(cached_response):
+    headers_size = sum(len(name) + len(value) for name, value in cached_response.headers)
+    return len(cached_response.body) + headers_size
+
+
+class LocalResponseCacheBackend:
+    """Cached responses stored in process memory.
+
+    Entries are kept in an LRU cache bounded by the total size of the cached
+    bodies and headers (RESPONSE_CACHE_MAX_BYTES). This is the stand-in for a
+    shared backend: any class that implements get(), set() and clear() with the
+    same signatures can be configured instead, so that every worker shares the
+    same entries.
+    """
+
+    def __init__(self, app):
+        self._entries = SizedLRUCache(
+            max_size=app.config["RESPONSE_CACHE_MAX_BYTES"],
+            sizeof=lambda entry: _response_size(entry[1]),
+        )
+
+    def get(self, key):
+        """Return the CachedResponse stored for key, or None if missing or expired."""
+        entry = self._entries.get(key)
+        if entry and entry[0] > time.time():
+            return entry[1]
+        if entry:
+            self._entries.pop(key)
+        return None
+
+    def set(self, key, cached_response, expires_at):
+        """Store a CachedResponse for key until expires_at (a UNIX timestamp)."""
+        self._entries.set(key, (expires_at, cached_response))
+
+    def clear(self):
+        """Remove all cached responses."""
+        self._entries.clear()
+
+
+class ResponseCache:
+    """Cache responses that are fully determined by their key.
+
+    Callers include the version of the data a response was built from in the
+    key, so an entry can never be served after the data changes, even by a
+    worker that did not make the change. Entries also expire after
+    RESPONSE_CACHE_TTL_SECONDS, which bounds the staleness of any values that
+    depend on the current time.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        backend_class = import_string(app.config["RESPONSE_CACHE_BACKEND"])
+        app.extensions["response_cache"] = backend_class(app)
+
+    @property
+    def enabled(self):
+        return current_app.config["RESPONSE_CACHE_ENABLED"]
+
+    @property
+    def backend(self):
+        return current_app.extensions["response_cache"]
+
+    def get(self, key):
+        """Return a new response object for the entry stored for key, or None."""
+        cached_response = self.backend.get(key)
+        if not cached_response:
+            return None
+        return current_app.response_class(
+            cached_response.body,
+            status=cached_response.status,
+            headers=cached_response.headers,
+        )
+
+    def set(self, key, response, expires_at=None):
+        """Store response for key, until expires_at (a UNIX timestamp) if sooner."""
+        deadline = time.time() + current_app.config["RESPONSE_CACHE_TTL_SECONDS"]
+        if expires_at is not None:
+            deadline = min(deadline, expires_at)
+        headers = [
+            (name, value) for name, value in response.headers if name != "Content-Length"
+        ]
+        cached_response = CachedResponse(
+            response.get_data(), response.status_code, headers
+        )
+        self.backend.set(key, cached_response, deadline)
+
+    def clear(self):
+        """Remove all cached responses."""
+        self.backend.clear()
@@ -0,0 +1,162 @@
+"""Serializers compiled from flask_restx models, equivalent to flask_restx.marshal."""
+from calendar import timegm
+from datetime import datetime
+from email.utils import formatdate
+
+from flask import current_app, url_for
+from flask_restx import fields, marshal
+
+
+class CompiledModel:
+    """Serialize objects as marshal(obj, model) would, without walking the model.
+
+    The model is compiled once into a list of (key, serialize_field) pairs, each
+    specialized for its field type. Fields that have no specialized version
+    (masks, callable defaults, dotted attributes, wildcards, etc.) fall back to
+    the field's own output method, so the result is always the same as marshal.
+    URLs are built from a template that is generated once per call, instead of
+    calling url_for for every object.
+    """
+
+    def __init__(self, model, skip_none=False):
+        self.model = model
+        self.skip_none = skip_none
+        model_fields = getattr(model, "resolved", model)
+        self._fields = [
+            (key, _compile_field(key, field)) for key, field in model_fields.items()
+        ]
+
+    def __call__(self, obj):
+        return self.serialize(obj, {})
+
+    def serialize(self, obj, url_templates):
+        if isinstance(obj, (list, tuple)):
+            return [self.serialize(item, url_templates) for item in obj]
+        items = ((key, field(obj, url_templates)) for key, field in self._fields)
+        if self.skip_none:
+            items = ((k, v) for k, v in items if v is not None and v != {})
+        return dict(items)
+
+
+def _get_value(obj, key):
+    if isinstance(obj, dict):
+        return obj.get(key)
+    if fields.is_indexable_but_not_string(obj):
+        return fields.get_value(key, obj)
+    return getattr(obj, key, None)
+
+
+def _compile_field(key, field):
+    if isinstance(field, dict):
+        return lambda obj, url_templates: marshal(obj, field)
+    field = field() if isinstance(field, type) else field
+    attribute = key if field.attribute is None else field.attribute
+    generic = _generic_field(key, field)
+    if field.mask or not isinstance(attribute, str) or "." in attribute:
+        return generic
+    if callable(field.default):
+        return generic
+    if type(field) is fields.Url:
+        return _compile_url(field, generic)
+    if type(field) is fields.Nested:
+        return _compile_nested(attribute, field, generic)
+    if type(field) is fields.List and type(field.container) is fields.Nested:
+        return _compile_list(attribute, field, generic)
+    format_value = _compile_format(field)
+    if not format_value:
+        return generic
+    default = field.default
+    if_none = field.format(default) if default else default
+
+    def serialize_field(obj, url_templates):
+        value = _get_value(obj, attribute)
+        return if_none if value is None else format_value(value)
+
+    return serialize_field
+
+
+def _generic_field(key, field):
+    return lambda obj, url_templates: field.output(key, obj)
+
+
+def _compile_format(field):
+    field_type = type(field)
+    if field_type is fields.String:
+        return str
+    if field_type is fields.Integer:
+        return int
+    if field_type in (fields.Raw, fields.Boolean):
+        return field.format
+    if field_type is fields.DateTime and field.dt_format == "iso8601":
+        return lambda value: (
+            value.isoformat() if type(value) is datetime else field.format(value)
+        )
+    if field_type is fields.DateTime and field.dt_format == "rfc822":
+        return lambda value: (
+            formatdate(timegm(value.utctimetuple()))
+            if type(value) is datetime
+            else field.format(value)
+        )
+    return None
+
+
+def _compile_nested(attribute, field, generic):
+    nested = CompiledModel(field.nested, skip_none=field.skip_none)
+
+    def serialize_field(obj, url_templates):
+        value = _get_value(obj, attribute)
+        if value is None:
+            return generic(obj, url_templates)
+        return nested.serialize(value, url_templates)
+
+    return serialize_field
+
+
+def _compile_list(attribute, field, generic):
+    container = field.container
+    nested = CompiledModel(container.nested, skip_none=container.skip_none)
+
+    def serialize_field(obj, url_templates):
+        value = _get_value(obj, attribute)
+        if value is None or not isinstance(value, (list, tuple)):
+            return generic(obj, url_templates)
+        return [
+            (
+                container.output(index, value)
+                if item is None
+                else nested.serialize(item, url_templates)
+            )
+            for index, item in enumerate(value)
+        ]
+
+    return serialize_field
+
+
+def _compile_url(field, generic):
+    if field.absolute or field.endpoint is None:
+        return generic
+
+    def serialize_field(obj, url_templates):
+        template = url_templates.get(field.endpoint)
+        if template is None:
+            template = url_templates[field.endpoint] = _url_template(field.endpoint)
+        path, converters = template
+        for placeholder, argument, converter in converters:
+            value = _get_value(obj, argument)
+            if value is None:
+                return generic(obj, url_templates)
+            path = path.replace(placeholder, converter.to_url(value))
+        return path
+
+    return serialize_field
+
+
+def _url_template(endpoint):
+    rule = current_app.url_map._rules_by_endpoint[endpoint][0]
+    placeholders = {arg: f"__{arg}_placeholder__" for arg in rule.arguments}
+    path = url_for(endpoint, **placeholders).split("?")[0].split("#")[0]
+    converters = [
+        (placeholder, arg, rule._converters[arg])
+        for arg, placeholder in placeholders.items()
+    ]
+    return path, converters
@@ -0,0 +1,95 @@
+"""Flask extension that rate limits requests with token buckets."""
+import math
+import time
+from threading import Lock
+
+from flask import current_app
+from werkzeug.utils import import_string
+
+from flask_api_tutorial.util.cache import LRUCache
+
+
+class ThrottledError(Exception):
+    """Raised when a token bucket is empty."""
+
+    def __init__(self, retry_after):
+        self.retry_after = retry_after
+        super().__init__(f"Rate limit exceeded, retry after {retry_after} seconds")
+
+
+class LocalThrottleBackend:
+    """Token buckets stored in process memory.
+
+    Buckets are kept in an LRU cache so memory use is bounded, a bucket that is
+    evicted starts over as a full bucket. This is the stand-in for a shared
+    backend: any class that implements consume() with the same signature (and
+    takes the tokens atomically) can be configured instead, so that every
+    worker draws from the same buckets.
+    """
+
+    def __init__(self, app):
+        self._buckets = LRUCache(maxsize=app.config["THROTTLE_MAX_KEYS"])
+        self._lock = Lock()
+
+    def consume(self, buckets):
+        """Take one token from each bucket, given as (key, capacity, refill_seconds).
+
+        Tokens are only taken if every bucket has one, a request rejected by one
+        bucket does not use up the others. Return 0 if the tokens were taken,
+        otherwise the number of seconds until every bucket has a token again.
+        """
+        with self._lock:
+            now = time.monotonic()
+            levels = []
+            retry_after = 0
+            for key, capacity, refill_seconds in buckets:
+                tokens, updated_at = self._buckets.get(key, (capacity, now))
+                tokens = min(capacity, tokens + (now - updated_at) / refill_seconds)
+                levels.append((key, tokens))
+                if tokens < 1:
+                    retry_after = max(retry_after, (1 - tokens) * refill_seconds)
+            if not retry_after:
+                levels = [(key, tokens - 1) for key, tokens in levels]
+            for key, tokens in levels:
+                self._buckets.set(key, (tokens, now))
+            return retry_after
+
+
+class Throttle:
+    """Rate limit requests by one or more keys, e.g. email address and client IP."""
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        backend_class = import_string(app.config["THROTTLE_BACKEND"])
+        app.extensions["throttle"] = backend_class(app)
+
+    @property
+    def backend(self):
+        return current_app.extensions["throttle"]
+
+    def check(self, scope, **keys):
+        """Consume a token for each key, raise ThrottledError if any bucket is empty.
+
+        No token is consumed unless every bucket has one. The capacity and refill
+        rate for each key are read from the config values
+        <SCOPE>_THROTTLE_<KEY>_CAPACITY and <SCOPE>_THROTTLE_<KEY>_REFILL_SECONDS.
+        """
+        config = current_app.config
+        if not config[f"{scope.upper()}_THROTTLE_ENABLED"]:
+            return
+        buckets = []
+        for key_name, key_value in keys.items():
+            setting = f"{scope.upper()}_THROTTLE_{key_name.upper()}"
+            buckets.append(
+                (
+                    f"{scope}:{key_name}:{key_value}",
+                    config[f"{setting}_CAPACITY"],
+                    config[f"{setting}_REFILL_SECONDS"],
+                )
+            )
+        retry_after = self.backend.consume(buckets)
+        if retry_after:
+            raise ThrottledError(int(math.ceil(retry_after)))
@@ -0,0 +1,89 @@
+"""Flask extension that runs CPU-bound work on a bounded thread or process pool."""
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from threading import BoundedSemaphore, Lock
+
+from flask import current_app
+
+
+class PoolSaturatedError(Exception):
+    """Raised when every worker is busy and the queue is full."""
+
+    def __init__(self, retry_after):
+        self.retry_after = retry_after
+        super().__init__(f"Worker pool is saturated, retry after {retry_after} seconds")
+
+
+class WorkerPool:
+    """Run functions inline, on a thread pool or on a process pool.
+
+    At most pool_size + queue_depth calls can be running or waiting at once.
+    When that limit is reached run() raises PoolSaturatedError immediately
+    instead of making the caller wait behind the queue. The executor is created
+    on first use, after any pre-fork server has started its worker processes.
+    """
+
+    def __init__(self, config_prefix, app=None):
+        self.config_prefix = config_prefix
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions[self.extension_name] = _WorkerPoolState()
+
+    @property
+    def extension_name(self):
+        return f"{self.config_prefix.lower()}_pool"
+
+    @property
+    def state(self):
+        return current_app.extensions[self.extension_name]
+
+    def config(self, name):
+        return current_app.config[f"{self.config_prefix}_{name}"]
+
+    def run(self, func, *args):
+        """Call func(*args) in the configured execution mode and return the result."""
+        executor_type = self.config("EXECUTOR")
+        if executor_type == "inline":
+            return func(*args)
+        state = self.state
+        state.start(executor_type, self.config("POOL_SIZE"), self.config("QUEUE_DEPTH"))
+        if not state.slots.acquire(blocking=False):
+            raise PoolSaturatedError(self.config("RETRY_AFTER_SECONDS"))
+        try:
+            future = state.executor.submit(func, *args)
+        except Exception:
+            state.slots.release()
+            raise
+        future.add_done_callback(lambda f: state.slots.release())
+        return future.result()
+
+    def shutdown(self):
+        """Stop the executor, it is started again on next use."""
+        self.state.shutdown()
+
+
+class _WorkerPoolState:
+    def __init__(self):
+        self.executor = None
+        self.slots = None
+        self._lock = Lock()
+
+    def start(self, executor_type, pool_size, queue_depth):
+        if self.executor:
+            return
+        with self._lock:
+            if self.executor:
+                return
+            executor_class = (
+                ProcessPoolExecutor if executor_type == "process" else ThreadPoolExecutor
+            )
+            self.slots = BoundedSemaphore(pool_size + queue_depth)
+            self.executor = executor_class(max_workers=pool_size)
+
+    def shutdown(self):
+        with self._lock:
+            if self.executor:
+                self.executor.shutdown(wait=True)
+            self.executor = None
+            self.slots = None
@@ -0,0 +1,35 @@
+"""Stress tests for concurrent requests sent by different users."""
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+from flask import url_for
+
+from tests.util import register_user
+
+NUM_USERS = 8
+REQUESTS_PER_USER = 25
+
+
+def test_auth_user_concurrent_requests(app, client, db):
+    emails = [f"user{i}@email.com" for i in range(NUM_USERS)]
+    access_tokens = {}
+    for email in emails:
+        response = register_user(client, email=email)
+        assert response.status_code == HTTPStatus.CREATED
+        access_tokens[email] = response.json["access_token"]
+    auth_user_url = url_for("api.auth_user")
+
+    def get_user_repeatedly(email):
+        headers = {"Authorization": f"Bearer {access_tokens[email]}"}
+        emails_returned = []
+        with app.test_client() as thread_client:
+            for _ in range(REQUESTS_PER_USER):
+                response = thread_client.get(auth_user_url, headers=headers)
+                assert response.status_code == HTTPStatus.OK
+                emails_returned.append(response.json["email"])
+        return emails_returned
+
+    with ThreadPoolExecutor(max_workers=NUM_USERS) as executor:
+        results = dict(zip(emails, executor.map(get_user_repeatedly, emails)))
+    for email, emails_returned in results.items():
+        assert emails_returned == [email] * REQUESTS_PER_USER
@@ -1,11 +1,14 @@
 """Unit tests for api.auth_login API endpoint."""
 from http import HTTPStatus
 
+from flask_api_tutorial import bcrypt_pool
 from flask_api_tutorial.models.user import User
-from tests.util import EMAIL, register_user, login_user
+from tests.util import EMAIL, PASSWORD, register_user, login_user
 
 SUCCESS = "successfully logged in"
 UNAUTHORIZED = "email or password does not match"
+SERVER_BUSY = "Server is busy, please try again later."
+TOO_MANY_REQUESTS = "Too many requests, try again later."
 
 
 def test_login(client, db):
@@ -30,3 +33,110 @@ def test_login_email_does_not_exist(client, db):
     assert "status" in response.json and response.json["status"] == "fail"
     assert "message" in response.json and response.json["message"] == UNAUTHORIZED
     assert "access_token" not in response.json
+
+
+def test_login_thread_pool(app, client, db):
+    app.config["BCRYPT_EXECUTOR"] = "thread"
+    register_user(client)
+    response = login_user(client)
+    assert response.status_code == HTTPStatus.OK
+    assert "access_token" in response.json
+    response = login_user(client, password="wrong password")
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+    bcrypt_pool.shutdown()
+
+
+def test_login_thread_pool_saturated(app, client, db):
+    register_user(client)
+    app.config["BCRYPT_EXECUTOR"] = "thread"
+    app.config["BCRYPT_POOL_SIZE"] = 1
+    app.config["BCRYPT_QUEUE_DEPTH"] = 0
+    bcrypt_pool.state.start("thread", 1, 0)
+    bcrypt_pool.state.slots.acquire()
+    response = login_user(client)
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert "message" in response.json and response.json["message"] == SERVER_BUSY
+    assert "Retry-After" in response.headers
+    assert response.headers["Retry-After"] == "1"
+    bcrypt_pool.state.slots.release()
+    response = login_user(client)
+    assert response.status_code == HTTPStatus.OK
+    bcrypt_pool.shutdown()
+
+
+def test_login_throttled_by_email(app, client, db):
+    app.config["LOGIN_THROTTLE_EMAIL_CAPACITY"] = 2
+    register_user(client)
+    for _ in range(2):
+        response = login_user(client, password="wrong password")
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+    response = login_user(client)
+    assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+    assert "message" in response.json and response.json["message"] == TOO_MANY_REQUESTS
+    assert "Retry-After" in response.headers
+    assert int(response.headers["Retry-After"]) > 0
+    response = login_user(client, email="other_user@email.com")
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_login_throttled_by_client(app, client, db):
+    app.config["LOGIN_THROTTLE_CLIENT_CAPACITY"] = 2
+    register_user(client)
+    for i in range(2):
+        response = login_user(client, email=f"user{i}@email.com")
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+    response = login_user(client)
+    assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+    assert "Retry-After" in response.headers
+
+
+def test_login_throttled_client_does_not_lock_out_email(app, client, db):
+    app.config["LOGIN_THROTTLE_CLIENT_CAPACITY"] = 2
+    app.config["LOGIN_THROTTLE_EMAIL_CAPACITY"] = 3
+    register_user(client)
+    for _ in range(2):
+        response = login_user(client, password="wrong password", remote_addr="10.0.0.2")
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+    for _ in range(5):
+        response = login_user(client, password="wrong password", remote_addr="10.0.0.2")
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+    response = login_user(client, remote_addr="10.0.0.3")
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_login_throttled_email_does_not_use_up_client(app, client, db):
+    app.config["LOGIN_THROTTLE_CLIENT_CAPACITY"] = 3
+    app.config["LOGIN_THROTTLE_EMAIL_CAPACITY"] = 1
+    register_user(client)
+    response = login_user(client, password="wrong password")
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+    for _ in range(5):
+        response = login_user(client)
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+    for i in range(2):
+        response = login_user(client, email=f"user{i}@email.com")
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_login_rehash_password(app, client, db):
+    register_user(client)
+    user = User.find_by_email(EMAIL)
+    assert user.password_hash.startswith("$2b$04$")
+    app.config["BCRYPT_LOG_ROUNDS"] = 5
+    response = login_user(client)
+    assert response.status_code == HTTPStatus.OK
+    db.session.expire_all()
+    user = User.find_by_email(EMAIL)
+    assert user.password_hash.startswith("$2b$05$")
+    assert user.check_password(PASSWORD)
+
+
+def test_login_rehash_disabled(app, client, db):
+    register_user(client)
+    app.config["BCRYPT_LOG_ROUNDS"] = 5
+    app.config["BCRYPT_REHASH_ON_LOGIN"] = False
+    response = login_user(client)
+    assert response.status_code == HTTPStatus.OK
+    db.session.expire_all()
+    user = User.find_by_email(EMAIL)
+    assert user.password_hash.startswith("$2b$04$")
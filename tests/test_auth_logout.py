@@ -32,7 +32,8 @@ def test_logout(client, db):
     assert "message" in response.json and response.json["message"] == SUCCESS
     blacklist = BlacklistedToken.query.all()
     assert len(blacklist) == 1
-    assert access_token == blacklist[0].token
+    token_digest = BlacklistedToken.get_token_digest(access_token)
+    assert token_digest == blacklist[0].token_digest
 
 
 def test_logout_token_blacklisted(client, db):
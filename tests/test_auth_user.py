@@ -3,6 +3,8 @@ import time
 from http import HTTPStatus
 
 from flask import url_for
+
+from flask_api_tutorial import token_cache
 from tests.util import (
     EMAIL,
     TOKEN_EXPIRED,
@@ -14,6 +16,8 @@ from tests.util import (
     login_user,
     logout_user,
     get_user,
+    count_queries,
+    select_statements,
 )
 
 
@@ -90,3 +94,36 @@ def test_auth_user_token_blacklisted(client, db):
     assert "message" in response.json and response.json["message"] == TOKEN_BLACKLISTED
     assert "WWW-Authenticate" in response.headers
     assert response.headers["WWW-Authenticate"] == WWW_AUTH_BLACKLISTED_TOKEN
+
+
+def test_auth_user_token_cache(client, db):
+    register_user(client)
+    response = login_user(client)
+    assert "access_token" in response.json
+    access_token = response.json["access_token"]
+    for _ in range(3):
+        response = get_user(client, access_token)
+        assert response.status_code == HTTPStatus.OK
+    stats = token_cache.stats()
+    assert stats["misses"] == 1 and stats["hits"] == 2
+    assert token_cache.get(access_token)
+    response = logout_user(client, access_token)
+    assert response.status_code == HTTPStatus.OK
+    assert not token_cache.get(access_token)
+    response = get_user(client, access_token)
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+    assert "message" in response.json and response.json["message"] == TOKEN_BLACKLISTED
+
+
+def test_auth_user_query_count(client, db):
+    register_user(client)
+    response = login_user(client)
+    assert "access_token" in response.json
+    access_token = response.json["access_token"]
+    response = get_user(client, access_token)
+    assert response.status_code == HTTPStatus.OK
+    with count_queries() as statements:
+        response = get_user(client, access_token)
+    assert response.status_code == HTTPStatus.OK
+    assert "email" in response.json and response.json["email"] == EMAIL
+    assert not select_statements(statements, "site_user")
@@ -1,8 +1,16 @@
 """Unit tests for environment config settings."""
 import os
 
-from flask_api_tutorial import create_app
-from flask_api_tutorial.config import SQLITE_DEV, SQLITE_PROD, SQLITE_TEST
+from sqlalchemy.pool import NullPool, QueuePool
+
+from flask_api_tutorial import create_app, db
+from flask_api_tutorial.config import (
+    SQLITE_DEV,
+    SQLITE_PROD,
+    SQLITE_TEST,
+    ProductionConfig,
+    replica_binds,
+)
 
 
 def test_config_development():
@@ -32,3 +40,42 @@ def test_config_production():
     )
     assert app.config["TOKEN_EXPIRE_HOURS"] == 1
     assert app.config["TOKEN_EXPIRE_MINUTES"] == 0
+    assert app.config["SQLITE_PRAGMAS"]["journal_mode"] == "WAL"
+    assert app.config["SQLITE_POOL_SIZE"] > 0
+
+
+def test_config_sqlite_production_profile(tmp_path):
+    app = create_app("testing")
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path / 'prod.db'}"
+    app.config["SQLITE_PRAGMAS"] = ProductionConfig.SQLITE_PRAGMAS
+    app.config["SQLITE_POOL_SIZE"] = ProductionConfig.SQLITE_POOL_SIZE
+    with app.app_context():
+        assert isinstance(db.engine.pool, QueuePool)
+        assert db.engine.pool.size() == ProductionConfig.SQLITE_POOL_SIZE
+        pragmas = {
+            name: db.session.execute(f"PRAGMA {name}").scalar()
+            for name in ProductionConfig.SQLITE_PRAGMAS
+        }
+        db.session.remove()
+    assert pragmas["journal_mode"] == "wal"
+    assert pragmas["synchronous"] == 1
+    assert pragmas["busy_timeout"] == ProductionConfig.SQLITE_PRAGMAS["busy_timeout"]
+    assert pragmas["mmap_size"] == ProductionConfig.SQLITE_PRAGMAS["mmap_size"]
+
+
+def test_config_sqlite_default_profile(tmp_path):
+    app = create_app("testing")
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path / 'test.db'}"
+    with app.app_context():
+        assert isinstance(db.engine.pool, NullPool)
+        journal_mode = db.session.execute("PRAGMA journal_mode").scalar()
+        db.session.remove()
+    assert journal_mode == "delete"
+
+
+def test_config_replica_binds():
+    assert replica_binds("") == {}
+    binds = replica_binds("sqlite:///replica1.db, sqlite:///replica2.db,")
+    assert binds == dict(
+        replica1="sqlite:///replica1.db", replica2="sqlite:///replica2.db"
+    )
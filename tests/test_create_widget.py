@@ -16,6 +16,8 @@ from tests.util import (
     DEFAULT_DEADLINE,
     login_user,
     create_widget,
+    count_queries,
+    select_statements,
 )
 
 
@@ -133,6 +135,16 @@ def test_create_widget_already_exists(client, db, admin):
     assert "message" in response.json and response.json["message"] == name_conflict
 
 
+def test_create_widget_already_exists_ignoring_case(client, db, admin):
+    response = login_user(client, email=ADMIN_EMAIL)
+    assert "access_token" in response.json
+    access_token = response.json["access_token"]
+    response = create_widget(client, access_token)
+    assert response.status_code == HTTPStatus.CREATED
+    response = create_widget(client, access_token, widget_name=DEFAULT_NAME.upper())
+    assert response.status_code == HTTPStatus.CONFLICT
+
+
 def test_create_widget_no_token(client, db):
     request_data = (
         f"name={DEFAULT_NAME}&info_url={DEFAULT_URL}&deadline={DEFAULT_DEADLINE}"
@@ -172,3 +184,29 @@ def test_create_widget_bundle_errors(client, db, admin):
     assert (
         "info_url" in response.json["errors"] and "deadline" in response.json["errors"]
     )
+
+
+def test_create_widget_query_count(client, db, admin):
+    response = login_user(client, email=ADMIN_EMAIL)
+    assert "access_token" in response.json
+    access_token = response.json["access_token"]
+    response = create_widget(client, access_token, widget_name="first_widget")
+    assert response.status_code == HTTPStatus.CREATED
+    with count_queries() as statements:
+        response = create_widget(client, access_token, widget_name="second_widget")
+    assert response.status_code == HTTPStatus.CREATED
+    assert not select_statements(statements, "site_user")
+    assert not select_statements(statements, "widget")
+
+
+def test_create_widget_admin_revoked(client, db, admin):
+    response = login_user(client, email=ADMIN_EMAIL)
+    assert "access_token" in response.json
+    access_token = response.json["access_token"]
+    response = create_widget(client, access_token)
+    assert response.status_code == HTTPStatus.CREATED
+    admin.admin = False
+    db.session.commit()
+    response = create_widget(client, access_token, widget_name="another_widget")
+    assert response.status_code == HTTPStatus.FORBIDDEN
+    assert "message" in response.json and response.json["message"] == FORBIDDEN
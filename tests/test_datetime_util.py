@@ -0,0 +1,70 @@
+"""Unit tests for cached timezone and timestamp formatting in datetime_util."""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from flask_api_tutorial.util import datetime_util
+from flask_api_tutorial.util.datetime_util import (
+    get_local_utcoffset,
+    localized_dt_string,
+    UTCOFFSET_BOUNDARY_SECONDS,
+)
+
+EST = timedelta(hours=-5)
+EDT = timedelta(hours=-4)
+
+
+class FakeClock:
+    def __init__(self, now, utc_offset):
+        self.now = now
+        self.utc_offset = utc_offset
+        self.localtime_calls = 0
+
+    def time(self):
+        return self.now
+
+    def localtime(self, secs=None):
+        self.localtime_calls += 1
+        return type(
+            "struct_time", (), dict(tm_gmtoff=int(self.utc_offset.total_seconds()))
+        )
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    boundary = 1_700_000_000 // UTCOFFSET_BOUNDARY_SECONDS * UTCOFFSET_BOUNDARY_SECONDS
+    clock = FakeClock(boundary - 60, EST)
+    monkeypatch.setattr(datetime_util, "time", clock)
+    monkeypatch.setattr(datetime_util, "_local_utcoffset", (0.0, None))
+    return clock
+
+
+def test_local_utcoffset_resolved_once_per_boundary(clock):
+    for _ in range(100):
+        assert get_local_utcoffset() == timezone(EST)
+    assert clock.localtime_calls == 1
+
+
+def test_local_utcoffset_follows_dst_change(clock):
+    assert get_local_utcoffset() == timezone(EST)
+    clock.now += 60
+    clock.utc_offset = EDT
+    assert get_local_utcoffset() == timezone(EDT)
+    assert clock.localtime_calls == 2
+
+
+def test_localized_dt_string_cache_keeps_timezone():
+    utc = datetime(2020, 3, 8, 7, 0, tzinfo=timezone.utc)
+    est = utc.astimezone(timezone(EST))
+    named = utc.astimezone(timezone(EST, "EST"))
+    assert utc == est == named
+    assert localized_dt_string(utc) == "03/08/20 07:00:00 AM UTC"
+    assert localized_dt_string(est) == "03/08/20 02:00:00 AM UTC-05:00"
+    assert localized_dt_string(named) == "03/08/20 02:00:00 AM EST"
+    assert localized_dt_string(utc, use_tz=timezone(EDT)) == (
+        "03/08/20 03:00:00 AM UTC-04:00"
+    )
+    assert localized_dt_string(utc, use_tz=timezone(EDT, "EDT")) == (
+        "03/08/20 03:00:00 AM EDT"
+    )
+    assert localized_dt_string(utc.replace(tzinfo=None)) == "03/08/20 07:00:00 AM"
@@ -0,0 +1,71 @@
+"""Test cases for GET requests sent to the api.widget_export API endpoint."""
+import csv
+import io
+import json
+from http import HTTPStatus
+
+from tests.util import (
+    ADMIN_EMAIL,
+    EMAIL,
+    FORBIDDEN,
+    login_user,
+    create_widget,
+    retrieve_widget,
+    export_widgets,
+)
+
+NAMES = ["widget1", "export", "widget-thrice"]
+
+
+def test_export_widgets_ndjson(app, client, db, admin):
+    app.config["WIDGET_EXPORT_BATCH_SIZE"] = 2
+    response = login_user(client, email=ADMIN_EMAIL)
+    assert "access_token" in response.json
+    access_token = response.json["access_token"]
+    for name in NAMES:
+        response = create_widget(client, access_token, widget_name=name)
+        assert response.status_code == HTTPStatus.CREATED
+    response = export_widgets(client, access_token, "ndjson")
+    assert response.status_code == HTTPStatus.OK
+    assert response.is_streamed
+    assert response.mimetype == "application/x-ndjson"
+    assert "filename=widgets.ndjson" in response.headers["Content-Disposition"]
+    lines = response.get_data(as_text=True).splitlines()
+    exported = [json.loads(line) for line in lines]
+    assert [widget["name"] for widget in exported] == NAMES
+    for widget in exported:
+        response = retrieve_widget(client, access_token, widget_name=widget["name"])
+        assert response.status_code == HTTPStatus.OK
+        widget_json = dict(response.json, time_remaining=widget["time_remaining"])
+        assert widget_json == widget
+
+
+def test_export_widgets_csv(app, client, db, admin):
+    app.config["WIDGET_EXPORT_BATCH_SIZE"] = 2
+    response = login_user(client, email=ADMIN_EMAIL)
+    assert "access_token" in response.json
+    access_token = response.json["access_token"]
+    response = export_widgets(client, access_token, "csv")
+    assert response.status_code == HTTPStatus.OK
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert not rows
+
+    for name in NAMES:
+        response = create_widget(client, access_token, widget_name=name)
+        assert response.status_code == HTTPStatus.CREATED
+    response = export_widgets(client, access_token, "csv")
+    assert response.status_code == HTTPStatus.OK
+    assert response.mimetype == "text/csv"
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert [row["name"] for row in rows] == NAMES
+    assert all(row["owner.email"] == ADMIN_EMAIL for row in rows)
+    assert rows[0]["link"] == "/api/v1/widgets/widget1"
+
+
+def test_export_widgets_no_admin_token(client, db, admin, user):
+    response = login_user(client, email=EMAIL)
+    assert "access_token" in response.json
+    access_token = response.json["access_token"]
+    response = export_widgets(client, access_token, "ndjson")
+    assert response.status_code == HTTPStatus.FORBIDDEN
+    assert "message" in response.json and response.json["message"] == FORBIDDEN
@@ -0,0 +1,118 @@
+"""Test cases for routing of read-only requests to read replicas."""
+import sqlite3
+from http import HTTPStatus
+from types import SimpleNamespace
+
+import pytest
+from flask import url_for
+from sqlalchemy import select
+
+from flask_api_tutorial.models.widget import Widget
+from flask_api_tutorial.util import database as database_module
+from tests.util import ADMIN_EMAIL, EMAIL, login_user, create_widget
+
+# Behind a reverse proxy, every request comes from the address of the proxy, so
+# all clients in these tests share one address.
+PROXY_ADDR = "10.0.0.1"
+
+
+@pytest.fixture
+def replicate(app, db, tmp_path):
+    """Copy the primary database to a new replica, as replication would."""
+    app.config["SQLALCHEMY_BINDS"] = {}
+
+    def replicate_primary(bind_key="replica"):
+        replica_path = tmp_path / f"{bind_key}.db"
+        with sqlite3.connect(db.engine.url.database) as primary:
+            with sqlite3.connect(replica_path) as replica:
+                primary.backup(replica)
+        app.config["SQLALCHEMY_BINDS"][bind_key] = f"sqlite:///{replica_path}"
+        app.config["SQLALCHEMY_REPLICA_BINDS"] = list(app.config["SQLALCHEMY_BINDS"])
+
+    return replicate_primary
+
+
+def _proxied(client):
+    client.environ_base["REMOTE_ADDR"] = PROXY_ADDR
+    return client
+
+
+def _widget_names(client, access_token, headers=None):
+    response = client.get(
+        url_for("api.widget_list"),
+        headers=dict(headers or {}, Authorization=f"Bearer {access_token}"),
+    )
+    assert response.status_code == HTTPStatus.OK
+    return [item["name"] for item in response.json["items"]]
+
+
+def test_read_replica_routing(app, client, db, admin, user, replicate, monkeypatch):
+    client, reader = _proxied(client), _proxied(app.test_client())
+    access_token = login_user(client, email=ADMIN_EMAIL).json["access_token"]
+    user_token = login_user(reader, email=EMAIL).json["access_token"]
+    create_widget(client, access_token, widget_name="widget1")
+    replicate()
+    response = create_widget(client, access_token, widget_name="widget2")
+    cookie_name = app.config["REPLICA_READ_AFTER_WRITE_COOKIE"]
+    assert cookie_name in response.headers["Set-Cookie"]
+
+    assert _widget_names(reader, user_token) == ["widget1"]
+    assert _widget_names(client, access_token) == ["widget1", "widget2"]
+    header = {app.config["REPLICA_FORCE_PRIMARY_HEADER"]: "true"}
+    assert _widget_names(reader, user_token, headers=header) == ["widget1", "widget2"]
+
+    now = database_module.time.time()
+    read_after_write_seconds = app.config["REPLICA_READ_AFTER_WRITE_SECONDS"]
+    monkeypatch.setattr(
+        database_module,
+        "time",
+        SimpleNamespace(time=lambda: now + read_after_write_seconds + 1),
+    )
+    assert _widget_names(client, access_token) == ["widget1"]
+
+
+def test_read_replica_read_after_write_in_other_worker(
+    app, client, db, admin, user, replicate
+):
+    client, reader = _proxied(client), _proxied(app.test_client())
+    access_token = login_user(client, email=ADMIN_EMAIL).json["access_token"]
+    user_token = login_user(reader, email=EMAIL).json["access_token"]
+    replicate()
+    # Each worker process has its own state, the write and the reads that follow
+    # it are handled by different workers.
+    app.extensions["read_replicas"] = database_module._ReadReplicaState()
+    create_widget(client, access_token, widget_name="widget1")
+    app.extensions["read_replicas"] = database_module._ReadReplicaState()
+
+    assert _widget_names(client, access_token) == ["widget1"]
+    assert _widget_names(reader, user_token) == []
+
+
+def test_read_replicas_round_robin(app, client, db, admin, user, replicate):
+    client, reader = _proxied(client), _proxied(app.test_client())
+    access_token = login_user(client, email=ADMIN_EMAIL).json["access_token"]
+    user_token = login_user(reader, email=EMAIL).json["access_token"]
+    create_widget(client, access_token, widget_name="widget1")
+    replicate("replica1")
+    create_widget(client, access_token, widget_name="widget2")
+    replicate("replica2")
+
+    widget_counts = [len(_widget_names(reader, user_token)) for _ in range(4)]
+    assert widget_counts == [1, 2, 1, 2]
+
+
+def test_read_replica_write_in_read_only_request(app, db, replicate):
+    replicate()
+    replica_engine = db.get_engine(app, bind="replica")
+    statement = select([Widget.id])
+    with app.test_request_context():
+        assert db.session.get_bind(clause=statement) is replica_engine
+        db.session.execute(Widget.__table__.delete())
+        assert db.session.get_bind(clause=statement) is db.engine
+        db.session.rollback()
+    with app.test_request_context():
+        assert db.session.get_bind(clause=statement) is replica_engine
+        db.force_primary()
+        assert db.session.get_bind(clause=statement) is db.engine
+    with app.test_request_context(method="POST"):
+        assert db.session.get_bind(clause=statement) is db.engine
@@ -0,0 +1,35 @@
+"""Unit tests for the response cache and its in-process backend."""
+from types import SimpleNamespace
+
+from flask_api_tutorial.util import response_cache as response_cache_module
+from flask_api_tutorial.util.response_cache import CachedResponse, ResponseCache
+
+
+def test_response_cache_evicts_least_recently_used(app):
+    app.config["RESPONSE_CACHE_MAX_BYTES"] = 1000
+    ResponseCache(app)
+    backend = app.extensions["response_cache"]
+    expires_at = response_cache_module.time.time() + 60
+    for key in ["a", "b", "c"]:
+        backend.set(key, CachedResponse(b"x" * 400, 200, []), expires_at)
+    assert backend.get("a") is None
+    assert backend.get("b") and backend.get("c")
+
+    backend.set("d", CachedResponse(b"x" * 1001, 200, []), expires_at)
+    assert backend.get("d") is None
+    assert backend.get("b") and backend.get("c")
+
+
+def test_response_cache_entry_expires(app, monkeypatch):
+    response_cache = ResponseCache(app)
+    now = response_cache_module.time.time()
+    with app.test_request_context():
+        response = app.response_class(b'{"items": []}', mimetype="application/json")
+        response_cache.set("key", response, expires_at=now + 2)
+        cached = response_cache.get("key")
+        assert cached.get_data() == response.get_data()
+        assert cached.headers["Content-Type"] == "application/json"
+
+        later = SimpleNamespace(time=lambda: now + 3)
+        monkeypatch.setattr(response_cache_module, "time", later)
+        assert response_cache.get("key") is None
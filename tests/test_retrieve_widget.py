@@ -7,9 +7,16 @@ from tests.util import (
     DEFAULT_NAME,
     DEFAULT_URL,
     DEFAULT_DEADLINE,
+    BAD_REQUEST,
     login_user,
     create_widget,
     retrieve_widget,
+    update_widget,
+    count_queries,
+    max_queries,
+    select_statements,
+    query_plans,
+    delete_widget,
 )
 
 
@@ -43,3 +50,164 @@ def test_retrieve_widget_does_not_exist(client, db, user):
         "message" in response.json
         and f"{DEFAULT_NAME} not found in database" in response.json["message"]
     )
+
+
+def test_retrieve_widget_name_ignoring_case(client, db, admin):
+    response = login_user(client, email=ADMIN_EMAIL)
+    assert "access_token" in response.json
+    access_token = response.json["access_token"]
+    response = create_widget(client, access_token, widget_name="Mixed-Case")
+    assert response.status_code == HTTPStatus.CREATED
+
+    with query_plans() as plans:
+        response = retrieve_widget(client, access_token, widget_name="mixed-CASE")
+    assert response.status_code == HTTPStatus.OK
+    assert response.json["name"] == "Mixed-Case"
+    widget_plans = [plan for plan in plans if "widget" in plan]
+    assert widget_plans
+    assert all("USING INDEX ix_widget_name_key" in plan for plan in widget_plans)
+    response = update_widget(
+        client, access_token, "MIXED-case", DEFAULT_URL, DEFAULT_DEADLINE
+    )
+    assert response.status_code == HTTPStatus.OK
+    response = delete_widget(client, access_token, widget_name="mixed-case")
+    assert response.status_code == HTTPStatus.NO_CONTENT
+
+
+def test_retrieve_widget_owner_loaded_in_same_query(client, db, admin, user):
+    response = login_user(client, email=ADMIN_EMAIL)
+    assert "access_token" in response.json
+    access_token = response.json["access_token"]
+    response = create_widget(client, access_token)
+    assert response.status_code == HTTPStatus.CREATED
+    db.session.expunge_all()
+
+    response = login_user(client, email=EMAIL)
+    assert "access_token" in response.json
+    access_token = response.json["access_token"]
+    response = retrieve_widget(client, access_token, widget_name=DEFAULT_NAME)
+    assert response.status_code == HTTPStatus.OK
+    db.session.expunge_all()
+    with max_queries(1):
+        response = retrieve_widget(client, access_token, widget_name=DEFAULT_NAME)
+    assert response.status_code == HTTPStatus.OK
+    assert response.json["owner"]["email"] == ADMIN_EMAIL
+
+
+def test_retrieve_widget_not_modified(client, db, admin):
+    response = login_user(client, email=ADMIN_EMAIL)
+    assert "access_token" in response.json
+    access_token = response.json["access_token"]
+    response = create_widget(client, access_token)
+    assert response.status_code == HTTPStatus.CREATED
+    response = retrieve_widget(client, access_token, widget_name=DEFAULT_NAME)
+    assert response.status_code == HTTPStatus.OK
+    etag = response.headers["ETag"]
+
+    headers = {"If-None-Match": etag}
+    with count_queries() as statements:
+        response = retrieve_widget(
+            client, access_token, widget_name=DEFAULT_NAME, headers=headers
+        )
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    assert response.headers["ETag"] == etag
+    assert not response.data
+    assert len(statements) == 1
+    assert not select_statements(statements, "site_user")
+
+    response = update_widget(
+        client,
+        access_token,
+        widget_name=DEFAULT_NAME,
+        info_url="https://www.newurl.com",
+        deadline_str=DEFAULT_DEADLINE,
+    )
+    assert response.status_code == HTTPStatus.OK
+    response = retrieve_widget(
+        client, access_token, widget_name=DEFAULT_NAME, headers=headers
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers["ETag"] != etag
+    assert response.json["info_url"] == "https://www.newurl.com"
+
+
+def test_retrieve_widget_etag_after_delete_and_create(client, db, admin):
+    response = login_user(client, email=ADMIN_EMAIL)
+    assert "access_token" in response.json
+    access_token = response.json["access_token"]
+    response = create_widget(client, access_token, widget_name="keep")
+    assert response.status_code == HTTPStatus.CREATED
+    response = create_widget(client, access_token)
+    assert response.status_code == HTTPStatus.CREATED
+    response = retrieve_widget(client, access_token, widget_name=DEFAULT_NAME)
+    assert response.status_code == HTTPStatus.OK
+    etag = response.headers["ETag"]
+
+    response = delete_widget(client, access_token, widget_name=DEFAULT_NAME)
+    assert response.status_code == HTTPStatus.NO_CONTENT
+    response = create_widget(client, access_token, info_url="https://www.newurl.com")
+    assert response.status_code == HTTPStatus.CREATED
+
+    headers = {"If-None-Match": etag}
+    response = retrieve_widget(
+        client, access_token, widget_name=DEFAULT_NAME, headers=headers
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers["ETag"] != etag
+    assert response.json["info_url"] == "https://www.newurl.com"
+
+    response = update_widget(
+        client,
+        access_token,
+        widget_name=DEFAULT_NAME,
+        info_url=DEFAULT_URL,
+        deadline_str=DEFAULT_DEADLINE,
+        headers={"If-Match": etag},
+    )
+    assert response.status_code == HTTPStatus.PRECONDITION_FAILED
+
+
+def test_retrieve_widget_sparse_fields(client, db, admin, user):
+    response = login_user(client, email=ADMIN_EMAIL)
+    assert "access_token" in response.json
+    access_token = response.json["access_token"]
+    response = create_widget(client, access_token)
+    assert response.status_code == HTTPStatus.CREATED
+    response = retrieve_widget(client, access_token, widget_name=DEFAULT_NAME)
+    assert response.status_code == HTTPStatus.OK
+    widget = response.json
+
+    with count_queries() as statements:
+        response = retrieve_widget(
+            client, access_token, widget_name=DEFAULT_NAME, fields="deadline,name"
+        )
+    assert response.status_code == HTTPStatus.OK
+    assert response.json == {"name": widget["name"], "deadline": widget["deadline"]}
+    assert list(response.json) == ["name", "deadline"]
+    assert "ETag" in response.headers
+    widget_select = select_statements(statements, "widget")[0]
+    assert "site_user" not in widget_select and "info_url" not in widget_select
+
+    response = retrieve_widget(
+        client, access_token, widget_name=DEFAULT_NAME, fields="name,owner,link"
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert response.json == {
+        "name": widget["name"],
+        "owner": widget["owner"],
+        "link": widget["link"],
+    }
+
+
+def test_retrieve_widget_invalid_fields(client, db, admin):
+    response = login_user(client, email=ADMIN_EMAIL)
+    assert "access_token" in response.json
+    access_token = response.json["access_token"]
+    response = create_widget(client, access_token)
+    assert response.status_code == HTTPStatus.CREATED
+    response = retrieve_widget(
+        client, access_token, widget_name=DEFAULT_NAME, fields="name,password"
+    )
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert "message" in response.json and response.json["message"] == BAD_REQUEST
+    assert "fields" in response.json["errors"]
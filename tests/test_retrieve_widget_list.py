@@ -1,8 +1,25 @@
 """Test cases for GET requests sent to the api.widget_list API endpoint."""
-from datetime import date, timedelta
+from datetime import date, datetime, timedelta
 from http import HTTPStatus
+from urllib.parse import parse_qs, urlparse
 
-from tests.util import ADMIN_EMAIL, login_user, create_widget, retrieve_widget_list
+from flask_api_tutorial.models.collection_state import CollectionState
+from flask_api_tutorial.models.user import User
+from flask_api_tutorial.models.widget import Widget
+from flask_api_tutorial.util.pagination import encode_cursor
+from tests.util import (
+    ADMIN_EMAIL,
+    BAD_REQUEST,
+    login_user,
+    create_widget,
+    delete_widget,
+    retrieve_widget_list,
+    update_widget,
+    count_queries,
+    max_queries,
+    select_statements,
+    query_plans,
+)
 
 
 NAMES = [
@@ -139,3 +156,451 @@ def test_retrieve_paginated_widget_list(client, db, admin):
         assert "deadline" in item and DEADLINES[i] in item["deadline"]
         assert "owner" in item and "email" in item["owner"]
         assert item["owner"]["email"] == ADMIN_EMAIL
+
+
+def test_retrieve_widget_list_without_total(client, db, admin):
+    response = login_user(client, email=ADMIN_EMAIL)
+    assert "access_token" in response.json
+    access_token = response.json["access_token"]
+    for name in NAMES:
+        response = create_widget(client, access_token, widget_name=name)
+        assert response.status_code == HTTPStatus.CREATED
+    response = retrieve_widget_list(client, access_token, page=1, per_page=5)
+    assert response.status_code == HTTPStatus.OK
+
+    with count_queries() as statements:
+        response = retrieve_widget_list(
+            client, access_token, page=1, per_page=5, include_total="false"
+        )
+    assert response.status_code == HTTPStatus.OK
+    assert not any("count(" in stmt.lower() for stmt in statements)
+    assert len(statements) == 1
+    assert "Total-Count" not in response.headers
+    assert response.json["total_items"] is None
+    assert response.json["total_pages"] is None
+    assert not response.json["has_prev"] and response.json["has_next"]
+    assert [item["name"] for item in response.json["items"]] == NAMES[:5]
+    assert "last" not in response.json["links"]
+    assert "include_total=false" in response.json["links"]["next"]
+
+    response = retrieve_widget_list(
+        client, access_token, page=2, per_page=5, include_total="false"
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert response.json["has_prev"] and not response.json["has_next"]
+    assert [item["name"] for item in response.json["items"]] == NAMES[5:]
+
+
+def test_retrieve_widget_list_cached_total(client, db, admin):
+    response = login_user(client, email=ADMIN_EMAIL)
+    assert "access_token" in response.json
+    access_token = response.json["access_token"]
+    for name in NAMES:
+        response = create_widget(client, access_token, widget_name=name)
+        assert response.status_code == HTTPStatus.CREATED
+    response = retrieve_widget_list(client, access_token, page=1, per_page=5)
+    assert response.status_code == HTTPStatus.OK
+    assert response.json["total_items"] == len(NAMES)
+
+    response = delete_widget(client, access_token, NAMES[0])
+    assert response.status_code == HTTPStatus.NO_CONTENT
+    response = create_widget(client, access_token, widget_name="one-more")
+    assert response.status_code == HTTPStatus.CREATED
+    response = create_widget(client, access_token, widget_name="and-another")
+    assert response.status_code == HTTPStatus.CREATED
+
+    with count_queries() as statements:
+        response = retrieve_widget_list(client, access_token, page=1, per_page=5)
+    assert response.status_code == HTTPStatus.OK
+    assert len(select_statements(statements, "widget")) == 1
+    assert not any("count(" in stmt.lower() for stmt in statements)
+    assert response.json["total_items"] == len(NAMES) + 1
+    assert response.json["total_pages"] == 2
+    assert response.headers["Total-Count"] == str(len(NAMES) + 1)
+
+
+def test_retrieve_widget_list_collection_state_read_only(client, db, admin):
+    state = CollectionState.query.get("widget")
+    assert state and state.item_count == 0
+    response = login_user(client, email=ADMIN_EMAIL)
+    assert "access_token" in response.json
+    access_token = response.json["access_token"]
+    headers = {"If-None-Match": '"no-match"'}
+    with count_queries() as statements:
+        response = retrieve_widget_list(
+            client, access_token, page=1, per_page=5, headers=headers
+        )
+    assert response.status_code == HTTPStatus.OK
+    assert all(stmt.lstrip().upper().startswith("SELECT") for stmt in statements)
+
+    db.session.delete(state)
+    db.session.commit()
+    with count_queries() as statements:
+        response = retrieve_widget_list(
+            client, access_token, page=1, per_page=5, headers=headers
+        )
+    assert response.status_code == HTTPStatus.OK
+    assert response.json["total_items"] == 0
+    assert all(stmt.lstrip().upper().startswith("SELECT") for stmt in statements)
+    assert not CollectionState.query.get("widget")
+
+
+def test_retrieve_widget_list_owners_loaded_in_one_query(client, db, admin):
+    for i in range(0, len(NAMES)):
+        owner = User(email=f"owner{i}@email.com", password="owner1234", admin=True)
+        owner.widgets.append(Widget(name=NAMES[i], info_url=URLS[i]))
+        db.session.add(owner)
+    db.session.commit()
+    db.session.expunge_all()
+    response = login_user(client, email=ADMIN_EMAIL)
+    assert "access_token" in response.json
+    access_token = response.json["access_token"]
+    response = retrieve_widget_list(client, access_token, page=1, per_page=10)
+    assert response.status_code == HTTPStatus.OK
+
+    with max_queries(1):
+        response = retrieve_widget_list(client, access_token, page=1, per_page=10)
+    assert response.status_code == HTTPStatus.OK
+    owners = [item["owner"]["email"] for item in response.json["items"]]
+    assert owners == [f"owner{i}@email.com" for i in range(0, len(NAMES))]
+
+    with max_queries(1):
+        response = retrieve_widget_list(client, access_token, per_page=10, sort="name")
+    assert response.status_code == HTTPStatus.OK
+    assert len(response.json["items"]) == len(NAMES)
+
+
+def test_retrieve_widget_list_not_modified(client, db, admin):
+    response = login_user(client, email=ADMIN_EMAIL)
+    assert "access_token" in response.json
+    access_token = response.json["access_token"]
+    for name in NAMES:
+        response = create_widget(client, access_token, widget_name=name)
+        assert response.status_code == HTTPStatus.CREATED
+    response = retrieve_widget_list(client, access_token, page=1, per_page=5)
+    assert response.status_code == HTTPStatus.OK
+    etag = response.headers["ETag"]
+    response = retrieve_widget_list(client, access_token, per_page=5, sort="name")
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers["ETag"] == etag
+
+    headers = {"If-None-Match": etag}
+    with count_queries() as statements:
+        response = retrieve_widget_list(
+            client, access_token, page=1, per_page=5, headers=headers
+        )
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    assert not response.data
+    assert len(statements) == 1
+    assert not select_statements(statements, "widget")
+
+    response = create_widget(client, access_token, widget_name="one-more")
+    assert response.status_code == HTTPStatus.CREATED
+    response = retrieve_widget_list(
+        client, access_token, page=1, per_page=5, headers=headers
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers["ETag"] != etag
+
+
+def test_retrieve_widget_list_sparse_fields(client, db, admin):
+    response = login_user(client, email=ADMIN_EMAIL)
+    assert "access_token" in response.json
+    access_token = response.json["access_token"]
+    for name in NAMES:
+        response = create_widget(client, access_token, widget_name=name)
+        assert response.status_code == HTTPStatus.CREATED
+
+    with count_queries() as statements:
+        response = retrieve_widget_list(
+            client, access_token, page=1, per_page=5, fields="name,deadline_passed"
+        )
+    assert response.status_code == HTTPStatus.OK
+    items = response.json["items"]
+    assert [list(item) for item in items] == [["name", "deadline_passed"]] * 5
+    assert [item["name"] for item in items] == NAMES[:5]
+    widget_select = select_statements(statements, "widget")[0]
+    assert "site_user" not in widget_select and "info_url" not in widget_select
+    next_link = parse_qs(urlparse(response.json["links"]["next"]).query)
+    assert next_link["fields"] == ["name,deadline_passed"]
+
+    with count_queries() as statements:
+        response = retrieve_widget_list(
+            client, access_token, per_page=5, sort="-name", fields="owner"
+        )
+    assert response.status_code == HTTPStatus.OK
+    assert [list(item) for item in response.json["items"]] == [["owner"]] * 5
+    assert len(select_statements(statements, "widget")) == 1
+    response = client.get(
+        response.json["links"]["next"],
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert [item["owner"]["email"] for item in response.json["items"]] == [
+        ADMIN_EMAIL
+    ] * 2
+
+
+def test_retrieve_widget_list_filtered(client, db, admin):
+    owner = User(email="owner@email.com", password="owner1234", admin=True)
+    db.session.add(owner)
+    db.session.commit()
+    response = login_user(client, email=ADMIN_EMAIL)
+    assert "access_token" in response.json
+    access_token = response.json["access_token"]
+    for i in range(0, len(NAMES)):
+        response = create_widget(
+            client, access_token, widget_name=NAMES[i], deadline_str=DEADLINES[i]
+        )
+        assert response.status_code == HTTPStatus.CREATED
+    response = retrieve_widget_list(client, access_token, page=1, per_page=5)
+    assert response.status_code == HTTPStatus.OK
+    yesterday = datetime.utcnow() - timedelta(days=1)
+    db.session.add(Widget(name="expired", deadline=yesterday, owner_id=owner.id))
+    db.session.add(Widget(name="owned", deadline=yesterday, owner_id=owner.id))
+    db.session.commit()
+
+    deadline_from = (date.today() + timedelta(days=3)).isoformat()
+    deadline_to = (date.today() + timedelta(days=10)).isoformat()
+    with query_plans() as plans:
+        response = retrieve_widget_list(
+            client,
+            access_token,
+            page=1,
+            per_page=5,
+            deadline_from=deadline_from,
+            deadline_to=deadline_to,
+        )
+    assert response.status_code == HTTPStatus.OK
+    assert [item["name"] for item in response.json["items"]] == NAMES[1:4]
+    assert response.json["total_items"] == 3
+    assert not any("SCAN widget" in plan for plan in plans)
+    self_link = parse_qs(urlparse(response.json["links"]["self"]).query)
+    assert self_link["deadline_from"] == [deadline_from]
+    assert self_link["deadline_to"] == [deadline_to]
+
+    with query_plans() as plans:
+        response = retrieve_widget_list(
+            client, access_token, page=1, per_page=10, deadline_passed="true"
+        )
+    assert [item["name"] for item in response.json["items"]] == ["expired", "owned"]
+    assert all(item["deadline_passed"] for item in response.json["items"])
+    assert not any("SCAN widget" in plan for plan in plans)
+    response = retrieve_widget_list(
+        client, access_token, page=1, per_page=10, deadline_passed="false"
+    )
+    assert [item["name"] for item in response.json["items"]] == NAMES
+    assert response.json["total_items"] == len(NAMES)
+
+    with query_plans() as plans:
+        response = retrieve_widget_list(
+            client, access_token, per_page=5, owner=owner.public_id, sort="-name"
+        )
+    assert [item["name"] for item in response.json["items"]] == ["owned", "expired"]
+    assert not any("SCAN widget" in plan for plan in plans)
+
+
+def test_retrieve_widget_list_sorted_by_deadline(client, db, admin):
+    response = login_user(client, email=ADMIN_EMAIL)
+    assert "access_token" in response.json
+    access_token = response.json["access_token"]
+    for i in reversed(range(0, len(NAMES))):
+        response = create_widget(
+            client, access_token, widget_name=NAMES[i], deadline_str=DEADLINES[i]
+        )
+        assert response.status_code == HTTPStatus.CREATED
+    response = retrieve_widget_list(
+        client, access_token, per_page=5, sort="deadline", deadline_passed="false"
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert [item["name"] for item in response.json["items"]] == NAMES[:5]
+    next_link = response.json["links"]["next"]
+    assert parse_qs(urlparse(next_link).query)["deadline_passed"] == ["false"]
+    response = client.get(next_link, headers={"Authorization": f"Bearer {access_token}"})
+    assert response.status_code == HTTPStatus.OK
+    assert [item["name"] for item in response.json["items"]] == NAMES[5:]
+    assert not response.json["has_next"]
+
+
+def test_retrieve_widget_list_from_response_cache(app, client, db, admin):
+    app.config["RESPONSE_CACHE_ENABLED"] = True
+    response = login_user(client, email=ADMIN_EMAIL)
+    assert "access_token" in response.json
+    access_token = response.json["access_token"]
+    for name in NAMES:
+        response = create_widget(client, access_token, widget_name=name)
+        assert response.status_code == HTTPStatus.CREATED
+    response = retrieve_widget_list(client, access_token, page=1, per_page=5)
+    assert response.status_code == HTTPStatus.OK
+    expected = response.json
+    etag = response.headers["ETag"]
+
+    with count_queries() as statements:
+        response = retrieve_widget_list(client, access_token, page=1, per_page=5)
+    assert response.status_code == HTTPStatus.OK
+    assert len(statements) == 1
+    assert not select_statements(statements, "widget")
+    assert response.json == expected
+    assert response.headers["ETag"] == etag
+    assert response.headers["Total-Count"] == str(len(NAMES))
+
+    with count_queries() as statements:
+        response = retrieve_widget_list(client, access_token, page=2, per_page=5)
+    assert response.status_code == HTTPStatus.OK
+    assert len(select_statements(statements, "widget")) == 1
+    assert [item["name"] for item in response.json["items"]] == NAMES[5:]
+
+
+def test_retrieve_widget_list_response_cache_invalidated(app, client, db, admin):
+    app.config["RESPONSE_CACHE_ENABLED"] = True
+    response = login_user(client, email=ADMIN_EMAIL)
+    assert "access_token" in response.json
+    access_token = response.json["access_token"]
+    for name in NAMES[:3]:
+        response = create_widget(client, access_token, widget_name=name)
+        assert response.status_code == HTTPStatus.CREATED
+    response = retrieve_widget_list(client, access_token, page=1, per_page=5)
+    assert [item["name"] for item in response.json["items"]] == NAMES[:3]
+
+    response = create_widget(client, access_token, widget_name=NAMES[3])
+    assert response.status_code == HTTPStatus.CREATED
+    response = retrieve_widget_list(client, access_token, page=1, per_page=5)
+    assert [item["name"] for item in response.json["items"]] == NAMES[:4]
+
+    response = update_widget(
+        client, access_token, NAMES[0], info_url=URLS[1], deadline_str=DEADLINES[1]
+    )
+    assert response.status_code == HTTPStatus.OK
+    response = retrieve_widget_list(client, access_token, page=1, per_page=5)
+    assert response.json["items"][0]["info_url"] == URLS[1]
+
+    response = delete_widget(client, access_token, NAMES[1])
+    assert response.status_code == HTTPStatus.NO_CONTENT
+    response = retrieve_widget_list(client, access_token, page=1, per_page=5)
+    assert [item["name"] for item in response.json["items"]] == [
+        NAMES[0],
+        NAMES[2],
+        NAMES[3],
+    ]
+
+
+def test_retrieve_widget_list_by_cursor(client, db, admin):
+    response = login_user(client, email=ADMIN_EMAIL)
+    assert "access_token" in response.json
+    access_token = response.json["access_token"]
+    for i in range(0, len(NAMES)):
+        response = create_widget(
+            client,
+            access_token,
+            widget_name=NAMES[i],
+            info_url=URLS[i],
+            deadline_str=DEADLINES[i],
+        )
+        assert response.status_code == HTTPStatus.CREATED
+    sorted_names = sorted(NAMES)
+
+    # REQUEST FIRST PAGE OF WIDGETS SORTED BY NAME: 5 PER PAGE
+    response = retrieve_widget_list(client, access_token, per_page=5, sort="name")
+    assert response.status_code == HTTPStatus.OK
+    assert "Total-Count" not in response.headers
+    assert not response.json["has_prev"] and response.json["has_next"]
+    assert response.json["sort"] == "name"
+    assert response.json["items_per_page"] == 5
+    assert [item["name"] for item in response.json["items"]] == sorted_names[:5]
+    assert "prev" not in response.json["links"]
+    assert "last" not in response.json["links"]
+    assert 'rel="next"' in response.headers["Link"]
+
+    # FOLLOW THE NEXT CURSOR TO THE SECOND (LAST) PAGE
+    next_cursor = _cursor_from_link(response.json["links"]["next"])
+    response = retrieve_widget_list(client, access_token, per_page=5, cursor=next_cursor)
+    assert response.status_code == HTTPStatus.OK
+    assert response.json["has_prev"] and not response.json["has_next"]
+    assert [item["name"] for item in response.json["items"]] == sorted_names[5:]
+    assert "next" not in response.json["links"]
+
+    # FOLLOW THE PREV CURSOR BACK TO THE FIRST PAGE
+    prev_cursor = _cursor_from_link(response.json["links"]["prev"])
+    response = retrieve_widget_list(client, access_token, per_page=5, cursor=prev_cursor)
+    assert response.status_code == HTTPStatus.OK
+    assert not response.json["has_prev"] and response.json["has_next"]
+    assert [item["name"] for item in response.json["items"]] == sorted_names[:5]
+
+
+def test_retrieve_widget_list_by_cursor_descending(client, db, admin):
+    response = login_user(client, email=ADMIN_EMAIL)
+    assert "access_token" in response.json
+    access_token = response.json["access_token"]
+    for name in NAMES:
+        response = create_widget(client, access_token, widget_name=name)
+        assert response.status_code == HTTPStatus.CREATED
+
+    names = []
+    response = retrieve_widget_list(client, access_token, per_page=5, sort="-id")
+    while True:
+        assert response.status_code == HTTPStatus.OK
+        names.extend(item["name"] for item in response.json["items"])
+        if not response.json["has_next"]:
+            break
+        next_cursor = _cursor_from_link(response.json["links"]["next"])
+        response = retrieve_widget_list(
+            client, access_token, per_page=5, cursor=next_cursor
+        )
+    assert names == list(reversed(NAMES))
+
+
+def test_retrieve_widget_list_invalid_cursor(client, db, admin):
+    response = login_user(client, email=ADMIN_EMAIL)
+    assert "access_token" in response.json
+    access_token = response.json["access_token"]
+    response = retrieve_widget_list(client, access_token, cursor="not-a-cursor")
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert "message" in response.json and response.json["message"] == BAD_REQUEST
+    assert "errors" in response.json and "cursor" in response.json["errors"]
+
+
+def test_retrieve_widget_list_tampered_cursor(client, db, admin):
+    response = login_user(client, email=ADMIN_EMAIL)
+    assert "access_token" in response.json
+    access_token = response.json["access_token"]
+    response = create_widget(client, access_token)
+    assert response.status_code == HTTPStatus.CREATED
+    cursors = [
+        dict(sort="name", after=[[1, 2], 1]),
+        dict(sort="name", after=[None, 1]),
+        dict(sort="name", after=[1, 1]),
+        dict(sort="name", after=["a", "1"]),
+        dict(sort="name", after=["a", True]),
+        dict(sort="name", after=["a", 1, 2]),
+        dict(sort="name", after={"a": 1}),
+        dict(sort="id", before=[1.5, 1.5]),
+        dict(sort="-deadline", after=["not-a-date", 1]),
+        dict(sort="deadline", after=[None, 1]),
+        dict(sort="deadline", after=[1, 1]),
+    ]
+    for cursor in cursors:
+        response = retrieve_widget_list(
+            client, access_token, cursor=encode_cursor(cursor)
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, cursor
+        assert "valid position" in response.json["message"]
+
+
+def test_retrieve_widget_list_cursor_sort_mismatch(client, db, admin):
+    response = login_user(client, email=ADMIN_EMAIL)
+    assert "access_token" in response.json
+    access_token = response.json["access_token"]
+    for name in NAMES:
+        response = create_widget(client, access_token, widget_name=name)
+        assert response.status_code == HTTPStatus.CREATED
+    response = retrieve_widget_list(client, access_token, per_page=5, sort="name")
+    next_cursor = _cursor_from_link(response.json["links"]["next"])
+    response = retrieve_widget_list(
+        client, access_token, sort="-name", cursor=next_cursor
+    )
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert "does not match" in response.json["message"]
+
+
+def _cursor_from_link(url):
+    return parse_qs(urlparse(url).query)["cursor"][0]
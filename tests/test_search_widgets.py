@@ -0,0 +1,154 @@
+"""Test cases for GET requests sent to the api.widget_search API endpoint."""
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlparse
+
+from flask_api_tutorial.models.widget import Widget
+from tests.util import (
+    ADMIN_EMAIL,
+    EMAIL,
+    BAD_REQUEST,
+    login_user,
+    create_widget,
+    delete_widget,
+    search_widgets,
+    process_widget_batch,
+)
+
+NAMES = ["red-widget", "blue_widget", "widgetry", "Reddish", "red", "green-gadget"]
+
+
+def _create_widgets(client, access_token, names=NAMES):
+    for name in names:
+        response = create_widget(client, access_token, widget_name=name)
+        assert response.status_code == HTTPStatus.CREATED
+
+
+def _names(response):
+    return [item["name"] for item in response.json["items"]]
+
+
+def test_search_widgets(client, db, admin, user):
+    response = login_user(client, email=ADMIN_EMAIL)
+    assert "access_token" in response.json
+    _create_widgets(client, response.json["access_token"])
+    response = login_user(client, email=EMAIL)
+    assert "access_token" in response.json
+    access_token = response.json["access_token"]
+
+    response = search_widgets(client, access_token, "red")
+    assert response.status_code == HTTPStatus.OK
+    assert _names(response)[0] == "red"
+    assert sorted(_names(response)) == ["Reddish", "red", "red-widget"]
+    assert response.json["total_items"] == 3
+    assert response.headers["Total-Count"] == "3"
+
+    response = search_widgets(client, access_token, "WIDG")
+    assert sorted(_names(response)) == ["blue_widget", "red-widget", "widgetry"]
+    response = search_widgets(client, access_token, "red wid")
+    assert _names(response) == ["red-widget"]
+    response = search_widgets(client, access_token, "gadget-gr")
+    assert _names(response) == ["green-gadget"]
+    response = search_widgets(client, access_token, "dget")
+    assert _names(response) == []
+
+
+def test_search_widgets_index_in_sync(client, db, admin):
+    response = login_user(client, email=ADMIN_EMAIL)
+    assert "access_token" in response.json
+    access_token = response.json["access_token"]
+    _create_widgets(client, access_token)
+
+    response = delete_widget(client, access_token, "red")
+    assert response.status_code == HTTPStatus.NO_CONTENT
+    operations = [
+        dict(action="delete", name="red-widget"),
+        dict(
+            action="create",
+            name="red-gizmo",
+            info_url="https://www.fakesite.com",
+            deadline="2099-12-31",
+        ),
+    ]
+    response = process_widget_batch(client, access_token, operations)
+    assert response.json["status"] == "success"
+    widget = Widget.find_by_name("Reddish")
+    widget.name = "crimson"
+    db.session.commit()
+
+    response = search_widgets(client, access_token, "red")
+    assert _names(response) == ["red-gizmo"]
+    response = search_widgets(client, access_token, "crim")
+    assert _names(response) == ["crimson"]
+
+
+def test_search_widgets_paginated(client, db, admin):
+    response = login_user(client, email=ADMIN_EMAIL)
+    assert "access_token" in response.json
+    access_token = response.json["access_token"]
+    names = [f"widget-{i:02}" for i in range(12)]
+    _create_widgets(client, access_token, names)
+
+    found = []
+    response = search_widgets(client, access_token, "widget", per_page=5, fields="name")
+    while True:
+        assert response.status_code == HTTPStatus.OK
+        assert all(list(item) == ["name"] for item in response.json["items"])
+        found += _names(response)
+        if "next" not in response.json["links"]:
+            break
+        params = parse_qs(urlparse(response.json["links"]["next"]).query)
+        assert params["q"] == ["widget"]
+        response = client.get(
+            response.json["links"]["next"],
+            headers={"Authorization": f"Bearer {access_token}"},
+        )
+    assert response.json["page"] == response.json["total_pages"] == 3
+    assert response.json["total_items"] == len(names)
+    assert sorted(found) == names
+
+
+def test_search_widgets_rank_limit(app, client, db, admin):
+    response = login_user(client, email=ADMIN_EMAIL)
+    assert "access_token" in response.json
+    access_token = response.json["access_token"]
+    _create_widgets(client, access_token)
+    app.config["WIDGET_SEARCH_RANK_LIMIT"] = 2
+
+    response = search_widgets(client, access_token, "red")
+    assert _names(response) == ["red-widget", "Reddish", "red"]
+    response = search_widgets(client, access_token, "red wid")
+    assert _names(response) == ["red-widget"]
+
+
+def test_search_widgets_like_prefix_fallback(client, db, admin, monkeypatch):
+    response = login_user(client, email=ADMIN_EMAIL)
+    assert "access_token" in response.json
+    access_token = response.json["access_token"]
+    _create_widgets(client, access_token, NAMES + ["red_x", "redax"])
+    monkeypatch.setattr(db.engine.dialect, "name", "postgresql")
+
+    response = search_widgets(client, access_token, "Red")
+    assert _names(response) == ["red", "red-widget", "red_x", "redax", "Reddish"]
+    response = search_widgets(client, access_token, "red_")
+    assert _names(response) == ["red_x"]
+    response = search_widgets(client, access_token, "widg")
+    assert _names(response) == ["widgetry"]
+
+
+def test_search_widgets_invalid_query(client, db, admin):
+    response = login_user(client, email=ADMIN_EMAIL)
+    assert "access_token" in response.json
+    access_token = response.json["access_token"]
+    response = search_widgets(client, access_token, "-_- ")
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json["message"] == BAD_REQUEST
+    assert "q" in response.json["errors"]
+
+
+def test_create_widget_reserved_name(client, db, admin):
+    response = login_user(client, email=ADMIN_EMAIL)
+    assert "access_token" in response.json
+    access_token = response.json["access_token"]
+    response = create_widget(client, access_token, widget_name="Search")
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert "is reserved" in response.json["errors"]["name"]
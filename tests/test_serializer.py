@@ -0,0 +1,63 @@
+"""Unit tests for serializers compiled from flask_restx models."""
+import json
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from flask_restx import marshal
+
+from flask_api_tutorial.api.widgets.dto import (
+    widget_model,
+    pagination_model,
+    cursor_pagination_model,
+    serialize_widget,
+    serialize_pagination,
+    serialize_cursor_pagination,
+)
+from flask_api_tutorial.models.widget import Widget
+from flask_api_tutorial.util.pagination import KeysetPagination, OffsetPagination
+from tests.util import ADMIN_EMAIL, login_user, create_widget
+
+NAMES = ["widget1", "second_widget", "PENTA-widg-GON-et", "wídget_ünïcode", "sep7"]
+FROZEN_NOW = datetime.now(timezone.utc).replace(microsecond=0)
+
+
+@pytest.fixture
+def widgets(client, db, admin, monkeypatch):
+    monkeypatch.setattr("flask_api_tutorial.models.widget.utc_now", lambda: FROZEN_NOW)
+    response = login_user(client, email=ADMIN_EMAIL)
+    assert "access_token" in response.json
+    access_token = response.json["access_token"]
+    for i, name in enumerate(NAMES):
+        deadline = (date.today() + timedelta(days=i * 7)).strftime("%m/%d/%y")
+        response = create_widget(
+            client, access_token, widget_name=name, deadline_str=deadline
+        )
+        assert response.status_code == 201
+    return Widget.query.all()
+
+
+def test_serialize_widget_matches_marshal(widgets):
+    for widget in widgets:
+        assert _dumps(serialize_widget(widget)) == _dumps(marshal(widget, widget_model))
+    assert _dumps(serialize_widget(widgets)) == _dumps(marshal(widgets, widget_model))
+
+
+@pytest.mark.parametrize("page", [1, 2, 3])
+def test_serialize_pagination_matches_marshal(widgets, page):
+    pagination = Widget.query.paginate(page, 2, error_out=False)
+    expected = marshal(pagination, pagination_model)
+    assert _dumps(serialize_pagination(pagination)) == _dumps(expected)
+
+    pagination = OffsetPagination(None, page, 2, None, widgets[:2], has_next=True)
+    expected = marshal(pagination, pagination_model)
+    assert _dumps(serialize_pagination(pagination)) == _dumps(expected)
+
+
+def test_serialize_cursor_pagination_matches_marshal(widgets):
+    pagination = KeysetPagination(Widget.query, Widget.name, Widget.id, per_page=3)
+    expected = marshal(pagination, cursor_pagination_model)
+    assert _dumps(serialize_cursor_pagination(pagination)) == _dumps(expected)
+
+
+def _dumps(data):
+    return json.dumps(data).encode("utf-8")
@@ -0,0 +1,81 @@
+"""Unit tests for BlacklistedToken model class."""
+import time
+
+from flask_api_tutorial import blacklist_cache
+from flask_api_tutorial.models.token_blacklist import BlacklistedToken
+
+
+def test_check_blacklist_not_blacklisted(user):
+    access_token = user.encode_access_token().decode()
+    token_digest = BlacklistedToken.get_token_digest(access_token)
+    assert not BlacklistedToken.check_blacklist(access_token)
+    assert token_digest not in blacklist_cache.state.bloom_filter
+
+
+def test_check_blacklist_cache_add(db, user):
+    access_token = user.encode_access_token().decode()
+    blacklisted_token = BlacklistedToken(access_token, time.time() + 5)
+    db.session.add(blacklisted_token)
+    db.session.commit()
+    blacklist_cache.add(blacklisted_token.token_digest)
+    assert blacklisted_token.token_digest in blacklist_cache.state.bloom_filter
+    assert BlacklistedToken.check_blacklist(access_token)
+
+
+def test_check_blacklist_loaded_from_database(db, user):
+    access_token = user.encode_access_token().decode()
+    assert not BlacklistedToken.check_blacklist(access_token)
+    blacklisted_token = BlacklistedToken(access_token, time.time() + 5)
+    db.session.add(blacklisted_token)
+    db.session.commit()
+    blacklist_cache.reset()
+    assert BlacklistedToken.check_blacklist(access_token)
+    assert blacklist_cache.state.last_id == blacklisted_token.id
+
+
+def test_check_blacklist_cache_disabled(app, db, user):
+    app.config["BLACKLIST_CACHE_ENABLED"] = False
+    access_token = user.encode_access_token().decode()
+    blacklisted_token = BlacklistedToken(access_token, time.time() + 5)
+    db.session.add(blacklisted_token)
+    db.session.commit()
+    assert BlacklistedToken.check_blacklist(access_token)
+    assert blacklisted_token.token_digest not in blacklist_cache.state.bloom_filter
+
+
+def test_delete_expired(db, user):
+    access_token = user.encode_access_token().decode()
+    for i in range(5):
+        db.session.add(BlacklistedToken(f"expired-{i}", time.time() - 60))
+    db.session.add(BlacklistedToken(access_token, time.time() + 5))
+    db.session.commit()
+    assert BlacklistedToken.delete_expired(batch_size=2) == 5
+    blacklist = BlacklistedToken.query.all()
+    assert len(blacklist) == 1
+    assert blacklist[0].token_digest == BlacklistedToken.get_token_digest(access_token)
+    assert BlacklistedToken.delete_expired() == 0
+
+
+def test_check_blacklist_loaded_after_delete_expired(db, user):
+    for i in range(3):
+        db.session.add(BlacklistedToken(f"expired-{i}", time.time() - 60))
+    db.session.commit()
+    access_token = user.encode_access_token().decode()
+    assert not BlacklistedToken.check_blacklist(access_token)
+    assert blacklist_cache.state.last_id == 3
+    assert BlacklistedToken.delete_expired() == 3
+
+    # Blacklisted by another worker, this process only sees the new row.
+    blacklisted_token = BlacklistedToken(access_token, time.time() + 5)
+    db.session.add(blacklisted_token)
+    db.session.commit()
+    assert blacklisted_token.id > 3
+    blacklist_cache.state.last_refresh = None
+    assert BlacklistedToken.check_blacklist(access_token)
+
+
+def test_token_digest_fixed_width(user):
+    access_token = user.encode_access_token()
+    token_digest = BlacklistedToken.get_token_digest(access_token)
+    assert len(token_digest) == 64
+    assert token_digest == BlacklistedToken.get_token_digest(access_token.decode())
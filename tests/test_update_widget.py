@@ -79,3 +79,66 @@ def test_update_widget_does_not_exist_invalid_name(client, db, admin):
     assert response.status_code == HTTPStatus.BAD_REQUEST
     name_error = f"'{widget_name}' contains one or more invalid characters."
     assert name_error in response.json["message"]
+
+
+def test_update_widget_if_match(client, db, admin):
+    response = login_user(client, email=ADMIN_EMAIL)
+    assert "access_token" in response.json
+    access_token = response.json["access_token"]
+    response = create_widget(client, access_token)
+    assert response.status_code == HTTPStatus.CREATED
+    response = retrieve_widget(client, access_token, widget_name=DEFAULT_NAME)
+    assert response.status_code == HTTPStatus.OK
+    etag = response.headers["ETag"]
+
+    response = update_widget(
+        client,
+        access_token,
+        widget_name=DEFAULT_NAME,
+        info_url=UPDATED_URL,
+        deadline_str=UPDATED_DEADLINE,
+        headers={"If-Match": etag},
+    )
+    assert response.status_code == HTTPStatus.OK
+    new_etag = response.headers["ETag"]
+    assert new_etag != etag
+
+    response = update_widget(
+        client,
+        access_token,
+        widget_name=DEFAULT_NAME,
+        info_url="https://www.stale.com",
+        deadline_str=UPDATED_DEADLINE,
+        headers={"If-Match": etag},
+    )
+    assert response.status_code == HTTPStatus.PRECONDITION_FAILED
+    assert "status" in response.json and response.json["status"] == "fail"
+
+    response = update_widget(
+        client,
+        access_token,
+        widget_name=DEFAULT_NAME,
+        info_url="https://www.latest.com",
+        deadline_str=UPDATED_DEADLINE,
+        headers={"If-Match": new_etag},
+    )
+    assert response.status_code == HTTPStatus.OK
+    response = retrieve_widget(client, access_token, widget_name=DEFAULT_NAME)
+    assert response.json["info_url"] == "https://www.latest.com"
+
+
+def test_update_widget_if_match_does_not_exist(client, db, admin):
+    response = login_user(client, email=ADMIN_EMAIL)
+    assert "access_token" in response.json
+    access_token = response.json["access_token"]
+    response = update_widget(
+        client,
+        access_token,
+        widget_name=DEFAULT_NAME,
+        info_url=UPDATED_URL,
+        deadline_str=UPDATED_DEADLINE,
+        headers={"If-Match": "*"},
+    )
+    assert response.status_code == HTTPStatus.PRECONDITION_FAILED
+    response = retrieve_widget(client, access_token, widget_name=DEFAULT_NAME)
+    assert response.status_code == HTTPStatus.NOT_FOUND
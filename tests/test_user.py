@@ -11,6 +11,12 @@ def test_encode_access_token(user):
     assert isinstance(access_token, bytes)
 
 
+def test_encode_access_token_unique(user):
+    access_token_1 = user.encode_access_token()
+    access_token_2 = user.encode_access_token()
+    assert access_token_1 != access_token_2
+
+
 def test_decode_access_token_success(user):
     access_token = user.encode_access_token()
     result = User.decode_access_token(access_token)
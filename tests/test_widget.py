@@ -0,0 +1,41 @@
+"""Unit tests for Widget model class."""
+from datetime import datetime, timedelta
+
+from sqlalchemy.dialects import mysql, postgresql
+
+from flask_api_tutorial.models.widget import Widget, seconds_between
+
+
+def test_time_remaining_expression(db, admin):
+    now = datetime.utcnow()
+    deadlines = dict(
+        passed=now - timedelta(days=1),
+        week=now + timedelta(days=7),
+        hour=now + timedelta(hours=1),
+    )
+    for name, deadline in deadlines.items():
+        db.session.add(Widget(name=name, deadline=deadline, owner_id=admin.id))
+    db.session.commit()
+
+    rows = (
+        db.session.query(Widget.name, Widget.time_remaining)
+        .order_by(Widget.time_remaining)
+        .all()
+    )
+    assert [name for name, _ in rows] == ["passed", "hour", "week"]
+    time_remaining = dict(rows)
+    assert time_remaining["passed"] == 0
+    assert abs(time_remaining["hour"] - 3600) < 60
+    assert abs(time_remaining["week"] - 7 * 86400) < 60
+    widgets = Widget.query.filter(Widget.time_remaining > 2 * 3600).all()
+    assert [widget.name for widget in widgets] == ["week"]
+
+
+def test_seconds_between_dialects():
+    expression = seconds_between(Widget.created_at, Widget.deadline)
+    sql = str(expression.compile(dialect=postgresql.dialect()))
+    assert sql == "EXTRACT(EPOCH FROM (widget.deadline - widget.created_at))"
+    sql = str(expression.compile(dialect=mysql.dialect()))
+    assert sql == (
+        "TIMESTAMPDIFF(MICROSECOND, widget.created_at, widget.deadline) / 1000000"
+    )
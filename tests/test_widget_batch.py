@@ -0,0 +1,145 @@
+"""Test cases for POST requests sent to the api.widget_batch API endpoint."""
+from datetime import date, timedelta
+from http import HTTPStatus
+
+from tests.util import (
+    ADMIN_EMAIL,
+    EMAIL,
+    BAD_REQUEST,
+    FORBIDDEN,
+    DEFAULT_URL,
+    login_user,
+    create_widget,
+    retrieve_widget,
+    retrieve_widget_list,
+    process_widget_batch,
+    count_queries,
+    select_statements,
+)
+
+DEADLINE = (date.today() + timedelta(days=3)).strftime("%m/%d/%y")
+NEW_URL = "https://www.newsite.com"
+
+
+def _operation(action, name, info_url=DEFAULT_URL, deadline=DEADLINE):
+    if action == "delete":
+        return dict(action=action, name=name)
+    return dict(action=action, name=name, info_url=info_url, deadline=deadline)
+
+
+def test_widget_batch(client, db, admin):
+    response = login_user(client, email=ADMIN_EMAIL)
+    assert "access_token" in response.json
+    access_token = response.json["access_token"]
+    for name in ["widget1", "widget2"]:
+        response = create_widget(client, access_token, widget_name=name)
+        assert response.status_code == HTTPStatus.CREATED
+    etag = retrieve_widget(client, access_token, "widget1").headers["ETag"]
+
+    operations = [
+        _operation("create", "widget3"),
+        _operation("update", "widget1", info_url=NEW_URL),
+        _operation("delete", "widget2"),
+        _operation("update", "widget4"),
+    ]
+    response = process_widget_batch(client, access_token, operations)
+    assert response.status_code == HTTPStatus.OK
+    assert response.json["status"] == "success"
+    assert response.json["message"] == "4 of 4 widget operations succeeded."
+    results = response.json["results"]
+    assert [result["index"] for result in results] == [0, 1, 2, 3]
+    assert [result["status_code"] for result in results] == [201, 200, 204, 201]
+
+    response = retrieve_widget(client, access_token, "widget1")
+    assert response.json["info_url"] == NEW_URL
+    assert response.headers["ETag"] != etag
+    response = retrieve_widget(client, access_token, "widget2")
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    response = retrieve_widget_list(client, access_token, page=1, per_page=10)
+    assert response.json["total_items"] == 3
+    names = [item["name"] for item in response.json["items"]]
+    assert names == ["widget1", "widget3", "widget4"]
+    assert all(item["owner"]["email"] == ADMIN_EMAIL for item in response.json["items"])
+
+
+def test_widget_batch_item_failures(client, db, admin):
+    response = login_user(client, email=ADMIN_EMAIL)
+    assert "access_token" in response.json
+    access_token = response.json["access_token"]
+    response = create_widget(client, access_token, widget_name="widget1")
+    assert response.status_code == HTTPStatus.CREATED
+
+    operations = [
+        _operation("create", "widget1"),
+        _operation("create", "bad name!"),
+        _operation("create", "widget2", deadline="1/1/1970"),
+        _operation("delete", "widget3"),
+        _operation("create", "widget4"),
+        _operation("update", "Widget4"),
+        _operation("update", "bad name!"),
+    ]
+    response = process_widget_batch(client, access_token, operations)
+    assert response.status_code == HTTPStatus.OK
+    assert response.json["status"] == "fail"
+    assert response.json["message"] == "1 of 7 widget operations succeeded."
+    results = response.json["results"]
+    assert [result["status_code"] for result in results] == [
+        409,
+        400,
+        400,
+        404,
+        201,
+        400,
+        400,
+    ]
+    assert results[1]["message"] == BAD_REQUEST
+    assert "name" in results[1]["errors"]
+    assert "deadline" in results[2]["errors"]
+    assert "more than one operation" in results[5]["message"]
+    assert "invalid characters" in results[6]["message"]
+    assert "errors" not in results[4]
+    response = retrieve_widget_list(client, access_token, page=1, per_page=10)
+    assert response.json["total_items"] == 2
+
+
+def test_widget_batch_query_count(client, db, admin):
+    response = login_user(client, email=ADMIN_EMAIL)
+    assert "access_token" in response.json
+    access_token = response.json["access_token"]
+    operations = [_operation("create", f"widget{i}") for i in range(20)]
+    response = process_widget_batch(client, access_token, operations)
+    assert response.status_code == HTTPStatus.OK
+
+    operations = (
+        [_operation("update", f"widget{i}", info_url=NEW_URL) for i in range(10)]
+        + [_operation("delete", f"widget{i}") for i in range(10, 20)]
+        + [_operation("create", f"new-widget{i}") for i in range(10)]
+    )
+    with count_queries() as statements:
+        response = process_widget_batch(client, access_token, operations)
+    assert response.status_code == HTTPStatus.OK
+    assert response.json["status"] == "success"
+    assert len(select_statements(statements, "widget")) == 1
+    assert len(statements) <= 6
+
+
+def test_widget_batch_invalid_payload(client, db, admin):
+    response = login_user(client, email=ADMIN_EMAIL)
+    assert "access_token" in response.json
+    access_token = response.json["access_token"]
+    operations = [dict(action="rename", name="widget1")]
+    response = process_widget_batch(client, access_token, operations)
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert "message" in response.json and response.json["message"] == BAD_REQUEST
+    response = process_widget_batch(client, access_token, [])
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_widget_batch_no_admin_token(client, db, admin, user):
+    response = login_user(client, email=EMAIL)
+    assert "access_token" in response.json
+    access_token = response.json["access_token"]
+    operations = [_operation("create", "widget1")]
+    response = process_widget_batch(client, access_token, operations)
+    assert response.status_code == HTTPStatus.FORBIDDEN
+    assert "message" in response.json and response.json["message"] == FORBIDDEN
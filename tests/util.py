@@ -1,7 +1,11 @@
 """Shared functions and constants for unit tests."""
+from contextlib import contextmanager
 from datetime import date
 
 from flask import url_for
+from sqlalchemy import event
+
+from flask_api_tutorial import db
 
 EMAIL = "new_user@email.com"
 ADMIN_EMAIL = "admin_user@email.com"
@@ -34,11 +38,12 @@ def register_user(test_client, email=EMAIL, password=PASSWORD):
     )
 
 
-def login_user(test_client, email=EMAIL, password=PASSWORD):
+def login_user(test_client, email=EMAIL, password=PASSWORD, remote_addr="127.0.0.1"):
     return test_client.post(
         url_for("api.auth_login"),
         data=f"email={email}&password={password}",
         content_type="application/x-www-form-urlencoded",
+        environ_base={"REMOTE_ADDR": remote_addr},
     )
 
 
@@ -69,24 +74,35 @@ def create_widget(
     )
 
 
-def retrieve_widget_list(test_client, access_token, page=None, per_page=None):
+def retrieve_widget_list(
+    test_client, access_token, page=None, per_page=None, headers=None, **params
+):
     return test_client.get(
-        url_for("api.widget_list", page=page, per_page=per_page),
-        headers={"Authorization": f"Bearer {access_token}"},
+        url_for("api.widget_list", page=page, per_page=per_page, **params),
+        headers=dict(headers or {}, Authorization=f"Bearer {access_token}"),
     )
 
 
-def retrieve_widget(test_client, access_token, widget_name):
+def search_widgets(test_client, access_token, q, **params):
     return test_client.get(
-        url_for("api.widget", name=widget_name),
+        url_for("api.widget_search", q=q, **params),
         headers={"Authorization": f"Bearer {access_token}"},
     )
 
 
-def update_widget(test_client, access_token, widget_name, info_url, deadline_str):
+def retrieve_widget(test_client, access_token, widget_name, headers=None, **params):
+    return test_client.get(
+        url_for("api.widget", name=widget_name, **params),
+        headers=dict(headers or {}, Authorization=f"Bearer {access_token}"),
+    )
+
+
+def update_widget(
+    test_client, access_token, widget_name, info_url, deadline_str, headers=None
+):
     return test_client.put(
         url_for("api.widget", name=widget_name),
-        headers={"Authorization": f"Bearer {access_token}"},
+        headers=dict(headers or {}, Authorization=f"Bearer {access_token}"),
         data=f"info_url={info_url}&deadline={deadline_str}",
         content_type="application/x-www-form-urlencoded",
     )
@@ -97,3 +113,68 @@ def delete_widget(test_client, access_token, widget_name):
         url_for("api.widget", name=widget_name),
         headers={"Authorization": f"Bearer {access_token}"},
     )
+
+
+def process_widget_batch(test_client, access_token, operations):
+    return test_client.post(
+        url_for("api.widget_batch"),
+        headers={"Authorization": f"Bearer {access_token}"},
+        json=dict(operations=operations),
+    )
+
+
+def export_widgets(test_client, access_token, export_format):
+    return test_client.get(
+        url_for("api.widget_export", export_format=export_format),
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+
+
+@contextmanager
+def count_queries():
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
+
+
+@contextmanager
+def max_queries(limit):
+    with count_queries() as statements:
+        yield statements
+    assert len(statements) <= limit, (
+        f"{len(statements)} SQL statements executed, expected at most {limit}:\n"
+        + "\n".join(statements)
+    )
+
+
+@contextmanager
+def query_plans():
+    plans = []
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, many):
+        if statement.lstrip().upper().startswith("SELECT"):
+            explain = conn.connection.cursor()
+            explain.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            plans.append("\n".join(row[-1] for row in explain.fetchall()))
+            explain.close()
+
+    event.listen(db.engine, "after_cursor_execute", after_cursor_execute)
+    try:
+        yield plans
+    finally:
+        event.remove(db.engine, "after_cursor_execute", after_cursor_execute)
+
+
+def select_statements(statements, table):
+    return [
+        stmt
+        for stmt in statements
+        if stmt.lstrip().upper().startswith("SELECT") and f"FROM {table}" in stmt
+    ]